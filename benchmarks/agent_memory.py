@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Writing Agent Memory Benchmark
+
+Writes a series of posts with one reused BlogWritingAgent for each memory
+mode (reset, keep_last, compact) against the local stub in stub_server.py,
+and reports the prompt size of every post: the steps carried over from
+earlier posts, the LLM calls, the prompt tokens of the post and the largest
+prompt of a single call. With reset the prompt of every post stays the same
+size; the other modes carry earlier posts along, bounded by --keep-steps.
+
+Requires the technical_blog_smolagents package to be installed. No external
+requests are made.
+
+Usage:
+    python benchmarks/agent_memory.py [--posts <n>] [--modes reset compact]
+        [--keep-steps <n>] [--json <path>]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from offline_suite import child_env, patch_search
+from stub_server import StubServer, add_stub_arguments, config_from_args
+
+TOPIC = "Python Design Patterns for Machine Learning"
+GOAL = "Explain common design patterns for ML engineers with examples."
+
+
+def run_mode(
+    mode: str, keep_steps: int, posts: int, workdir: Path
+) -> List[Dict[str, Any]]:
+    """Write the series with one agent and return the metrics of every post"""
+    from common.tracing import start_tracing, stop_tracing
+    from technical_blog_smolagents.agents.blog_writing_agent import BlogWritingAgent
+    from technical_blog_smolagents.llm_cache import CachedOpenAIServerModel
+    from technical_blog_smolagents.memory_policy import MemoryPolicy
+
+    roadmap = [
+        {"title": f"Pattern {index + 1}", "description": f"Design pattern {index + 1}"}
+        for index in range(posts)
+    ]
+    agent = BlogWritingAgent(
+        model=CachedOpenAIServerModel(model_id="gpt-4o-mini"),
+        memory_policy=MemoryPolicy(mode, keep_steps),
+    )
+    start_tracing(f"{mode}-{time.time_ns()}", str(workdir / "traces"))
+    rows = []
+    try:
+        for index, outline in enumerate(roadmap):
+            agent.write_blog_post(
+                topic=TOPIC,
+                goal=GOAL,
+                post_title=outline["title"],
+                post_description=outline["description"],
+                blog_roadmap=roadmap,
+                post_index=index,
+                total_posts=posts,
+            )
+            rows.append(agent.last_run_metrics)
+    finally:
+        stop_tracing()
+    return rows
+
+
+def main() -> None:
+    from technical_blog_smolagents.memory_policy import (
+        DEFAULT_KEEP_STEPS,
+        MEMORY_MODES,
+        format_run_metrics,
+    )
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=10)
+    parser.add_argument(
+        "--modes", nargs="+", choices=MEMORY_MODES, default=list(MEMORY_MODES)
+    )
+    parser.add_argument("--keep-steps", type=int, default=DEFAULT_KEEP_STEPS)
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    json_path = Path(args.json).resolve() if args.json else None
+
+    server = StubServer(config_from_args(args)).start()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            workdir = Path(tmp)
+            # The same environment as the offline suite, without the caches
+            env = child_env(server.base_url, workdir)
+            os.environ.clear()
+            os.environ.update(env)
+            patch_search(server.base_url)
+            # save_to_file writes the posts under the working directory
+            os.chdir(workdir)
+            for mode in args.modes:
+                print(f"Writing {args.posts} posts with memory mode {mode}...")
+                results[mode] = run_mode(mode, args.keep_steps, args.posts, workdir)
+    finally:
+        server.shutdown()
+
+    for mode, rows in results.items():
+        print(f"\n{mode}:")
+        print(format_run_metrics(rows))
+
+    print(f"\n{'mode':<11}{'prompt_tokens':>15}{'last_post_peak':>16}")
+    for mode, rows in results.items():
+        print(
+            f"{mode:<11}{sum(row['prompt_tokens'] for row in rows):>15}"
+            f"{rows[-1]['peak_prompt_tokens'] if rows else 0:>16}"
+        )
+    if json_path:
+        json_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nResults written to {json_path}")
+
+
+if __name__ == "__main__":
+    main()
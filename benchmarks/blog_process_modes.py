@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Blog Writing Crew Process Mode Benchmark
+
+Writes the same blog post with the hierarchical BlogWritingCrew (a manager
+LLM hands out every task) and with the dag process mode (tasks follow the
+declared dependency graph, code examples and diagrams run in parallel), and
+compares the number of LLM calls, tokens, estimated cost and wall time.
+
+Requires the write_a_technical_blog package to be installed and real
+OPENAI_API_KEY and SERPER_API_KEY values: every run calls the APIs. The LLM
+response cache is disabled so both modes do the full amount of work.
+
+Usage:
+    python benchmarks/blog_process_modes.py [--repeats <n>] [--modes dag ...]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.pop("LLM_CACHE_PATH", None)
+
+from common.tracing import start_tracing, stop_tracing  # noqa: E402
+from write_a_technical_blog.crews.blog_writing_crew.blog_writing_crew import (  # noqa: E402
+    BlogWritingCrew,
+)
+from write_a_technical_blog.post_manifest import post_crew_inputs  # noqa: E402
+from write_a_technical_blog.task_graph import PROCESS_MODES  # noqa: E402
+from write_a_technical_blog.types import BlogPostOutline  # noqa: E402
+
+POST_INPUTS = post_crew_inputs(
+    [
+        BlogPostOutline(
+            title="The Strategy Pattern for Swappable Model Backends",
+            description=(
+                "How the strategy pattern lets a training pipeline switch between "
+                "model implementations without changing the calling code."
+            ),
+        )
+    ],
+    0,
+    topic="Python Design Patterns for Machine Learning",
+    goal="Explain common design patterns for ML engineers with examples.",
+)
+
+
+def run_mode(mode: str, trace_dir: str) -> dict:
+    """Write the benchmark post once and return the totals of its trace"""
+    tracer = start_tracing(f"{mode}-{time.time_ns()}", trace_dir)
+    start = time.perf_counter()
+    try:
+        BlogWritingCrew(mode).crew().kickoff(inputs=POST_INPUTS)
+    finally:
+        wall_s = time.perf_counter() - start
+        stop_tracing()
+
+    totals = {"wall_s": wall_s, "calls": 0, "tokens": 0, "cost_usd": 0.0}
+    for row in tracer.summary():
+        if row["kind"] == "llm_call":
+            totals["calls"] += row["count"]
+            totals["tokens"] += row["prompt_tokens"] + row["completion_tokens"]
+            totals["cost_usd"] += row["cost_usd"]
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument(
+        "--modes", nargs="+", choices=PROCESS_MODES, default=list(PROCESS_MODES)
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as trace_dir:
+        results = {}
+        for mode in args.modes:
+            runs = [run_mode(mode, trace_dir) for _ in range(args.repeats)]
+            results[mode] = {
+                key: sum(run[key] for run in runs) / len(runs) for key in runs[0]
+            }
+
+    print(f"{'mode':<14}{'wall s':>9}{'LLM calls':>11}{'tokens':>10}{'cost $':>9}")
+    for mode, totals in results.items():
+        print(
+            f"{mode:<14}{totals['wall_s']:>9.1f}{totals['calls']:>11.1f}"
+            f"{totals['tokens']:>10.0f}{totals['cost_usd']:>9.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
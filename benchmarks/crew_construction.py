@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Crew Construction Microbenchmark
+
+Measures the per-item cost of building a crew the way the flows used to
+(instantiating the @CrewBase class and calling crew() for every chapter or
+post) against handing out copies from a CrewTemplate.
+
+Requires the write_a_book_with_flows and write_a_technical_blog packages to
+be installed. No API calls are made; dummy keys are set if none are present.
+
+Usage:
+    python benchmarks/crew_construction.py [--iterations <n>]
+"""
+
+import argparse
+import os
+import time
+from typing import Callable
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("SERPER_API_KEY", "benchmark")
+
+from write_a_book_with_flows.crews.write_book_chapter_crew.write_book_chapter_crew import (  # noqa: E402
+    WriteBookChapterCrew,
+    write_book_chapter_crew_template,
+)
+from write_a_technical_blog.crews.blog_writing_crew.blog_writing_crew import (  # noqa: E402
+    BlogWritingCrew,
+    blog_writing_crew_template,
+)
+
+
+def time_per_item(build: Callable[[], object], iterations: int) -> float:
+    """Return the mean wall time in milliseconds of a single build"""
+    # Warm up imports and, for templates, the prototype crew
+    build()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = [
+        (
+            "WriteBookChapterCrew",
+            lambda: WriteBookChapterCrew().crew(),
+            write_book_chapter_crew_template.crew,
+        ),
+        (
+            "BlogWritingCrew",
+            lambda: BlogWritingCrew().crew(),
+            blog_writing_crew_template.crew,
+        ),
+    ]
+
+    print(f"{'crew':<24}{'rebuild ms':>12}{'template ms':>13}{'speedup':>9}")
+    for name, rebuild, from_template in cases:
+        before = time_per_item(rebuild, args.iterations)
+        after = time_per_item(from_template, args.iterations)
+        print(f"{name:<24}{before:>12.2f}{after:>13.2f}{before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+"""
+Startup Time Benchmark
+
+Runs the --help of every command line entry point under `python -X
+importtime` and parses the import timings it writes to stderr. --help has
+to answer without loading crewai, crewai_tools, langchain_openai,
+smolagents or litellm, so the benchmark fails when one of them is imported
+or when the imports of an entry point take longer than the budget.
+
+For every entry point it reports the wall time of the process, the total
+import time, the slowest top-level imports and any heavy modules imported.
+
+Requires the write_a_book_with_flows, write_a_technical_blog and
+technical_blog_smolagents packages and the job application dependencies to
+be installed. Nothing is run beyond --help.
+
+Usage:
+    python benchmarks/import_time.py [--targets blog book batch smol job-md
+        job-pdf] [--budget-ms <ms>] [--repeat <n>] [--top <n>] [--json <path>]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CREW_AI_DIR = REPO_ROOT / "crew-ai"
+
+# The arguments after `python -X importtime` that start each entry point
+ENTRY_POINTS = {
+    "blog": ["-m", "write_a_technical_blog.main"],
+    "book": ["-m", "write_a_book_with_flows.main"],
+    "batch": ["-m", "write_a_book_with_flows.batch"],
+    "smol": ["-m", "technical_blog_smolagents.main"],
+    "job-md": [str(CREW_AI_DIR / "job-application-md" / "job_application_crew.py")],
+    "job-pdf": [str(CREW_AI_DIR / "job-application-pdf" / "job_application_crew.py")],
+}
+# Packages that are only needed once an agent runs
+HEAVY_MODULES = ("crewai", "crewai_tools", "langchain_openai", "smolagents", "litellm")
+DEFAULT_BUDGET_MS = 1000.0
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, float, float]]:
+    """Parse -X importtime output into (module, depth, self_ms, cumulative_ms)
+
+    Lines look like `import time:  self [us] | cumulative | imported package`,
+    with the package name indented by two spaces per level of nesting.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # The header line
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append(
+            (
+                name.strip(),
+                depth,
+                int(fields[0]) / 1000,
+                int(fields[1]) / 1000,
+            )
+        )
+    return imports
+
+
+def measure(target: str) -> Dict[str, Any]:
+    """Run one entry point's --help and measure its startup"""
+    env = dict(os.environ)
+    # The job application scripts import the shared helpers as common.*
+    env["PYTHONPATH"] = os.pathsep.join(
+        path for path in (str(CREW_AI_DIR), env.get("PYTHONPATH")) if path
+    )
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *ENTRY_POINTS[target], "--help"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    imports = parse_importtime(completed.stderr)
+    if completed.returncode != 0:
+        errors = [
+            line
+            for line in completed.stderr.splitlines()
+            if not line.startswith("import time:")
+        ]
+        return {"target": target, "error": (errors or ["failed"])[-1]}
+
+    top_level = [entry for entry in imports if entry[1] == 0]
+    heavy = sorted(
+        {
+            name.split(".")[0]
+            for name, _, _, _ in imports
+            if name.split(".")[0] in HEAVY_MODULES
+        }
+    )
+    return {
+        "target": target,
+        "wall_ms": wall_ms,
+        "import_ms": sum(entry[3] for entry in top_level),
+        "modules": len(imports),
+        "slowest": [
+            {"module": name, "cumulative_ms": cumulative}
+            for name, _, _, cumulative in sorted(
+                top_level, key=lambda entry: entry[3], reverse=True
+            )
+        ],
+        "heavy": heavy,
+    }
+
+
+def best_of(target: str, repeat: int) -> Dict[str, Any]:
+    """The run with the lowest import time, to keep noise out of the budget"""
+    runs = [measure(target) for _ in range(repeat)]
+    failed = [run for run in runs if "error" in run]
+    if failed:
+        return failed[0]
+    return min(runs, key=lambda run: run["import_ms"])
+
+
+def print_results(results: List[Dict[str, Any]], top: int) -> None:
+    header = f"{'target':<8} {'wall ms':>8} {'import ms':>10} {'modules':>8}  heavy"
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        if "error" in row:
+            print(f"{row['target']:<8} {row['error']}")
+            continue
+        print(
+            f"{row['target']:<8} {row['wall_ms']:>8.1f} {row['import_ms']:>10.1f} "
+            f"{row['modules']:>8}  {', '.join(row['heavy']) or '-'}"
+        )
+    for row in results:
+        if "error" in row or not top:
+            continue
+        print(f"\nSlowest imports of {row['target']}:")
+        for entry in row["slowest"][:top]:
+            print(f"  {entry['cumulative_ms']:>8.1f} ms  {entry['module']}")
+
+
+def over_budget(row: Dict[str, Any], budget_ms: Optional[float]) -> bool:
+    if "error" in row or row["heavy"]:
+        return True
+    return budget_ms is not None and row["import_ms"] > budget_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--targets", nargs="+", choices=ENTRY_POINTS, default=list(ENTRY_POINTS)
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="Exit with an error when the imports of an entry point take longer",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs of each entry point; the fastest is reported",
+    )
+    parser.add_argument(
+        "--top", type=int, default=5, help="Slowest top-level imports to show"
+    )
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    for target in args.targets:
+        print(f"Measuring {target}...")
+        results.append(best_of(target, max(1, args.repeat)))
+
+    print()
+    print_results(results, args.top)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.json}")
+
+    failed = [row["target"] for row in results if over_budget(row, args.budget_ms)]
+    if failed:
+        sys.exit(
+            f"Failed, over the {args.budget_ms:.0f} ms budget or importing heavy "
+            f"modules at startup: {', '.join(failed)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python
+"""
+Offline End-to-End Benchmark Suite
+
+Runs BookFlow, BlogFlow in both process modes, the smolagents BlogManager
+and the job application crew end-to-end against the local stub in stub_server.py, which answers
+chat completions, embeddings, Serper and DuckDuckGo searches and web pages
+with a configurable latency. Each target runs in its own process, in a
+temporary directory, so its peak RSS and import time are its own.
+
+For every target and concurrency the suite reports:
+
+- LLM calls, searches, pages read and tokens served by the stub
+- framework overhead per LLM call: the wall time during which no request
+  to the stub was in flight, divided by the number of LLM calls
+- throughput: items written (chapters, posts, documents) and LLM calls per
+  second
+- peak RSS of the process
+
+Pass --json to keep the results for CI, and --max-overhead-ms to fail when
+the overhead per LLM call of any run exceeds a limit.
+
+Requires the write_a_book_with_flows, write_a_technical_blog and
+technical_blog_smolagents packages and the job application dependencies to
+be installed. No external requests are made.
+
+Usage:
+    python benchmarks/offline_suite.py [--targets book blog blog_dag smol job]
+        [--concurrency 1 4] [--latency-ms <ms>] [--tokens-per-second <n>]
+        [--json <path>] [--max-overhead-ms <ms>]
+"""
+
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from stub_server import StubServer, add_stub_arguments, config_from_args
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+JOB_APPLICATION_DIR = REPO_ROOT / "crew-ai" / "job-application-md"
+TARGETS = ("book", "blog", "blog_dag", "smol", "job")
+# Targets that write several items at once
+CONCURRENT_TARGETS = ("book", "blog", "blog_dag", "smol")
+
+RESUME = """# Jane Doe
+
+Machine learning engineer with six years of experience building feature
+stores, training pipelines and model serving on Python and Kubernetes.
+
+## Experience
+
+- Staff ML Engineer, Example Corp: built the online feature store
+- ML Engineer, Sample Inc: moved batch training to streaming updates
+"""
+
+
+def patch_search(stub_url: str) -> None:
+    """Send Serper and DuckDuckGo searches to the stub"""
+    import requests
+
+    request = requests.Session.request
+
+    def request_via_stub(self, method, url, *args, **kwargs):
+        if isinstance(url, str) and url.startswith("https://google.serper.dev"):
+            url = stub_url + url[len("https://google.serper.dev") :]
+        return request(self, method, url, *args, **kwargs)
+
+    requests.Session.request = request_via_stub
+
+    try:
+        from duckduckgo_search import DDGS
+    except ImportError:
+        return
+
+    # DDGS has no setting for its endpoint, so its text search is redirected
+    def text(self, keywords: str, max_results=None, **kwargs):
+        response = requests.get(
+            f"{stub_url}/ddg",
+            params={"q": keywords, "max_results": max_results},
+            timeout=30,
+        )
+        return response.json()[:max_results]
+
+    DDGS.text = text
+
+
+def run_book(concurrency: int, stub_url: str) -> int:
+    from write_a_book_with_flows.flow import BookFlow
+
+    flow = BookFlow(checkpoint_dir=".checkpoints")
+    flow.kickoff(inputs={"max_concurrent_chapters": concurrency})
+    return len(flow.state.book)
+
+
+def run_blog(concurrency: int, stub_url: str) -> int:
+    from write_a_technical_blog.flow import BlogFlow
+
+    flow = BlogFlow()
+    flow.kickoff(inputs={"max_concurrent_posts": concurrency})
+    return len(flow.state.blog_posts)
+
+
+def run_blog_dag(concurrency: int, stub_url: str) -> int:
+    from write_a_technical_blog.flow import BlogFlow
+    from write_a_technical_blog.task_graph import DAG
+
+    # Concurrent dag crews run the most LLM calls and prints at the same time
+    flow = BlogFlow()
+    flow.kickoff(inputs={"max_concurrent_posts": concurrency, "process_mode": DAG})
+    return len(flow.state.blog_posts)
+
+
+def run_smol(concurrency: int, stub_url: str) -> int:
+    from technical_blog_smolagents.main import BlogManager
+
+    result = BlogManager(max_concurrent_posts=concurrency).run(
+        topic="Design Patterns in Python",
+        goal="Explain the most useful design patterns with examples",
+    )
+    return len(result.get("posts", []))
+
+
+def run_job(concurrency: int, stub_url: str) -> int:
+    # The crew script imports the shared helpers as common.*
+    sys.path.insert(0, str(JOB_APPLICATION_DIR.parent))
+    spec = importlib.util.spec_from_file_location(
+        "job_application_crew", JOB_APPLICATION_DIR / "job_application_crew.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    Path("resume.md").write_text(RESUME, encoding="utf-8")
+    module.tailor_resume(
+        resume="resume.md",
+        job_url=f"{stub_url}/pages/job_posting_ml_engineer",
+        github_url=f"{stub_url}/pages/engineering_blog_feature_store",
+        personal_writeup="Enjoys building reliable ML infrastructure.",
+        output_dir="output",
+        config_dir=str(JOB_APPLICATION_DIR / "config"),
+        model="gpt-4o-mini",
+    )
+    return len(list(Path("output").glob("*.md")))
+
+
+# Imported before a run starts, to time the import separately
+TARGET_MODULES = {
+    "book": "write_a_book_with_flows.flow",
+    "blog": "write_a_technical_blog.flow",
+    "blog_dag": "write_a_technical_blog.flow",
+    "smol": "technical_blog_smolagents.main",
+    "job": "crewai",
+}
+RUNNERS = {
+    "book": run_book,
+    "blog": run_blog,
+    "blog_dag": run_blog_dag,
+    "smol": run_smol,
+    "job": run_job,
+}
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(args: argparse.Namespace) -> None:
+    """Run one target in this process and write its measurements"""
+    started = time.perf_counter()
+    importlib.import_module(TARGET_MODULES[args.run_target])
+    import_s = time.perf_counter() - started
+    patch_search(args.stub_url)
+
+    run_start = time.time()
+    items = RUNNERS[args.run_target](args.run_concurrency, args.stub_url)
+    run_end = time.time()
+    result = {
+        "import_s": import_s,
+        "run_start": run_start,
+        "run_end": run_end,
+        "items": items,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    Path(args.result_file).write_text(json.dumps(result), encoding="utf-8")
+
+
+def child_env(stub_url: str, workdir: Path) -> Dict[str, str]:
+    env = dict(os.environ)
+    # The LLM cache would answer repeated prompts without calling the stub
+    env.pop("LLM_CACHE_PATH", None)
+    env.pop("SEARCH_CACHE_PATH", None)
+    env.update(
+        {
+            "OPENAI_API_KEY": "sk-stub",
+            "OPENAI_API_BASE": f"{stub_url}/v1",
+            "OPENAI_BASE_URL": f"{stub_url}/v1",
+            "SERPER_API_KEY": "stub",
+            "OTEL_SDK_DISABLED": "true",
+            "CREWAI_TELEMETRY_OPT_OUT": "true",
+            "PAGE_CACHE_PATH": str(workdir / "pages.sqlite"),
+            "TRACE_DIR": str(workdir / "traces"),
+        }
+    )
+    return env
+
+
+def run_target(
+    server: StubServer, target: str, concurrency: int, verbose: bool
+) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        result_file = workdir / "result.json"
+        before = server.stats()
+        completed = subprocess.run(
+            [
+                sys.executable,
+                str(Path(__file__).resolve()),
+                "--run-target",
+                target,
+                "--run-concurrency",
+                str(concurrency),
+                "--stub-url",
+                server.base_url,
+                "--result-file",
+                str(result_file),
+            ],
+            cwd=workdir,
+            env=child_env(server.base_url, workdir),
+            stdout=None if verbose else subprocess.DEVNULL,
+            stderr=None if verbose else subprocess.PIPE,
+            text=True,
+        )
+        if completed.returncode != 0 or not result_file.exists():
+            error = (completed.stderr or "").strip().splitlines()[-1:] or ["failed"]
+            return {"target": target, "concurrency": concurrency, "error": error[0]}
+        child = json.loads(result_file.read_text(encoding="utf-8"))
+
+    after = server.stats()
+    served = {key: after.get(key, 0) - before.get(key, 0) for key in after}
+    wall_s = child["run_end"] - child["run_start"]
+    busy_s = server.busy_seconds(child["run_start"], child["run_end"])
+    llm_calls = served.get("llm", 0)
+    return {
+        "target": target,
+        "concurrency": concurrency,
+        "items": child["items"],
+        "llm_calls": llm_calls,
+        "searches": served.get("search", 0),
+        "pages": served.get("page", 0),
+        "prompt_tokens": served.get("prompt_tokens", 0),
+        "completion_tokens": served.get("completion_tokens", 0),
+        "import_s": child["import_s"],
+        "wall_s": wall_s,
+        "stub_busy_s": busy_s,
+        "overhead_ms_per_call": (
+            (wall_s - busy_s) / llm_calls * 1000 if llm_calls else None
+        ),
+        "items_per_s": child["items"] / wall_s if wall_s else 0.0,
+        "llm_calls_per_s": llm_calls / wall_s if wall_s else 0.0,
+        "peak_rss_mb": child["peak_rss_mb"],
+    }
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    header = (
+        f"{'target':<8} {'conc':>4} {'items':>5} {'calls':>6} {'tokens':>8} "
+        f"{'wall s':>7} {'ovh ms/call':>11} {'items/s':>8} {'calls/s':>8} "
+        f"{'rss MB':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        if "error" in row:
+            print(f"{row['target']:<8} {row['concurrency']:>4} {row['error']}")
+            continue
+        overhead = row["overhead_ms_per_call"]
+        print(
+            f"{row['target']:<8} {row['concurrency']:>4} {row['items']:>5} "
+            f"{row['llm_calls']:>6} "
+            f"{row['prompt_tokens'] + row['completion_tokens']:>8} "
+            f"{row['wall_s']:>7.2f} "
+            f"{'-' if overhead is None else f'{overhead:.1f}':>11} "
+            f"{row['items_per_s']:>8.2f} {row['llm_calls_per_s']:>8.2f} "
+            f"{row['peak_rss_mb']:>7.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument(
+        "--concurrency",
+        nargs="+",
+        type=int,
+        default=[1, 4],
+        help="Chapters or posts written at the same time by book and blog",
+    )
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    parser.add_argument(
+        "--max-overhead-ms",
+        type=float,
+        help="Exit with an error when a run's overhead per LLM call exceeds this",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Show the output of each run"
+    )
+    add_stub_arguments(parser)
+    # Used by the suite to run a single target in a child process
+    parser.add_argument("--run-target", choices=TARGETS, help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--run-concurrency", type=int, default=1, help=argparse.SUPPRESS
+    )
+    parser.add_argument("--stub-url", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_target:
+        run_child(args)
+        return
+
+    server = StubServer(config_from_args(args)).start()
+    print(
+        f"Stub at {server.base_url}, {args.latency_ms:.0f} ms per LLM call, "
+        f"{args.tokens_per_second or 'unlimited'} tokens/s"
+    )
+    results = []
+    try:
+        for target in args.targets:
+            levels = args.concurrency if target in CONCURRENT_TARGETS else [1]
+            for concurrency in levels:
+                print(f"Running {target} at concurrency {concurrency}...")
+                results.append(run_target(server, target, concurrency, args.verbose))
+    finally:
+        server.shutdown()
+
+    print()
+    print_results(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.json}")
+
+    failed = [row for row in results if "error" in row]
+    if args.max_overhead_ms is not None:
+        failed += [
+            row
+            for row in results
+            if (row.get("overhead_ms_per_call") or 0) > args.max_overhead_ms
+        ]
+    if failed:
+        targets = ", ".join(f"{row['target']}@{row['concurrency']}" for row in failed)
+        sys.exit(f"Failed or over the overhead limit: {targets}")
+
+
+if __name__ == "__main__":
+    main()
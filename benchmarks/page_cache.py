@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""
+Page Cache Benchmark
+
+Serves a set of HTML pages from a local stand-in HTTP server that supports
+ETag and Last-Modified validation and adds a fixed latency to every request,
+then reads them the way CachedScrapeWebsiteTool does in four rounds:
+
+- uncached: plain requests with no cache
+- cold: the first read through an empty page cache
+- fresh: pages validated within the max age, served without a request
+- revalidated: pages past their max age, answered with 304 Not Modified
+
+Some pages share their content under different URLs to show the content
+hash deduplication. The uncached round also checks that the cache extracts
+the same text.
+
+Requires the shared crew-ai/common package to be installed. No external
+requests are made.
+
+Usage:
+    python benchmarks/page_cache.py [--pages <n>] [--latency-ms <ms>]
+"""
+
+import argparse
+import hashlib
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+import requests
+from common.page_cache import PageCache, extract_page_content
+
+PAGE_TEMPLATE = """<html><head><title>Page {index}</title></head><body>
+<nav>Home | Blog | About</nav>
+<article><h1>Design pattern {index}</h1>{paragraphs}</article>
+</body></html>"""
+
+
+def make_pages(count: int) -> Dict[str, bytes]:
+    """HTML pages keyed by path; every fourth page repeats the previous one"""
+    pages = {}
+    for index in range(count):
+        source = index - 1 if index % 4 == 3 else index
+        paragraphs = "".join(
+            f"<p>Paragraph {line} about pattern {source}.</p>" for line in range(200)
+        )
+        pages[f"/page/{index}"] = PAGE_TEMPLATE.format(
+            index=source, paragraphs=paragraphs
+        ).encode("utf-8")
+    return pages
+
+
+class StandInServer:
+    """Local HTTP server that answers conditional requests like a real site"""
+
+    def __init__(self, pages: Dict[str, bytes], latency_s: float):
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        last_modified = formatdate(time.time() - 3600, usegmt=True)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(latency_s)
+                body = pages.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                server.requests += 1
+                if self.headers.get("If-None-Match") == etag:
+                    server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                server.bytes_sent += len(body)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_port}"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def shutdown(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def read_all(urls: List[str], read: Callable[[str], str]) -> tuple:
+    start = time.perf_counter()
+    texts = [read(url) for url in urls]
+    return (time.perf_counter() - start) * 1000, texts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages)
+    server = StandInServer(pages, args.latency_ms / 1000)
+    urls = [server.base_url + path for path in pages]
+
+    def uncached(url):
+        return extract_page_content(requests.get(url, timeout=15))
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = PageCache(f"{directory}/pages.sqlite")
+
+        def cached(url):
+            return cache.fetch(url, "main_content", extract_page_content, timeout=15)
+
+        print(
+            f"{'round':<14}{'total ms':>10}{'requests':>10}{'304s':>7}{'KB sent':>10}"
+        )
+        expected = None
+        for name in ("uncached", "cold", "fresh", "revalidated"):
+            if name == "revalidated":
+                cache.max_age_seconds = 0
+            before = (server.requests, server.not_modified, server.bytes_sent)
+            elapsed_ms, texts = read_all(
+                urls, uncached if name == "uncached" else cached
+            )
+            if expected is None:
+                expected = texts
+            elif texts != expected:
+                raise SystemExit(f"The {name} round returned different page text")
+            print(
+                f"{name:<14}{elapsed_ms:>10.1f}"
+                f"{server.requests - before[0]:>10}"
+                f"{server.not_modified - before[1]:>7}"
+                f"{(server.bytes_sent - before[2]) / 1024:>10.1f}"
+            )
+        print("Page cache:", cache.stats())
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
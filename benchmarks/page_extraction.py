@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Page Extraction Benchmark
+
+Runs the page extractor over the saved HTML pages in benchmarks/fixtures/pages
+and compares the text an agent receives with the whole-page text that
+ScrapeWebsiteTool used to return. Reports extraction throughput, the tokens
+removed as boilerplate and the tokens left after the token budget.
+
+Tokens are counted with the extractor's approximate counter, so the numbers
+are comparable between columns rather than exact for a given model.
+
+Requires the shared crew-ai/common package to be installed. No requests are
+made.
+
+Usage:
+    python benchmarks/page_extraction.py [--iterations <n>] [--max-tokens <n>]
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from common.page_extractor import (
+    count_tokens,
+    extract_main_content,
+    truncate_to_token_budget,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "pages"
+
+
+def whole_page_text(html: str) -> str:
+    """The text ScrapeWebsiteTool extracts: every string on the page"""
+    text = BeautifulSoup(html, "html.parser").get_text(" ")
+    text = re.sub("[ \t]+", " ", text)
+    return re.sub("\\s+\n\\s+", "\n", text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=400,
+        help="Token budget; the fixtures are small, so the default is low",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'page':<36}{'KB':>7}{'whole':>8}{'main':>8}{'saved':>7}"
+        f"{'budget':>8}{'dropped':>9}{'MB/s':>8}"
+    )
+    totals = {"bytes": 0, "seconds": 0.0, "whole": 0, "main": 0, "budget": 0}
+    for path in sorted(FIXTURES.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        size = len(html.encode("utf-8"))
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            text = extract_main_content(html)
+        seconds = (time.perf_counter() - start) / args.iterations
+
+        whole = count_tokens(whole_page_text(html))
+        main_tokens = count_tokens(text)
+        _, kept, _ = truncate_to_token_budget(text, args.max_tokens)
+        print(
+            f"{path.stem[:35]:<36}{size / 1024:>7.1f}{whole:>8}{main_tokens:>8}"
+            f"{1 - main_tokens / whole:>7.0%}{kept:>8}{main_tokens - kept:>9}"
+            f"{size / seconds / 1e6:>8.2f}"
+        )
+        totals["bytes"] += size
+        totals["seconds"] += seconds
+        totals["whole"] += whole
+        totals["main"] += main_tokens
+        totals["budget"] += kept
+
+    print(
+        f"Overall: {totals['bytes'] / totals['seconds'] / 1e6:.2f} MB/s,"
+        f" {1 - totals['main'] / totals['whole']:.0%} of tokens removed as"
+        f" boilerplate, {1 - totals['budget'] / totals['whole']:.0%} with the"
+        f" {args.max_tokens}-token budget"
+    )
+
+
+if __name__ == "__main__":
+    main()
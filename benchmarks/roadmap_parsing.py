@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Roadmap Parsing Benchmark
+
+Generates blog series roadmaps with thousands of posts and reads them three
+ways: with the DOTALL regexes parse_roadmap_file used before, with the
+single-pass line parser of the roadmap library, and from the JSON sidecar
+saved next to the markdown. Each roadmap is read as it is written and with
+Windows line endings, as it would be after an edit on Windows, to show how
+the old regexes depend on the exact spacing of the file.
+
+Requires the shared crew-ai/common package to be installed. No requests are
+made.
+
+Usage:
+    python benchmarks/roadmap_parsing.py [--posts <n> ...] [--iterations <n>]
+"""
+
+import argparse
+import re
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+from common.roadmap import (
+    BlogPostOutline,
+    Roadmap,
+    load_roadmap,
+    parse_markdown,
+    save_roadmap,
+)
+
+
+def regex_parse(content: str) -> tuple:
+    """The parse_roadmap_file regexes the roadmap library replaced"""
+    topic_match = re.search(r"## Topic: (.+?)(?:\n|$)", content)
+    topic = topic_match.group(1).strip() if topic_match else ""
+    goal_match = re.search(r"## Goal\n(.*?)\n\n## Planned Posts", content, re.DOTALL)
+    goal = goal_match.group(1).strip() if goal_match else ""
+    posts = [
+        (match.group(1).strip(), match.group(2).strip())
+        for match in re.finditer(
+            r"### \d+\. (.+?)\n\n(.*?)(?=\n\n### \d+\.|$)", content, re.DOTALL
+        )
+    ]
+    return topic, goal, posts
+
+
+def make_roadmap(posts: int) -> Roadmap:
+    return Roadmap(
+        topic="Design patterns for Python ML engineers",
+        goal="Show how classic design patterns apply to ML code.\n\n"
+        "Every post builds on the previous one.",
+        posts=[
+            BlogPostOutline(
+                title=f"Pattern {index}: strategies for model serving",
+                description=f"Post {index} covers when to use the pattern. " * 8
+                + "\n\n- Examples with scikit-learn\n- Pitfalls in production",
+            )
+            for index in range(posts)
+        ],
+    )
+
+
+def timed(parse: Callable, iterations: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = parse()
+    return (time.perf_counter() - start) / iterations * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument(
+        "--max-regex-posts",
+        type=int,
+        default=1000,
+        help="Largest roadmap with Windows line endings given to the regexes, "
+        "which take quadratic time on it",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'posts':>6} {'format':<8}{'regex ms':>10}{'found':>7}"
+        f"{'lines ms':>10}{'found':>7}{'sidecar ms':>12}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.posts:
+            roadmap = make_roadmap(count)
+            path = save_roadmap(roadmap, f"{directory}/{count}/Blog_Series_Roadmap.md")
+            markdown = Path(path).read_text(encoding="utf-8")
+            sidecar_ms, loaded = timed(partial(load_roadmap, path), args.iterations)
+            if loaded != roadmap:
+                raise SystemExit(f"The sidecar of {count} posts did not round-trip")
+
+            for name, text in (
+                ("unix", markdown),
+                ("windows", markdown.replace("\n", "\r\n")),
+            ):
+                lines_ms, parsed = timed(partial(parse_markdown, text), args.iterations)
+                if parsed != roadmap:
+                    raise SystemExit(f"The line parser misread {count} posts ({name})")
+                if name == "windows" and count > args.max_regex_posts:
+                    regex = f"{'skipped':>10}{'-':>7}"
+                else:
+                    regex_ms, (_, _, posts) = timed(
+                        partial(regex_parse, text), args.iterations
+                    )
+                    regex = f"{regex_ms:>10.1f}{len(posts):>7}"
+                print(
+                    f"{count:>6} {name:<8}{regex}{lines_ms:>10.1f}"
+                    f"{len(parsed.posts):>7}{sidecar_ms:>12.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
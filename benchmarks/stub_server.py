@@ -0,0 +1,660 @@
+#!/usr/bin/env python
+"""
+OpenAI-Compatible Stub Server
+
+A local stand-in for the OpenAI chat completions and embeddings APIs, the
+Serper search API, DuckDuckGo results and the web pages agents read, so the
+flows can run end-to-end offline. Chat completions follow the prompt format
+of the framework that sent them:
+
+- crewAI agents get ReAct answers. An agent is given one Action per tool it
+  can use to delegate, search or read a page, up to --tool-calls, and then a
+  Final Answer. When the task asks for a structured output, the final answer
+  is JSON that fits the format given in the prompt.
+- smolagents CodeAgents get code that calls their search and page tools,
+  then code that passes a canned output for the task to final_answer.
+- Requests with function tools or a JSON schema response format get
+  arguments or content generated from the schema.
+
+Every chat completion waits --latency-ms plus the completion tokens divided
+by --tokens-per-second. Search results link to pages on the server; pages
+named after a file in benchmarks/fixtures/pages serve that file.
+
+Usage:
+    python benchmarks/stub_server.py [--port <port>] [--latency-ms <ms>]
+        [--tokens-per-second <n>] [--canned <rules.json>]
+"""
+
+import argparse
+import ast
+import base64
+import hashlib
+import json
+import re
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = Path(__file__).parent / "fixtures" / "pages"
+
+# Tools the stub makes agents call before their final answer
+CREWAI_TOOLS = re.compile(
+    r"delegate work to coworker|search the internet|read website content",
+    re.IGNORECASE,
+)
+SMOLAGENTS_TOOLS = re.compile(r"^(research_topics?|web_search|visit_webpage)$")
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_CREWAI_TOOL = re.compile(
+    r"Tool Name: (.+)\nTool Arguments: (\{.*\})\nTool Description:"
+)
+_COWORKERS = re.compile(r"one of the following coworkers: (.+)")
+_SMOLAGENTS_TOOL = re.compile(
+    r"^\s*- (\w+): .*?\n\s*Takes inputs: (\{.*\})$", re.MULTILINE
+)
+_FORMAT_TOKEN = re.compile(r'"[^"]*"|\w+|[{}\[\],:]')
+_FILLER = (
+    "The pattern separates what varies from what stays the same so that a "
+    "pipeline can swap one implementation for another without touching the "
+    "code that calls it"
+).split()
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count: every word and punctuation mark is one token"""
+    return len(_TOKEN.findall(text))
+
+
+def message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        # smolagents sends content as a list of typed parts
+        return "\n".join(
+            part.get("text", "") for part in content if isinstance(part, dict)
+        )
+    return str(content)
+
+
+class StubConfig:
+    """How the stub answers: latency, output sizes and canned outputs
+
+    canned is a list of {"match": regex, "output": value} rules checked
+    against the user messages of a request before anything else; the first
+    match is the final answer of the agent.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        tool_latency_ms: float = 0.0,
+        tokens_per_second: float = 0.0,
+        completion_tokens: int = 200,
+        list_items: int = 3,
+        tool_calls: int = 2,
+        canned: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.latency_s = latency_ms / 1000
+        self.tool_latency_s = tool_latency_ms / 1000
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.list_items = list_items
+        self.tool_calls = tool_calls
+        self.canned = [
+            (re.compile(rule["match"]), rule["output"]) for rule in canned or []
+        ]
+
+
+class StubResponder:
+    """Builds the responses of the stub from its config"""
+
+    def __init__(self, config: StubConfig, base_url: str):
+        self.config = config
+        self.base_url = base_url
+
+    def filler(self, tokens: Optional[int] = None) -> str:
+        """Markdown of roughly the given number of tokens"""
+        tokens = self.config.completion_tokens if tokens is None else tokens
+        paragraphs, words = [], []
+        while len(words) < tokens:
+            words.extend(_FILLER)
+        for start in range(0, tokens, 60):
+            paragraphs.append(" ".join(words[start : start + 60]) + ".")
+            if start // 60 % 3 == 0:
+                paragraphs.append(f"## Section {start // 180 + 1}")
+        return "\n\n".join(paragraphs)
+
+    def page_url(self, name: str = "engineering_blog_feature_store") -> str:
+        return f"{self.base_url}/pages/{name}"
+
+    # Structured outputs
+
+    def scalar(self, type_name: str, name: str, index: int) -> Any:
+        type_name = type_name.lower()
+        if type_name in ("int", "integer"):
+            return index + 1
+        if type_name in ("float", "number"):
+            return float(index + 1)
+        if type_name in ("bool", "boolean"):
+            return True
+        if name in ("content", "body", "text", "markdown"):
+            return self.filler()
+        if "url" in name or "link" in name:
+            return self.page_url()
+        return f"Stub {name.replace('_', ' ')} {index + 1}"
+
+    def from_format(self, text: str) -> Any:
+        """An instance of crewAI's description of a pydantic model"""
+        tokens = _FORMAT_TOKEN.findall(text)
+        position = 0
+
+        def parse():
+            nonlocal position
+            token = tokens[position]
+            position += 1
+            if token == "{":
+                fields = []
+                while tokens[position] != "}":
+                    if tokens[position] == ",":
+                        position += 1
+                        continue
+                    name = tokens[position].strip('"')
+                    position += 2  # the name and the colon
+                    fields.append((name, parse()))
+                position += 1
+                return ("object", fields)
+            if token in ("List", "Optional", "Dict") and tokens[position] == "[":
+                position += 1
+                children = [parse()]
+                while tokens[position] == ",":
+                    position += 1
+                    children.append(parse())
+                position += 1
+                return (token.lower(), children)
+            return ("scalar", token)
+
+        return self._instance(parse(), "value", 0)
+
+    def _instance(self, node: tuple, name: str, index: int) -> Any:
+        kind, value = node
+        if kind == "object":
+            return {
+                field: self._instance(child, field, index) for field, child in value
+            }
+        if kind == "list":
+            return [
+                self._instance(value[0], name, item)
+                for item in range(self.config.list_items)
+            ]
+        if kind == "dict":
+            return {"key": self._instance(value[-1], name, index)}
+        if kind == "optional":
+            return self._instance(value[0], name, index)
+        return self.scalar(value, name, index)
+
+    def from_schema(
+        self, schema: Dict[str, Any], definitions: Dict[str, Any], name: str = "value"
+    ) -> Any:
+        """An instance of a JSON schema"""
+        if "$ref" in schema:
+            return self.from_schema(
+                definitions[schema["$ref"].split("/")[-1]], definitions, name
+            )
+        for key in ("anyOf", "oneOf", "allOf"):
+            if key in schema:
+                options = [
+                    option for option in schema[key] if option.get("type") != "null"
+                ]
+                return self.from_schema(options[0], definitions, name)
+        kind = schema.get("type", "string")
+        if kind == "object":
+            return {
+                field: self.from_schema(child, definitions, field)
+                for field, child in schema.get("properties", {}).items()
+            }
+        if kind == "array":
+            return [
+                self.from_schema(schema.get("items", {}), definitions, name)
+                for _ in range(self.config.list_items)
+            ]
+        return self.scalar(kind, name, 0)
+
+    # Chat completions
+
+    def complete(self, request: Dict[str, Any]) -> Tuple[str, List[Dict]]:
+        """The content and tool calls answering a chat completion request"""
+        messages = request.get("messages", [])
+        prompt = "\n".join(message_text(message) for message in messages)
+        # A smolagents agent that keeps its memory between runs sends earlier
+        # tasks too; only the messages from the current task on count
+        start = 0
+        for index, message in enumerate(messages):
+            if message.get("role") == "user" and "New task:" in message_text(message):
+                start = index
+        task = "\n".join(
+            message_text(message)
+            for message in messages[start:]
+            if message.get("role") == "user"
+        )
+        if "New task:" in task:
+            task = task[task.rindex("New task:") :]
+        turns = sum(
+            1 for message in messages[start:] if message.get("role") == "assistant"
+        )
+
+        for tool in request.get("tools") or []:
+            function = tool.get("function", {})
+            schema = function.get("parameters", {})
+            arguments = self.from_schema(schema, schema.get("$defs", {}))
+            call = {
+                "id": f"call_{turns}",
+                "type": "function",
+                "function": {
+                    "name": function.get("name"),
+                    "arguments": json.dumps(arguments),
+                },
+            }
+            return "", [call]
+
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"].get("schema", {})
+            return json.dumps(self.from_schema(schema, schema.get("$defs", {}))), []
+
+        if "<end_code>" in prompt:
+            return self.code_agent_step(prompt, task, turns), []
+        if "Final Answer:" in prompt:
+            return self.react_step(prompt, task, turns), []
+        return self.filler(), []
+
+    def canned_output(self, task: str) -> Any:
+        for pattern, output in self.config.canned:
+            if pattern.search(task):
+                return output
+        return None
+
+    def react_step(self, prompt: str, task: str, turns: int) -> str:
+        tools = [
+            (name, arguments)
+            for name, arguments in _CREWAI_TOOL.findall(prompt)
+            if CREWAI_TOOLS.search(name)
+        ]
+        if turns < min(len(tools), self.config.tool_calls):
+            name, arguments = tools[turns]
+            action_input = self.crewai_tool_input(prompt, arguments)
+            return (
+                "Thought: I need more information before I answer\n"
+                f"Action: {name}\n"
+                f"Action Input: {json.dumps(action_input)}"
+            )
+
+        output = self.canned_output(task)
+        if output is None:
+            marker = "in the following format: "
+            start = task.rfind(marker)
+            if start >= 0:
+                output = self.from_format(task[start + len(marker) :])
+            else:
+                output = self.filler()
+        if not isinstance(output, str):
+            output = json.dumps(output)
+        return f"Thought: I now know the final answer\nFinal Answer: {output}"
+
+    def crewai_tool_input(self, prompt: str, arguments: str) -> Dict[str, str]:
+        try:
+            names = list(ast.literal_eval(arguments))
+        except (ValueError, SyntaxError):
+            names = []
+        coworkers = _COWORKERS.search(prompt)
+        values = {}
+        for name in names:
+            if name == "coworker" and coworkers:
+                values[name] = coworkers.group(1).split(",")[0].strip()
+            elif "url" in name:
+                values[name] = self.page_url()
+            else:
+                values[name] = f"Stub {name.replace('_', ' ')} for the task"
+        return values
+
+    def code_agent_step(self, prompt: str, task: str, turns: int) -> str:
+        tools = [
+            (name, inputs)
+            for name, inputs in _SMOLAGENTS_TOOL.findall(prompt)
+            if SMOLAGENTS_TOOLS.match(name)
+        ]
+        if turns < min(len(tools), self.config.tool_calls):
+            name, inputs = tools[turns]
+            try:
+                argument, spec = next(iter(ast.literal_eval(inputs).items()))
+            except (ValueError, SyntaxError, StopIteration, AttributeError):
+                argument, spec = "query", {}
+            value = self.page_url() if "url" in argument else "stub query"
+            if isinstance(spec, dict) and spec.get("type") == "array":
+                value = [value, f"{value} examples"]
+            code = f"result = {name}({argument}={value!r})\nprint(result)"
+        else:
+            output = self.canned_output(task)
+            if output is None:
+                output = self.smolagents_output(task)
+            code = f"final_answer({output!r})"
+        return f"Thought: Next step.\nCode:\n```py\n{code}\n```<end_code>"
+
+    def smolagents_output(self, task: str) -> Any:
+        """The output the blog agents expect for their task"""
+        title = re.search(r"POST TITLE: (.+)", task)
+        if title:
+            return {"title": title.group(1).strip(), "content": self.filler()}
+        if "roadmap" in task.lower():
+            return {
+                "topic": "Stub topic",
+                "goal": "Stub goal",
+                "posts": [
+                    {"title": f"Stub post {index + 1}", "description": self.filler(40)}
+                    for index in range(self.config.list_items)
+                ],
+            }
+        return self.filler()
+
+    # Search and pages
+
+    def search_results(self, query: str) -> List[Dict[str, str]]:
+        pages = sorted(path.stem for path in FIXTURES.glob("*.html")) or ["page"]
+        return [
+            {
+                "title": f"{query} - result {index + 1}",
+                "link": self.page_url(pages[index % len(pages)]),
+                "snippet": " ".join(_FILLER[:20]),
+                "position": index + 1,
+            }
+            for index in range(5)
+        ]
+
+    def page(self, name: str) -> bytes:
+        path = FIXTURES / f"{name}.html"
+        if path.parent == FIXTURES and path.exists():
+            return path.read_bytes()
+        paragraphs = "".join(
+            f"<p>{paragraph}</p>" for paragraph in self.filler(600).split("\n\n")
+        )
+        return (
+            f"<html><head><title>{name}</title></head><body><nav>Home | Blog</nav>"
+            f"<article><h1>{name}</h1>{paragraphs}</article></body></html>"
+        ).encode("utf-8")
+
+
+def embedding(text: str, dimensions: int = 1536) -> List[float]:
+    """A deterministic unit-length vector for the text"""
+    seed = hashlib.sha256(text.encode("utf-8")).digest()
+    values = [(seed[i % len(seed)] - 127.5) / 127.5 for i in range(dimensions)]
+    norm = sum(value * value for value in values) ** 0.5
+    return [value / norm for value in values]
+
+
+class StubServer:
+    """Runs the stub on a local port and counts what it served
+
+    The start and end time of every request are kept, so a client can tell
+    how much of a time window it spent waiting for the stub.
+    """
+
+    def __init__(self, config: StubConfig, port: int = 0):
+        self.config = config
+        self.counts: Dict[str, int] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._intervals: List[Tuple[float, float]] = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.handle(self, "GET")
+
+            def do_POST(self):
+                server.handle(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_port}"
+        self.responder = StubResponder(config, self.base_url)
+
+    def start(self) -> "StubServer":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def shutdown(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def handle(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        started = time.time()
+        url = urlparse(handler.path)
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        try:
+            if method == "POST" and url.path.endswith("/chat/completions"):
+                kind, status, payload = "llm", 200, self.chat(json.loads(body))
+            elif method == "POST" and url.path.endswith("/embeddings"):
+                kind, status, payload = (
+                    "embeddings",
+                    200,
+                    self.embeddings(json.loads(body)),
+                )
+            elif method == "GET" and url.path.endswith("/models"):
+                kind, status = "models", 200
+                payload = {"object": "list", "data": [{"id": "gpt-4o-mini"}]}
+            elif method == "POST" and url.path == "/search":
+                time.sleep(self.config.tool_latency_s)
+                query = json.loads(body or b"{}").get("q", "")
+                kind, status = "search", 200
+                payload = {
+                    "searchParameters": {"q": query},
+                    "organic": self.responder.search_results(query),
+                }
+            elif method == "GET" and url.path == "/ddg":
+                time.sleep(self.config.tool_latency_s)
+                query = parse_qs(url.query).get("q", [""])[0]
+                kind, status = "search", 200
+                payload = [
+                    {"title": r["title"], "href": r["link"], "body": r["snippet"]}
+                    for r in self.responder.search_results(query)
+                ]
+            elif method == "GET" and url.path.startswith("/pages/"):
+                time.sleep(self.config.tool_latency_s)
+                kind, status = "page", 200
+                payload = self.responder.page(url.path[len("/pages/") :])
+            else:
+                kind, status, payload = "unknown", 404, {"error": "not found"}
+        except Exception as error:  # noqa: BLE001 - reported to the client
+            kind, status, payload = "error", 500, {"error": {"message": str(error)}}
+
+        if isinstance(payload, bytes):
+            content_type, data = "text/html; charset=utf-8", payload
+        elif isinstance(payload, str):
+            content_type, data = "text/event-stream", payload.encode("utf-8")
+        else:
+            content_type, data = "application/json", json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+        with self._lock:
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            self._intervals.append((started, time.time()))
+
+    def chat(self, request: Dict[str, Any]) -> Any:
+        content, tool_calls = self.responder.complete(request)
+        for stop in request.get("stop") or []:
+            if stop and stop in content:
+                content = content[: content.index(stop)]
+        prompt_tokens = sum(
+            count_tokens(message_text(message))
+            for message in request.get("messages", [])
+        )
+        completion_tokens = count_tokens(content) + sum(
+            count_tokens(call["function"]["arguments"]) for call in tool_calls
+        )
+        delay = self.config.latency_s
+        if self.config.tokens_per_second > 0:
+            delay += completion_tokens / self.config.tokens_per_second
+        time.sleep(delay)
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+        message = {"role": "assistant", "content": content or None}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        finish_reason = "tool_calls" if tool_calls else "stop"
+        response = {
+            "id": f"chatcmpl-stub-{time.time_ns()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4o-mini"),
+            "choices": [
+                {"index": 0, "message": message, "finish_reason": finish_reason}
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+        if not request.get("stream"):
+            return response
+        # A streamed answer arrives as a single chunk
+        chunk = dict(response, object="chat.completion.chunk")
+        chunk["choices"] = [
+            {"index": 0, "delta": message, "finish_reason": finish_reason}
+        ]
+        return f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n"
+
+    def embeddings(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        inputs = request.get("input", [])
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        data = []
+        for index, text in enumerate(inputs):
+            vector = embedding(str(text), request.get("dimensions") or 1536)
+            if request.get("encoding_format") == "base64":
+                packed = struct.pack(f"{len(vector)}f", *vector)
+                vector = base64.b64encode(packed).decode("ascii")
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+        tokens = sum(count_tokens(str(text)) for text in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": request.get("model", "text-embedding-ada-002"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(
+                self.counts,
+                prompt_tokens=self.prompt_tokens,
+                completion_tokens=self.completion_tokens,
+            )
+
+    def busy_seconds(self, start: float, end: float) -> float:
+        """Time between start and end with at least one request in flight"""
+        with self._lock:
+            intervals = sorted(
+                (max(begin, start), min(finish, end))
+                for begin, finish in self._intervals
+                if finish > start and begin < end
+            )
+        busy, covered_until = 0.0, start
+        for begin, finish in intervals:
+            if finish <= covered_until:
+                continue
+            busy += finish - max(begin, covered_until)
+            covered_until = finish
+        return busy
+
+
+def load_canned(path: Optional[str]) -> List[Dict[str, Any]]:
+    if not path:
+        return []
+    rules = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(rules, list):
+        raise ValueError(f"{path} must hold a list of match/output rules")
+    return rules
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--tool-latency-ms",
+        type=float,
+        default=0.0,
+        help="Latency of search results and pages",
+    )
+    parser.add_argument(
+        "--tokens-per-second",
+        type=float,
+        default=0.0,
+        help="Completion token rate; 0 answers without the extra delay",
+    )
+    parser.add_argument(
+        "--completion-tokens",
+        type=int,
+        default=200,
+        help="Size of free-text answers and content fields",
+    )
+    parser.add_argument(
+        "--list-items",
+        type=int,
+        default=3,
+        help="Items in every generated list, e.g. posts or chapters",
+    )
+    parser.add_argument(
+        "--tool-calls",
+        type=int,
+        default=2,
+        help="Tool calls an agent is given before its final answer",
+    )
+    parser.add_argument("--canned", help="JSON file with a list of match/output rules")
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        latency_ms=args.latency_ms,
+        tool_latency_ms=args.tool_latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        list_items=args.list_items,
+        tool_calls=args.tool_calls,
+        canned=load_canned(args.canned),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8000)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = StubServer(config_from_args(args), port=args.port)
+    print(f"Serving on {server.base_url}; point OPENAI_BASE_URL at /v1")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print("Served:", server.stats())
+
+
+if __name__ == "__main__":
+    main()
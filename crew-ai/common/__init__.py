@@ -0,0 +1,5 @@
+"""Helpers shared by the crewAI and smolagents experiments.
+
+The modules of this package need neither framework; the crewAI adapters
+live in common.crew.
+"""
@@ -0,0 +1 @@
+"""crewAI agents, LLMs and tools built on the shared helpers."""
@@ -0,0 +1,253 @@
+from typing import Any, Callable, Dict, List
+
+import litellm
+from crewai import Agent, Crew, Process, Task
+from crewai.tools.agent_tools.agent_tools import AgentTools
+from crewai.utilities import I18N, Prompts
+from crewai.utilities.converter import generate_model_description
+from pydantic import BaseModel
+
+# The prompts show everything an agent is sent except what other calls
+# write, which is assumed from typical runs: the final answer of a task, a
+# thought with its tool call, and the result a tool returns
+ANSWER_TOKENS = 1200
+STEP_TOKENS = 150
+OBSERVATION_TOKENS = 1000
+# Tool calls an agent with tools makes before it answers
+TOOL_STEPS = 2
+# Times the manager of a hierarchical crew delegates each task
+DELEGATIONS_PER_TASK = 1
+
+
+class TaskEstimate(BaseModel):
+    """Projected LLM calls, tokens and cost of one agent on one task"""
+
+    item: str
+    task: str
+    agent: str
+    model: str
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    cost_usd: float
+
+
+class RunEstimate:
+    """Projected LLM calls, tokens and cost of every task of a run"""
+
+    def __init__(self):
+        self.rows: List[TaskEstimate] = []
+        # Assumptions and limits the projection ran into, shown with the table
+        self.notes: List[str] = []
+
+    def totals(self) -> Dict[str, Any]:
+        return {
+            "calls": sum(row.calls for row in self.rows),
+            "prompt_tokens": sum(row.prompt_tokens for row in self.rows),
+            "completion_tokens": sum(row.completion_tokens for row in self.rows),
+            "cost_usd": sum(row.cost_usd for row in self.rows),
+        }
+
+    def format_summary(self) -> str:
+        totals = self.totals()
+        return (
+            f"{totals['calls']} LLM calls, {totals['prompt_tokens']} prompt and "
+            f"{totals['completion_tokens']} completion tokens, "
+            f"${totals['cost_usd']:.4f}"
+        )
+
+    def format_table(self) -> str:
+        lines = [
+            f"{'item':<24}{'task':<24}{'agent':<22}{'model':<16}{'calls':>6}"
+            f"{'prompt':>9}{'compl':>8}{'cost_usd':>10}"
+        ]
+        for row in self.rows:
+            lines.append(
+                f"{row.item[:23]:<24}{row.task[:23]:<24}{row.agent[:21]:<22}"
+                f"{row.model[:15]:<16}{row.calls:>6}{row.prompt_tokens:>9}"
+                f"{row.completion_tokens:>8}{row.cost_usd:>10.4f}"
+            )
+        lines.append(f"Total: {self.format_summary()}")
+        lines.extend(self.notes)
+        return "\n".join(lines)
+
+
+def count_tokens(model: str, text: str) -> int:
+    """Tokens of text with the model's local tokenizer"""
+    try:
+        return litellm.token_counter(model=model, text=text)
+    except Exception:
+        # About four characters per token for models without a tokenizer
+        return len(text) // 4
+
+
+def _price(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    try:
+        return sum(
+            litellm.cost_per_token(
+                model=model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+        )
+    except Exception:
+        return 0.0
+
+
+def render_agent(agent: Agent, inputs: Dict[str, Any]) -> Agent:
+    """A copy of the agent with the inputs filled into its role, goal and backstory
+
+    Raises KeyError when one of them uses an input that is missing.
+    """
+    return agent.model_copy(
+        update={
+            field: getattr(agent, field).format(**inputs)
+            for field in ("role", "goal", "backstory")
+        }
+    )
+
+
+def render_task(task: Task, inputs: Dict[str, Any]) -> str:
+    """The prompt of a task with the inputs filled in, as its agent is given it
+
+    Raises KeyError when the task uses an input that is missing.
+    """
+    rendered = task.model_copy(
+        update={
+            "description": task.description.format(**inputs),
+            "expected_output": task.expected_output.format(**inputs),
+        }
+    )
+    prompt = rendered.prompt()
+    if task.output_pydantic is not None:
+        prompt += "\n" + task.i18n.slice("formatted_task_instructions").format(
+            output_format=generate_model_description(task.output_pydantic)
+        )
+    return prompt
+
+
+def render_prompt(agent: Agent, tools: List[Any], task_prompt: str) -> str:
+    """The prompt the agent executor sends for a task, as crewai builds it"""
+    prompt = Prompts(
+        agent=agent,
+        tools=tools,
+        i18n=agent.i18n,
+        use_system_prompt=agent.use_system_prompt,
+        system_template=agent.system_template,
+        prompt_template=agent.prompt_template,
+        response_template=agent.response_template,
+    ).task_execution()["prompt"]
+    return (
+        prompt.replace("{input}", task_prompt)
+        .replace("{tool_names}", ", ".join(tool.name for tool in tools))
+        .replace("{tools}", "\n".join(tool.description for tool in tools))
+    )
+
+
+def estimate_task(
+    item: str,
+    task: Task,
+    task_prompt: str,
+    agent: Agent,
+    tools: List[Any],
+    context_tokens: int,
+    steps: int,
+    observation_tokens: int,
+    answer_tokens: int,
+) -> TaskEstimate:
+    """Project an agent's calls on a task, with steps tool calls before it answers
+
+    Every step adds its thought, tool call and result to the prompt of the
+    next call.
+    """
+    model = getattr(agent.llm, "model", None) or str(agent.llm)
+    base = count_tokens(model, render_prompt(agent, tools, task_prompt))
+    base += context_tokens
+    calls = steps + 1
+    prompt_tokens = sum(
+        base + step * (STEP_TOKENS + observation_tokens) for step in range(calls)
+    )
+    completion_tokens = steps * STEP_TOKENS + answer_tokens
+    return TaskEstimate(
+        item=item,
+        task=task.name or "",
+        agent=agent.role.strip(),
+        model=model,
+        calls=calls,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cost_usd=_price(model, prompt_tokens, completion_tokens),
+    )
+
+
+def estimate_crew(
+    crew: Crew,
+    inputs: Dict[str, Any],
+    item: str,
+    answer_tokens: Callable[[Task], int] = lambda task: ANSWER_TOKENS,
+) -> List[TaskEstimate]:
+    """Render every task and agent of a crew with its inputs and project its calls
+
+    answer_tokens gives the length of a task's final answer, which the tasks
+    after it are sent as context. The crew itself is left as it is. Raises
+    ValueError when a task or agent uses an input that is missing.
+    """
+    try:
+        prompts = [render_task(task, inputs) for task in crew.tasks]
+        agents = {id(agent): render_agent(agent, inputs) for agent in crew.agents}
+    except (KeyError, IndexError) as exc:
+        raise ValueError(
+            f"{item}: the task or agent config uses {{{exc.args[0]}}}, which is "
+            f"not one of the inputs {sorted(inputs)}"
+        ) from exc
+
+    i18n = I18N(prompt_file=crew.prompt_file)
+    rows = []
+    for index, (task, task_prompt) in enumerate(zip(crew.tasks, prompts)):
+        # A task sees the answers of its context tasks, or of every task
+        # before it when it declares none
+        context_tokens = sum(
+            answer_tokens(previous) for previous in (task.context or crew.tasks[:index])
+        )
+        worker = agents.get(id(task.agent)) or render_agent(task.agent, inputs)
+        worker_tools = task.tools or worker.tools or []
+        worker_steps = TOOL_STEPS if worker_tools else 0
+        delegations = 1
+        if crew.process == Process.hierarchical:
+            manager = Agent(
+                role=i18n.retrieve("hierarchical_manager_agent", "role"),
+                goal=i18n.retrieve("hierarchical_manager_agent", "goal"),
+                backstory=i18n.retrieve("hierarchical_manager_agent", "backstory"),
+                tools=AgentTools(agents=[worker]).tools(),
+                llm=crew.manager_llm,
+            )
+            rows.append(
+                estimate_task(
+                    item,
+                    task,
+                    task_prompt,
+                    manager,
+                    manager.tools,
+                    context_tokens,
+                    DELEGATIONS_PER_TASK,
+                    # The manager reads the answer of each delegation
+                    answer_tokens(task),
+                    answer_tokens(task),
+                )
+            )
+            delegations = DELEGATIONS_PER_TASK
+        for _ in range(delegations):
+            rows.append(
+                estimate_task(
+                    item,
+                    task,
+                    task_prompt,
+                    worker,
+                    worker_tools,
+                    context_tokens,
+                    worker_steps,
+                    OBSERVATION_TOKENS,
+                    answer_tokens(task),
+                )
+            )
+    return rows
@@ -0,0 +1,146 @@
+import contextlib
+import time
+import warnings
+from typing import Any, Dict, Iterator, List, Optional
+
+import crewai.llm
+import litellm
+from common.crew.tracing import TracedLLM, record_llm_response
+from common.http_pool import share_http_client
+from common.llm_cache import get_llm_cache
+
+SAMPLING_PARAMS = (
+    "temperature",
+    "top_p",
+    "n",
+    "stop",
+    "max_tokens",
+    "max_completion_tokens",
+    "presence_penalty",
+    "frequency_penalty",
+    "logit_bias",
+    "response_format",
+    "seed",
+    "logprobs",
+    "top_logprobs",
+)
+
+
+@contextlib.contextmanager
+def _ignore_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+
+def keep_output_streams() -> None:
+    """Stop crewAI from replacing sys.stdout and sys.stderr on every LLM call
+
+    LLM.call puts a filter in front of both streams for each request and puts
+    the old streams back after it. print() on Python 3.11 holds no reference
+    to the sys.stdout it writes to, so a concurrent crew putting the streams
+    back frees the filter under a thread that is printing and the interpreter
+    crashes. litellm is told not to print the messages the filter dropped
+    instead, and the call only silences warnings.
+    """
+    litellm.suppress_debug_info = True
+    crewai.llm.suppress_warnings = _ignore_warnings
+
+
+class CachedLLM(TracedLLM):
+    """crewAI LLM that serves repeated calls from the LLM response cache"""
+
+    # Set on the copy of the LLM used by one crew run to cap its LLM calls;
+    # any object with allow_llm_call() and final_answer(), such as the blog
+    # crews' CrewBudget
+    budget: Optional[Any] = None
+
+    def extra_params(self) -> Dict[str, Any]:
+        """Keyword arguments the LLM was built with beyond its own fields
+
+        crewAI 0.85 keeps them in kwargs, later versions in additional_params.
+        """
+        return getattr(self, "additional_params", None) or getattr(self, "kwargs", {})
+
+    def sampling_params(self) -> Dict[str, Any]:
+        params = {name: getattr(self, name, None) for name in SAMPLING_PARAMS}
+        params.update(self.extra_params())
+        return {name: value for name, value in params.items() if value is not None}
+
+    def call(
+        self,
+        messages: Any,
+        tools: Optional[List[Any]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        share_http_client()
+        keep_output_streams()
+        if self.budget is not None and not self.budget.allow_llm_call():
+            return self.budget.final_answer()
+
+        cache = get_llm_cache()
+        # A call with functions may run one of them, which a cached answer
+        # would skip
+        if cache is None or tools or available_functions:
+            return super().call(
+                messages,
+                tools=tools,
+                callbacks=callbacks,
+                available_functions=available_functions,
+            )
+
+        started = time.perf_counter()
+        key = cache.make_key(self.model, messages, self.sampling_params())
+        cached = cache.get(key)
+        if cached is not None:
+            record_llm_response(self.model, messages, cached, started, cached=True)
+            return cached
+
+        response = super().call(messages, callbacks=callbacks)
+        if response is not None:
+            cache.put(key, response)
+        return response
+
+    def stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """Yields the response text as it is generated"""
+        share_http_client()
+        if self.budget is not None and not self.budget.allow_llm_call():
+            yield self.budget.final_answer()
+            return
+
+        started = time.perf_counter()
+        cache = get_llm_cache()
+        key = None
+        if cache is not None:
+            key = cache.make_key(self.model, messages, self.sampling_params())
+            cached = cache.get(key)
+            if cached is not None:
+                record_llm_response(self.model, messages, cached, started, cached=True)
+                yield cached
+                return
+
+        params = {
+            "model": self.model,
+            "messages": messages,
+            "timeout": self.timeout,
+            # crewAI 0.85 has only base_url, later versions also api_base
+            "api_base": getattr(self, "api_base", None) or self.base_url,
+            "api_version": self.api_version,
+            "api_key": self.api_key,
+            **self.sampling_params(),
+            "stream": True,
+        }
+        params = {name: value for name, value in params.items() if value is not None}
+
+        chunks = []
+        for chunk in litellm.completion(**params):
+            text = chunk.choices[0].delta.content
+            if text:
+                chunks.append(text)
+                yield text
+
+        response = "".join(chunks)
+        record_llm_response(self.model, messages, response, started)
+        if cache is not None:
+            cache.put(key, response)
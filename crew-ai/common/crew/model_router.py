@@ -0,0 +1,313 @@
+import copy
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import litellm
+from common.crew.llm import CachedLLM
+from common.crew.tracing import estimate_usage
+from common.tracing import get_tracer
+from crewai.utilities.exceptions.context_window_exceeding_exception import (
+    LLMContextLengthExceededException,
+)
+
+# Models tried in order for each tier; the first is the primary model
+MODEL_TIERS: Dict[str, List[str]] = {
+    # Research, summaries and reviews: never falls back to a pricier model
+    "cheap": ["gpt-4o-mini", "gpt-3.5-turbo"],
+    "standard": ["gpt-4o-mini", "gpt-4o"],
+    "strong": ["gpt-4o", "gpt-4o-mini"],
+}
+# Savings are reported against sending every call to this model
+BASELINE_MODEL = "gpt-4o"
+# Consecutive failures after which a model is tried last for a while
+FAILURE_THRESHOLD = 3
+COOLDOWN_S = 60.0
+# Weight of the newest call in a model's average latency
+LATENCY_SMOOTHING = 0.3
+
+
+class ModelHealth:
+    """Recent latency and failures of each model, shared by all routes"""
+
+    def __init__(self):
+        self._latency_s: Dict[str, float] = {}
+        self._failures: Dict[str, int] = {}
+        self._open_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record_success(self, model: str, latency_s: float) -> None:
+        with self._lock:
+            previous = self._latency_s.get(model)
+            self._latency_s[model] = (
+                latency_s
+                if previous is None
+                else previous + LATENCY_SMOOTHING * (latency_s - previous)
+            )
+            self._failures[model] = 0
+            self._open_until.pop(model, None)
+
+    def record_failure(self, model: str) -> None:
+        with self._lock:
+            failures = self._failures.get(model, 0) + 1
+            self._failures[model] = failures
+            if failures >= FAILURE_THRESHOLD:
+                self._open_until[model] = time.monotonic() + COOLDOWN_S
+
+    def order(
+        self, models: Sequence[str], max_latency_s: Optional[float] = None
+    ) -> List[str]:
+        """The models in the order to try them
+
+        Models that keep failing go last until their cooldown ends, and
+        models slower on average than max_latency_s go after the fast ones.
+        The order of the chain is kept otherwise.
+        """
+        now = time.monotonic()
+        with self._lock:
+
+            def rank(model: str) -> int:
+                if self._open_until.get(model, 0.0) > now:
+                    return 2
+                latency = self._latency_s.get(model)
+                if max_latency_s is not None and latency is not None:
+                    return int(latency > max_latency_s)
+                return 0
+
+            return sorted(models, key=rank)
+
+
+class RouteMetrics:
+    """Calls, failovers, latency and cost of each route and model"""
+
+    COLUMNS = (
+        "calls",
+        "failures",
+        "fallbacks",
+        "wall_s",
+        "prompt_tokens",
+        "completion_tokens",
+        "cost_usd",
+        "baseline_cost_usd",
+    )
+
+    def __init__(self):
+        self._totals: Dict[tuple, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _row(self, route: str, model: str) -> Dict[str, float]:
+        return self._totals.setdefault(
+            (route, model), {column: 0 for column in self.COLUMNS}
+        )
+
+    def record_failure(self, route: str, model: str) -> None:
+        with self._lock:
+            self._row(route, model)["failures"] += 1
+
+    def record_call(
+        self,
+        route: str,
+        model: str,
+        wall_s: float,
+        messages: List[Dict[str, str]],
+        response: Optional[str],
+        fallback: bool,
+    ) -> None:
+        prompt_tokens, completion_tokens, cost_usd = estimate_usage(
+            model, messages, response
+        )
+        try:
+            baseline = sum(
+                litellm.cost_per_token(
+                    model=BASELINE_MODEL,
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                )
+            )
+        except Exception:
+            baseline = cost_usd
+        with self._lock:
+            row = self._row(route, model)
+            row["calls"] += 1
+            row["fallbacks"] += int(fallback)
+            row["wall_s"] += wall_s
+            row["prompt_tokens"] += prompt_tokens
+            row["completion_tokens"] += completion_tokens
+            row["cost_usd"] += cost_usd
+            row["baseline_cost_usd"] += baseline
+
+    def summary(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [
+                {"route": route, "model": model, **totals}
+                for (route, model), totals in sorted(self._totals.items())
+            ]
+        for row in rows:
+            row["savings_usd"] = row["baseline_cost_usd"] - row["cost_usd"]
+        return rows
+
+    def format_summary(self) -> str:
+        rows = self.summary()
+        lines = [
+            f"{'route':<28}{'model':<20}{'calls':>7}{'failures':>10}"
+            f"{'fallbacks':>11}{'avg_s':>8}{'cost_usd':>10}{'savings_usd':>13}"
+        ]
+        for row in rows:
+            average = row["wall_s"] / row["calls"] if row["calls"] else 0.0
+            lines.append(
+                f"{row['route'][:27]:<28}{row['model'][:19]:<20}"
+                f"{row['calls']:>7}{row['failures']:>10}{row['fallbacks']:>11}"
+                f"{average:>8.2f}{row['cost_usd']:>10.4f}{row['savings_usd']:>13.4f}"
+            )
+        saved = sum(row["savings_usd"] for row in rows)
+        lines.append(
+            f"Saved ${saved:.4f} against sending every call to {BASELINE_MODEL}"
+        )
+        return "\n".join(lines)
+
+
+model_health = ModelHealth()
+route_metrics = RouteMetrics()
+
+
+def _is_context_limit_error(error: Exception) -> bool:
+    return LLMContextLengthExceededException(str(error))._is_context_limit_error(
+        str(error)
+    )
+
+
+class RoutedLLM(CachedLLM):
+    """CachedLLM that fails over along a chain of models
+
+    Each call goes to the first model of the chain that is neither cooling
+    down after repeated failures nor slower than the route's latency limit,
+    and moves on to the next model when a call fails. Context length errors
+    are raised as they are, so the agent can summarize and retry.
+    """
+
+    def __init__(
+        self,
+        route: str,
+        models: Sequence[str],
+        max_latency_s: Optional[float] = None,
+        **kwargs: Any,
+    ):
+        if not models:
+            raise ValueError(f"Route {route} has no models")
+        super().__init__(model=models[0], **kwargs)
+        self.route = route
+        self.models = list(models)
+        self.max_latency_s = max_latency_s
+
+    def _attempts(self) -> Iterator[CachedLLM]:
+        for model in model_health.order(self.models, self.max_latency_s):
+            attempt = copy.copy(self)
+            attempt.model = model
+            yield attempt
+
+    def _failed(self, model: str, error: Exception, started: float) -> None:
+        model_health.record_failure(model)
+        route_metrics.record_failure(self.route, model)
+        tracer = get_tracer()
+        if tracer is not None:
+            tracer.record(
+                "llm_failover",
+                self.route,
+                wall_s=time.perf_counter() - started,
+                model=model,
+                error=repr(error),
+            )
+
+    def _succeeded(self, model: str, messages, response, started: float) -> None:
+        wall_s = time.perf_counter() - started
+        model_health.record_success(model, wall_s)
+        route_metrics.record_call(
+            self.route, model, wall_s, messages, response, model != self.models[0]
+        )
+
+    def call(
+        self,
+        messages: Any,
+        tools: Optional[List[Any]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        error = None
+        for attempt in self._attempts():
+            started = time.perf_counter()
+            try:
+                response = CachedLLM.call(
+                    attempt,
+                    messages,
+                    tools=tools,
+                    callbacks=callbacks,
+                    available_functions=available_functions,
+                )
+            except Exception as exc:
+                if _is_context_limit_error(exc):
+                    raise
+                self._failed(attempt.model, exc, started)
+                error = exc
+                continue
+            self._succeeded(attempt.model, messages, response, started)
+            return response
+        raise error
+
+    def stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        """Yields the response text as it is generated
+
+        A model that fails before its first chunk is failed over like in
+        call; once text has been yielded, errors are raised.
+        """
+        error = None
+        for attempt in self._attempts():
+            started = time.perf_counter()
+            chunks = []
+            try:
+                for text in CachedLLM.stream(attempt, messages):
+                    chunks.append(text)
+                    yield text
+            except Exception as exc:
+                if chunks or _is_context_limit_error(exc):
+                    raise
+                self._failed(attempt.model, exc, started)
+                error = exc
+                continue
+            self._succeeded(attempt.model, messages, "".join(chunks), started)
+            return
+        raise error
+
+
+def routed_llm(
+    route: str,
+    agent_config: Optional[Dict[str, Any]] = None,
+    tier: str = "standard",
+    **kwargs: Any,
+) -> RoutedLLM:
+    """The LLM for a route, configured by the llm_route key of an agent
+
+    llm_route is either the name of a tier in MODEL_TIERS or a mapping with
+    a tier, or a model and its fallbacks, and an optional max_latency_s:
+
+        llm_route:
+          model: gpt-4o-mini
+          fallbacks: [gpt-4o]
+          max_latency_s: 20
+
+    Without llm_route the given tier is used. Other keyword arguments are
+    passed to the LLM, e.g. temperature.
+    """
+    config = (agent_config or {}).get("llm_route") or tier
+    if isinstance(config, str):
+        config = {"tier": config}
+    if "model" in config:
+        models = [config["model"], *config.get("fallbacks", [])]
+    else:
+        tier = config.get("tier", tier)
+        if tier not in MODEL_TIERS:
+            raise ValueError(
+                f"Unknown model tier {tier!r} for route {route}, "
+                f"expected one of {sorted(MODEL_TIERS)}"
+            )
+        models = MODEL_TIERS[tier]
+    return RoutedLLM(route, models, max_latency_s=config.get("max_latency_s"), **kwargs)
@@ -0,0 +1,36 @@
+import threading
+from typing import Callable, Optional
+
+from crewai import Crew
+
+
+class CrewTemplate:
+    """Builds a crew once per process and hands out cheap per-run copies
+
+    Instantiating a @CrewBase class re-reads and re-parses its YAML config,
+    rebuilds every agent and constructs new tools. A template pays that cost
+    once; every work item then gets a copy of the prototype crew that shares
+    the parsed config, the LLMs and the tool instances.
+    """
+
+    def __init__(self, factory: Callable[[], Crew]):
+        self._factory = factory
+        self._prototype: Optional[Crew] = None
+        self._lock = threading.Lock()
+
+    def prototype(self) -> Crew:
+        if self._prototype is None:
+            with self._lock:
+                if self._prototype is None:
+                    self._prototype = self._factory()
+        return self._prototype
+
+    def crew(self) -> Crew:
+        """Returns an independent crew for a single kickoff"""
+        prototype = self.prototype()
+        crew = prototype.copy()
+        # Crew.copy serialises model-valued fields such as manager_llm into
+        # plain dicts, so the clone gets the original objects back
+        crew.manager_llm = prototype.manager_llm
+        crew.function_calling_llm = prototype.function_calling_llm
+        return crew
@@ -0,0 +1,130 @@
+import os
+from typing import Any, Dict
+
+from common.http_pool import get_http_session
+from common.page_cache import (
+    extract_page_content,
+    fit_to_token_budget,
+    get_page_cache,
+)
+from common.page_extractor import default_max_tokens
+from common.search_cache import get_search_cache
+from crewai_tools import ScrapeWebsiteTool, SerperDevTool
+from pydantic import Field
+
+# Fields of SerperDevTool that change the results, across its versions
+SERPER_SEARCH_FIELDS = (
+    "search_url",
+    "base_url",
+    "search_type",
+    "country",
+    "location",
+    "locale",
+    "n_results",
+)
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """SerperDevTool that shares results through the search cache
+
+    Searches are sent over the shared connection pool. Only successful
+    searches are cached; a search that returns no results payload, such as an
+    error message, raises instead.
+    """
+
+    def _run(self, **kwargs: Any) -> Any:
+        cache = get_search_cache()
+        query = kwargs.get("search_query") or kwargs.get("query")
+        if cache is None or not query:
+            return self._search(**kwargs)
+
+        params = {
+            field: kwargs.get(field, getattr(self, field, None))
+            for field in SERPER_SEARCH_FIELDS
+        }
+        return cache.get_or_search(
+            "serper", query, lambda: self._search(**kwargs), params=params
+        )
+
+    def _search(self, **kwargs: Any) -> Any:
+        if hasattr(SerperDevTool, "_make_api_request"):
+            results = super()._run(**kwargs)
+        else:
+            # Older versions send the request from _run itself, so the search
+            # is made here and its organic results formatted as they would be
+            query = kwargs.get("search_query") or kwargs.get("query")
+            results = self._make_api_request(query, "search")
+            if "organic" in results:
+                return self._format_organic(results["organic"])
+        if isinstance(results, dict) and not (
+            "organic" in results or "news" in results
+        ):
+            raise ValueError(f"Serper returned no search results: {results}")
+        return results
+
+    def _make_api_request(self, search_query: str, search_type: str) -> Dict:
+        """Search over the shared connection pool, raising on an HTTP error status"""
+        if hasattr(SerperDevTool, "_get_search_url"):
+            url = self._get_search_url(search_type)
+        else:
+            url = self.search_url
+        payload = {"q": search_query, "num": self.n_results}
+        for field, key in (
+            ("country", "gl"),
+            ("location", "location"),
+            ("locale", "hl"),
+        ):
+            if getattr(self, field, None):
+                payload[key] = getattr(self, field)
+        response = get_http_session().post(
+            url,
+            headers={
+                "X-API-KEY": os.environ["SERPER_API_KEY"],
+                "content-type": "application/json",
+            },
+            json=payload,
+            timeout=30,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _format_organic(self, organic: list) -> str:
+        lines = []
+        for result in organic[: self.n_results]:
+            try:
+                lines.extend(
+                    [
+                        f"Title: {result['title']}",
+                        f"Link: {result['link']}",
+                        f"Snippet: {result['snippet']}",
+                        "---",
+                    ]
+                )
+            except KeyError:
+                continue
+        return "\nSearch results: " + "\n".join(lines) + "\n"
+
+
+class CachedScrapeWebsiteTool(ScrapeWebsiteTool):
+    """ScrapeWebsiteTool that reads page content through the page cache
+
+    Only the main content of a page is kept, cut to max_tokens tokens.
+    """
+
+    max_tokens: int = Field(default_factory=default_max_tokens)
+
+    def _run(self, **kwargs: Any) -> Any:
+        website_url = kwargs.get("website_url", self.website_url)
+        request = {
+            "timeout": 15,
+            "headers": self.headers,
+            "cookies": self.cookies if self.cookies else {},
+        }
+        cache = get_page_cache()
+        if cache is None:
+            text = extract_page_content(get_http_session().get(website_url, **request))
+        else:
+            text = cache.fetch(
+                website_url, "main_content", extract_page_content, **request
+            )
+        return fit_to_token_budget(website_url, text, self.max_tokens)
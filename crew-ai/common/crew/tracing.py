@@ -0,0 +1,181 @@
+import contextvars
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import litellm
+from common.tracing import (
+    current_agent,
+    current_span,
+    get_tracer,
+    record_llm_call,
+    trace_span,
+)
+from crewai import LLM, Agent, Task
+from pydantic import Field, PrivateAttr
+
+
+def estimate_usage(
+    model: str, messages: List[Dict[str, str]], response: Optional[str]
+) -> Tuple[int, int, float]:
+    """Count the tokens of a call and price them with litellm's model prices"""
+    try:
+        prompt_tokens = litellm.token_counter(model=model, messages=messages)
+        completion_tokens = litellm.token_counter(model=model, text=response or "")
+    except Exception:
+        return 0, 0, 0.0
+    try:
+        prompt_cost, completion_cost = litellm.cost_per_token(
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+    except Exception:
+        # Models without a known price are still counted, just not priced
+        return prompt_tokens, completion_tokens, 0.0
+    return prompt_tokens, completion_tokens, prompt_cost + completion_cost
+
+
+def record_llm_response(
+    model: str,
+    messages: List[Dict[str, str]],
+    response: Optional[str],
+    started: float,
+    cached: bool = False,
+    error: Optional[BaseException] = None,
+) -> None:
+    """Record a crewAI LLM call, counting its tokens unless it was cached"""
+    if get_tracer() is None:
+        return
+    prompt_tokens, completion_tokens, cost_usd = 0, 0, 0.0
+    if not cached:
+        prompt_tokens, completion_tokens, cost_usd = estimate_usage(
+            model, messages, response
+        )
+    record_llm_call(
+        model,
+        prompt_tokens,
+        completion_tokens,
+        started,
+        cost_usd=cost_usd,
+        cached=cached,
+        error=error,
+    )
+
+
+def record_agent_step(step: Any) -> None:
+    """Step callback that records an agent step and the tool call it made"""
+    tracer = get_tracer()
+    span = current_span()
+    if tracer is None or span is None:
+        return
+
+    agent = current_agent()
+    usage = span.end_step()
+    tool = getattr(step, "tool", None)
+    if tool:
+        tracer.record("tool_call", tool, wall_s=usage["tool_wall_s"], agent=agent)
+    tracer.record(
+        "agent_step",
+        agent or span.name,
+        wall_s=usage["wall_s"],
+        prompt_tokens=usage["prompt_tokens"],
+        completion_tokens=usage["completion_tokens"],
+        # The executor calls the LLM again when it cannot parse an answer
+        retries=max(0, usage["llm_calls"] - 1),
+        cost_usd=usage["cost_usd"],
+        tool=tool,
+    )
+
+
+def llm_call_options(
+    tools: Optional[List[Any]] = None,
+    callbacks: Optional[List[Any]] = None,
+    available_functions: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """The keyword arguments of LLM.call that were given
+
+    crewAI 0.85 only takes callbacks, later versions also take tools and
+    available_functions. Passing on only those given keeps the overrides
+    working on both.
+    """
+    options = {
+        "tools": tools,
+        "callbacks": callbacks,
+        "available_functions": available_functions,
+    }
+    return {name: value for name, value in options.items() if value is not None}
+
+
+class TracedLLM(LLM):
+    """crewAI LLM that records every call in the run trace"""
+
+    def call(
+        self,
+        messages: Any,
+        tools: Optional[List[Any]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        started = time.perf_counter()
+        options = llm_call_options(tools, callbacks, available_functions)
+        try:
+            response = super().call(messages, **options)
+        except Exception as error:
+            record_llm_response(self.model, messages, None, started, error=error)
+            raise
+        record_llm_response(self.model, messages, response, started)
+        return response
+
+
+class TracedAgent(Agent):
+    """crewAI Agent that records a span for every task it executes"""
+
+    step_callback: Optional[Any] = Field(default=record_agent_step)
+
+    def execute_task(self, task, context=None, tools=None) -> str:
+        span = current_span()
+        if span is not None and span.owner == (id(self), id(task)):
+            # Agent.execute_task calls itself again when an attempt fails
+            span.retries += 1
+            return super().execute_task(task, context, tools)
+
+        name = task.name or task.description.strip().split("\n")[0][:60]
+        with trace_span("task", name, agent=self.role) as span:
+            if span is not None:
+                span.owner = (id(self), id(task))
+            return super().execute_task(task, context, tools)
+
+
+class TracedTask(Task):
+    """crewAI Task that keeps the trace of the run when it runs asynchronously
+
+    An async_execution task runs in a plain thread, which starts from an
+    empty context and so outside every open span and log context. The
+    context of the crew is captured when the task starts and the task runs
+    inside it, so its spans nest under the crew's.
+    """
+
+    _run_context: Optional[contextvars.Context] = PrivateAttr(default=None)
+
+    def copy(self, agents, task_mapping):
+        # Task.copy always builds a plain Task, which Crew.copy and so every
+        # CrewTemplate would hand out
+        copied = super().copy(agents, task_mapping)
+        fields = copied.model_dump(exclude={"id", "agent", "context", "tools"})
+        return type(self)(
+            **{name: value for name, value in fields.items() if value is not None},
+            agent=copied.agent,
+            context=copied.context,
+            tools=copied.tools,
+        )
+
+    def execute_async(self, agent=None, context=None, tools=None):
+        self._run_context = contextvars.copy_context()
+        return super().execute_async(agent, context, tools)
+
+    def _execute_task_async(self, agent, context, tools, future) -> None:
+        run_context, self._run_context = self._run_context, None
+        if run_context is None:
+            super()._execute_task_async(agent, context, tools, future)
+            return
+        run_context.run(super()._execute_task_async, agent, context, tools, future)
@@ -0,0 +1,191 @@
+import os
+import threading
+import weakref
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Dict, Iterable, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connections each pool keeps to a host, and how long idle ones are kept
+HTTP_MAX_CONNECTIONS_ENV = "HTTP_MAX_CONNECTIONS"
+HTTP_KEEPALIVE_SECONDS_ENV = "HTTP_KEEPALIVE_SECONDS"
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_KEEPALIVE_SECONDS = 60.0
+# Hosts the tool session keeps a connection pool for
+DEFAULT_POOLED_HOSTS = 16
+
+
+class PoolMeter:
+    """Counts requests, connections opened and requests in flight on a pool
+
+    A request that does not open a connection reuses a kept-alive one, so
+    the reuse ratio shows how many TLS handshakes the pool saved.
+    """
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self.requests = 0
+        self.connections_opened = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def started(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def finished(self, connections_opened: int = 0) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.connections_opened += connections_opened
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(0, self.requests - self.connections_opened)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "reuse_ratio": round(reused / self.requests, 3)
+                if self.requests
+                else 0.0,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "peak_utilization": round(
+                    self.peak_in_flight / self.max_connections, 3
+                ),
+            }
+
+
+class _MeteredTransport(httpx.HTTPTransport):
+    """httpx transport that reports to a PoolMeter"""
+
+    def __init__(self, meter: PoolMeter, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._meter = meter
+        self._seen = weakref.WeakSet()
+        self._seen_lock = threading.Lock()
+
+    def _new_connections(self, connections: Iterable[Any]) -> int:
+        with self._seen_lock:
+            new = [c for c in connections if c not in self._seen]
+            self._seen.update(new)
+        return len(new)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._meter.started()
+        try:
+            return super().handle_request(request)
+        finally:
+            self._meter.finished(self._new_connections(self._pool.connections))
+
+
+class _MeteredAdapter(HTTPAdapter):
+    """requests adapter that reports to a PoolMeter"""
+
+    def __init__(self, meter: PoolMeter, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._meter = meter
+        # Connections each host's pool had opened when last counted
+        self._opened = weakref.WeakKeyDictionary()
+        self._opened_lock = threading.Lock()
+
+    def _new_connections(self) -> int:
+        pools = self.poolmanager.pools
+        new = 0
+        with self._opened_lock:
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                new += pool.num_connections - self._opened.get(pool, 0)
+                self._opened[pool] = pool.num_connections
+        return new
+
+    def send(self, request, *args: Any, **kwargs: Any) -> requests.Response:
+        self._meter.started()
+        try:
+            return super().send(request, *args, **kwargs)
+        finally:
+            self._meter.finished(self._new_connections())
+
+
+def _max_connections() -> int:
+    return int(os.getenv(HTTP_MAX_CONNECTIONS_ENV, DEFAULT_MAX_CONNECTIONS))
+
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_http_session: Optional[requests.Session] = None
+_meters: Dict[str, PoolMeter] = {}
+
+
+def get_http_client() -> httpx.Client:
+    """The process-wide httpx client every LLM client sends its requests with
+
+    Connections are kept alive between calls, so concurrent crews and agents
+    reuse them instead of each opening its own. At most HTTP_MAX_CONNECTIONS
+    requests are in flight; further requests wait for a free connection.
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            max_connections = _max_connections()
+            meter = _meters["llm"] = PoolMeter(max_connections)
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=float(
+                    os.getenv(HTTP_KEEPALIVE_SECONDS_ENV, DEFAULT_KEEPALIVE_SECONDS)
+                ),
+            )
+            _http_client = httpx.Client(
+                transport=_MeteredTransport(meter, limits=limits),
+                # The OpenAI client sets the timeout of each request
+                timeout=httpx.Timeout(600.0, connect=10.0),
+            )
+        return _http_client
+
+
+def get_http_session() -> requests.Session:
+    """The process-wide requests session the search and page tools share
+
+    Keeps up to HTTP_MAX_CONNECTIONS connections alive to each host; further
+    requests to a host wait for a free connection.
+    """
+    global _http_session
+    with _lock:
+        if _http_session is None:
+            max_connections = _max_connections()
+            meter = _meters["tools"] = PoolMeter(max_connections)
+            adapter = _MeteredAdapter(
+                meter,
+                pool_connections=DEFAULT_POOLED_HOSTS,
+                pool_maxsize=max_connections,
+                pool_block=True,
+            )
+            session = requests.Session()
+            # Unrelated agents share the session, so no cookies are kept
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+
+def share_http_client() -> None:
+    """Make litellm create its OpenAI clients on the shared httpx client"""
+    import litellm
+
+    if litellm.client_session is None:
+        litellm.client_session = get_http_client()
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Usage of the llm and tools pools, for those created so far"""
+    with _lock:
+        meters = dict(_meters)
+    return {name: meter.stats() for name, meter in meters.items()}
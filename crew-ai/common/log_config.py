@@ -0,0 +1,126 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterator, Optional
+
+LOGGER_NAME = "blog_generator"
+DEFAULT_LOG_FILE = "output/blog_generation.log"
+# Set BLOG_LOG_FORMAT=json to write the log file as JSON lines
+LOG_FORMAT_ENV = "BLOG_LOG_FORMAT"
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_run_id: ContextVar[Optional[str]] = ContextVar("log_run_id", default=None)
+_post_index: ContextVar[Optional[int]] = ContextVar("log_post_index", default=None)
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+_lock = threading.Lock()
+
+
+class _ContextFilter(logging.Filter):
+    """Tags records with the run id and post index of the code logging them
+
+    Runs in the thread that logs, before the record is queued, since the
+    context variables are not visible from the listener thread.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = _run_id.get()
+        record.post_index = _post_index.get()
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as one JSON object"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "run_id": getattr(record, "run_id", None),
+            "post_index": getattr(record, "post_index", None),
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
+
+@contextmanager
+def log_context(
+    run_id: Optional[str] = None, post_index: Optional[int] = None
+) -> Iterator[None]:
+    """Tags everything logged inside the block with a run id or post index
+
+    The tags follow the code into asyncio tasks and worker threads started
+    with asyncio.to_thread.
+    """
+    tokens = []
+    if run_id is not None:
+        tokens.append((_run_id, _run_id.set(run_id)))
+    if post_index is not None:
+        tokens.append((_post_index, _post_index.set(post_index)))
+    try:
+        yield
+    finally:
+        for variable, token in reversed(tokens):
+            variable.reset(token)
+
+
+def setup_logging(
+    log_file: str = DEFAULT_LOG_FILE, json_lines: Optional[bool] = None
+) -> logging.Logger:
+    """Send the blog generator's log to a file and the console
+
+    Records are put on a queue and written by a listener thread, so logging
+    never waits for file I/O. The file is plain text unless json_lines is
+    True or BLOG_LOG_FORMAT is "json"; the console always gets plain text.
+    Only the first call sets anything up; later calls return the same logger.
+    """
+    global _listener, _queue_handler
+    logger = logging.getLogger(LOGGER_NAME)
+    with _lock:
+        if _listener is not None:
+            return logger
+        if json_lines is None:
+            json_lines = os.getenv(LOG_FORMAT_ENV, "").lower() == "json"
+
+        directory = os.path.dirname(log_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(
+            JsonLinesFormatter() if json_lines else logging.Formatter(TEXT_FORMAT)
+        )
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        records = queue.SimpleQueue()
+        _queue_handler = QueueHandler(records)
+        _queue_handler.addFilter(_ContextFilter())
+        logger.addHandler(_queue_handler)
+        logger.setLevel(logging.DEBUG)
+        _listener = QueueListener(records, file_handler, console_handler)
+        _listener.start()
+    atexit.register(stop_logging)
+    return logger
+
+
+def stop_logging() -> None:
+    """Write out the queued records and close the log file"""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is None:
+            return
+        logging.getLogger(LOGGER_NAME).removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queue_handler = None
@@ -0,0 +1,266 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from common.http_pool import get_http_session
+from common.page_extractor import extract_main_content, truncate_to_token_budget
+from common.tracing import get_tracer
+
+# Pages are cached on disk by default; set PAGE_CACHE_PATH to an empty string
+# to turn the cache off
+PAGE_CACHE_PATH_ENV = "PAGE_CACHE_PATH"
+PAGE_CACHE_MAX_MB_ENV = "PAGE_CACHE_MAX_MB"
+PAGE_CACHE_MAX_AGE_ENV = "PAGE_CACHE_MAX_AGE"
+DEFAULT_PATH = ".cache/pages.sqlite"
+DEFAULT_MAX_MB = 256
+DEFAULT_MAX_AGE_SECONDS = 60 * 60
+
+
+class PageCache:
+    """URL-keyed cache of the text extracted from web pages, stored in SQLite
+
+    Pages validated less than max_age_seconds ago are served without a
+    request. Older pages are revalidated with If-None-Match and
+    If-Modified-Since, so an unchanged page costs a 304 instead of a download
+    and a new extraction. Text is stored once per content hash however many
+    URLs share it, and when the stored text exceeds max_bytes the least
+    recently used pages are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT NOT NULL,
+                extractor TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                validated_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (url, extractor)
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)"
+        )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS contents (
+                hash TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+
+    def fetch(
+        self,
+        url: str,
+        extractor: str,
+        extract: Callable[[requests.Response], str],
+        **request_kwargs: Any,
+    ) -> str:
+        """Return the text of a page, downloading it only when it changed
+
+        extract turns a response into the text to cache and names the
+        extractor so the same URL can be cached in several formats.
+        request_kwargs are passed on to the shared session's get.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag, last_modified, validated_at, text FROM pages"
+                " JOIN contents ON contents.hash = pages.content_hash"
+                " WHERE url = ? AND extractor = ?",
+                (url, extractor),
+            ).fetchone()
+            if row is not None and time.time() - row[2] < self.max_age_seconds:
+                self.hits += 1
+                self._touch(url, extractor)
+                return row[3]
+
+        headers = dict(request_kwargs.pop("headers", None) or {})
+        if row is not None:
+            etag, last_modified = row[0], row[1]
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        response = get_http_session().get(url, headers=headers, **request_kwargs)
+
+        if row is not None and response.status_code == 304:
+            with self._lock:
+                self.revalidated += 1
+                self._connection.execute(
+                    "UPDATE pages SET validated_at = ?,"
+                    " etag = COALESCE(?, etag),"
+                    " last_modified = COALESCE(?, last_modified)"
+                    " WHERE url = ? AND extractor = ?",
+                    (
+                        time.time(),
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                        url,
+                        extractor,
+                    ),
+                )
+                self._touch(url, extractor)
+            return row[3]
+
+        text = extract(response)
+        # Error pages and partial responses are returned but never cached
+        if response.status_code == 200:
+            with self._lock:
+                self.misses += 1
+                self._store(url, extractor, text, response.headers)
+        return text
+
+    def _touch(self, url: str, extractor: str) -> None:
+        self._connection.execute(
+            "UPDATE pages SET last_access = ? WHERE url = ? AND extractor = ?",
+            (time.time(), url, extractor),
+        )
+
+    def _store(self, url: str, extractor: str, text: str, headers: Any) -> None:
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        inserted = self._connection.execute(
+            "INSERT OR IGNORE INTO contents (hash, text, size) VALUES (?, ?, ?)",
+            (content_hash, text, len(text.encode("utf-8"))),
+        ).rowcount
+        if not inserted:
+            self.deduplicated += 1
+
+        now = time.time()
+        self._connection.execute(
+            "INSERT OR REPLACE INTO pages (url, extractor, content_hash, etag,"
+            " last_modified, validated_at, last_access)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                url,
+                extractor,
+                content_hash,
+                headers.get("ETag"),
+                headers.get("Last-Modified"),
+                now,
+                now,
+            ),
+        )
+        # The page may have pointed to text that nothing else uses any more
+        self._delete_orphaned_contents()
+        self._evict()
+
+    def _delete_orphaned_contents(self) -> None:
+        self._connection.execute(
+            "DELETE FROM contents WHERE hash NOT IN (SELECT content_hash FROM pages)"
+        )
+
+    def _evict(self) -> None:
+        (total,) = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM contents"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._connection.execute(
+            "SELECT url, extractor FROM pages ORDER BY last_access"
+        ).fetchall()
+        for url, extractor in rows:
+            if total <= self.max_bytes:
+                break
+            self._connection.execute(
+                "DELETE FROM pages WHERE url = ? AND extractor = ?", (url, extractor)
+            )
+            self._delete_orphaned_contents()
+            (total,) = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM contents"
+            ).fetchone()
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (pages,) = self._connection.execute("SELECT COUNT(*) FROM pages").fetchone()
+            contents, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM contents"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "deduplicated": self.deduplicated,
+            "evictions": self.evictions,
+            "pages": pages,
+            "contents": contents,
+            "bytes": size,
+        }
+
+
+_default_cache: Optional[PageCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """Returns the process-wide cache, or None when caching is turned off"""
+    global _default_cache
+    path = os.getenv(PAGE_CACHE_PATH_ENV, DEFAULT_PATH)
+    if not path:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None or _default_cache.path != path:
+            max_mb = float(os.getenv(PAGE_CACHE_MAX_MB_ENV, DEFAULT_MAX_MB))
+            max_age_seconds = float(
+                os.getenv(PAGE_CACHE_MAX_AGE_ENV, DEFAULT_MAX_AGE_SECONDS)
+            )
+            _default_cache = PageCache(
+                path,
+                max_bytes=int(max_mb * 1024 * 1024),
+                max_age_seconds=max_age_seconds,
+            )
+        return _default_cache
+
+
+def extract_page_content(response: requests.Response) -> str:
+    """The main content of a page with its boilerplate stripped"""
+    response.encoding = response.apparent_encoding
+    return extract_main_content(response.text)
+
+
+def fit_to_token_budget(url: str, text: str, max_tokens: int) -> str:
+    """Cut page text to the token budget and record how much was dropped"""
+    started = time.perf_counter()
+    text, kept, total = truncate_to_token_budget(text, max_tokens)
+    tracer = get_tracer()
+    if tracer is not None:
+        tracer.record(
+            "page_extract",
+            url,
+            wall_s=time.perf_counter() - started,
+            kept_tokens=kept,
+            dropped_tokens=total - kept,
+        )
+    return text
@@ -0,0 +1,187 @@
+import os
+import re
+from typing import List, Tuple
+
+from bs4 import BeautifulSoup, Tag
+
+# Pages handed to an agent are cut to this many tokens unless the tool or
+# PAGE_MAX_TOKENS says otherwise
+PAGE_MAX_TOKENS_ENV = "PAGE_MAX_TOKENS"
+DEFAULT_MAX_TOKENS = 4000
+
+BOILERPLATE_TAGS = (
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "iframe",
+    "svg",
+    "canvas",
+    "form",
+    "button",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+)
+BOILERPLATE_ROLES = {"navigation", "banner", "contentinfo", "complementary", "search"}
+# Matched against the words of class and id attributes
+BOILERPLATE_NAMES = re.compile(
+    r"(^|[-_ ])(nav|navbar|menu|footer|sidebar|breadcrumbs?|cookie|cookies|"
+    r"banner|share|social|advert|ads|promo|related|comments?|subscribe|"
+    r"newsletter|popup|modal|skip)([-_ ]|$)",
+    re.IGNORECASE,
+)
+BLOCK_TAGS = (
+    "p",
+    "div",
+    "section",
+    "article",
+    "main",
+    "table",
+    "tr",
+    "ul",
+    "ol",
+    "dl",
+    "blockquote",
+    "figure",
+)
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_CODE_PLACEHOLDER = "\x00code{}\x00"
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count: every word and punctuation mark is one token"""
+    return len(_TOKEN.findall(text))
+
+
+def default_max_tokens() -> int:
+    return int(os.getenv(PAGE_MAX_TOKENS_ENV, DEFAULT_MAX_TOKENS))
+
+
+def _is_boilerplate(tag: Tag) -> bool:
+    # Wrappers around the main content are kept whatever they are called
+    if tag.name in ("html", "body", "main", "article") or tag.find(
+        ["main", "article", "h1"]
+    ):
+        return False
+    if tag.get("role") in BOILERPLATE_ROLES:
+        return True
+    names = " ".join(tag.get("class") or []) + " " + (tag.get("id") or "")
+    return bool(BOILERPLATE_NAMES.search(names))
+
+
+def extract_main_content(html: str) -> str:
+    """Markdown-style text of the main content of an HTML page
+
+    Scripts, styles, navigation, headers, footers, sidebars and elements
+    whose class or id marks them as boilerplate are dropped. Headings become
+    markdown headings, list items become bullets and code blocks are kept
+    verbatim in fences.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup.find_all(BOILERPLATE_TAGS):
+        # The header of an article usually holds its title
+        if tag.name == "header" and tag.find_parent(["article", "main"]):
+            continue
+        if not tag.decomposed:
+            tag.decompose()
+    for tag in soup.find_all(_is_boilerplate):
+        if not tag.decomposed:
+            tag.decompose()
+
+    root = (
+        soup.find("main")
+        or soup.find(attrs={"role": "main"})
+        or soup.find("article")
+        or soup.body
+        or soup
+    )
+
+    code_blocks: List[str] = []
+    for pre in root.find_all("pre"):
+        code_blocks.append(pre.get_text().strip("\n"))
+        pre.replace_with(
+            "\n\n" + _CODE_PLACEHOLDER.format(len(code_blocks) - 1) + "\n\n"
+        )
+    for code in root.find_all("code"):
+        code.replace_with(f"`{code.get_text()}`")
+    for level in range(1, 7):
+        for heading in root.find_all(f"h{level}"):
+            title = heading.get_text(" ", strip=True)
+            heading.replace_with(f"\n\n{'#' * level} {title}\n\n" if title else "")
+    for item in root.find_all("li"):
+        item.insert(0, "\n- ")
+    for block in root.find_all(BLOCK_TAGS):
+        block.insert(0, "\n\n")
+        block.append("\n\n")
+    for cell in root.find_all(["td", "th"]):
+        cell.append(" ")
+    for line_break in root.find_all("br"):
+        line_break.replace_with("\n")
+
+    lines = (" ".join(line.split()) for line in root.get_text().splitlines())
+    text = re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+    # Items of the same list go on consecutive lines
+    text = re.sub(r"^(- .*)\n\n(?=- )", r"\1\n", text, flags=re.MULTILINE)
+    for index, code in enumerate(code_blocks):
+        text = text.replace(_CODE_PLACEHOLDER.format(index), f"```\n{code}\n```")
+    return text
+
+
+def _blocks(text: str) -> List[str]:
+    """Paragraphs of the text, keeping each code fence in a single block"""
+    blocks, current, in_fence = [], [], False
+    for line in text.split("\n"):
+        if line.startswith("```"):
+            in_fence = not in_fence
+        if not line and not in_fence:
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def truncate_to_token_budget(text: str, max_tokens: int) -> Tuple[str, int, int]:
+    """Cut text to at most max_tokens, preferring whole paragraphs
+
+    Returns the text, the tokens kept and the tokens of the whole text. When
+    anything is dropped a note says how much, and lists the headings of the
+    sections that were cut so the agent knows what it is missing.
+    """
+    total = count_tokens(text)
+    if max_tokens <= 0 or total <= max_tokens:
+        return text, total, total
+
+    kept: List[str] = []
+    used = 0
+    blocks = _blocks(text)
+    for position, block in enumerate(blocks):
+        tokens = count_tokens(block)
+        if used + tokens > max_tokens:
+            if not kept:
+                # Not even the first paragraph fits, so cut inside it
+                cut = list(_TOKEN.finditer(block))[max_tokens - 1].end()
+                kept.append(block[:cut])
+                used = max_tokens
+            break
+        kept.append(block)
+        used += tokens
+    else:
+        position = len(blocks)
+
+    dropped_headings = [
+        block for block in blocks[position:] if re.match(r"#{1,6} ", block)
+    ]
+    note = (
+        f"[Truncated: kept {used} of {total} tokens,"
+        f" dropped {total - used} ({(total - used) / total:.0%})]"
+    )
+    if dropped_headings:
+        note += "\n[Sections not shown: " + "; ".join(dropped_headings) + "]"
+    return "\n\n".join(kept + [note]), used, total
@@ -0,0 +1,154 @@
+import json
+import os
+import re
+from typing import Iterable, List, Optional, Union
+
+import yaml
+from pydantic import BaseModel
+
+ROADMAP_PATH = "output/Blog_Series_Roadmap.md"
+# Extensions of the structured sidecar, in the order they are looked for
+SIDECAR_EXTENSIONS = (".json", ".yaml", ".yml")
+
+_HEADING = re.compile(r"^(#{1,6})(?:\s+(.*?))?(?:\s+#+)?\s*$")
+# "3. Title", "3) Title" or "Post 3: Title"
+_POST_NUMBER = re.compile(r"^(?:post\s+)?\d+\s*[.):-]\s*", re.IGNORECASE)
+_SECTION = re.compile(
+    r"^(topic|goals?|planned posts|posts)\b\s*:?\s*(.*)$", re.IGNORECASE
+)
+
+
+class BlogPostOutline(BaseModel):
+    """Model for a single blog post outline"""
+
+    title: str
+    description: str
+
+
+class Roadmap(BaseModel):
+    """A blog series: its topic, its goal and the posts planned for it"""
+
+    topic: str = ""
+    goal: str = ""
+    posts: List[BlogPostOutline] = []
+
+
+def render_markdown(roadmap: Roadmap) -> str:
+    """The roadmap as the markdown file people read and edit"""
+    parts = [
+        "# Blog Series Roadmap\n\n",
+        f"## Topic: {roadmap.topic}\n\n",
+        f"## Goal\n{roadmap.goal}\n\n",
+        "## Planned Posts\n\n",
+    ]
+    for i, post in enumerate(roadmap.posts, 1):
+        parts.append(f"### {i}. {post.title}\n\n{post.description}\n\n")
+    return "".join(parts)
+
+
+def parse_markdown(source: Union[str, Iterable[str]]) -> Roadmap:
+    """Read a roadmap from its markdown in a single pass over the lines
+
+    source is the markdown text or an iterable of its lines, such as an open
+    file. Headings are matched line by line, so the time taken grows linearly
+    with the number of posts, and the blank lines around headings, the
+    heading levels of the sections and the numbering of the posts may vary.
+    Lines inside code fences are never taken for headings.
+    """
+    if isinstance(source, str):
+        source = source.splitlines()
+
+    topic: List[str] = []
+    goal: List[str] = []
+    posts: List[tuple] = []
+    current: Optional[List[str]] = None
+    in_posts = False
+    post_level = None
+    in_fence = False
+
+    for line in source:
+        line = line.rstrip("\r\n")
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+            heading = None
+        else:
+            heading = None if in_fence else _HEADING.match(line)
+        if heading is not None:
+            level, text = len(heading.group(1)), heading.group(2) or ""
+            section = _SECTION.match(text) if level <= 2 else None
+            if section is not None:
+                name, inline = section.group(1).lower(), section.group(2)
+                in_posts = name in ("planned posts", "posts")
+                current = None if in_posts else topic if name == "topic" else goal
+                if current is not None and inline:
+                    current.append(inline)
+                continue
+            # Deeper headings inside a description are part of it
+            if in_posts and level >= 3 and level <= (post_level or level):
+                post_level = level
+                current = []
+                posts.append((_POST_NUMBER.sub("", text), current))
+                continue
+            if level <= 2:
+                # A section of its own, such as the title of the file
+                current = None
+                in_posts = False
+                continue
+        if current is not None:
+            current.append(line)
+
+    return Roadmap(
+        topic="\n".join(topic).strip(),
+        goal="\n".join(goal).strip(),
+        posts=[
+            BlogPostOutline(title=title, description="\n".join(lines).strip())
+            for title, lines in posts
+        ],
+    )
+
+
+def sidecar_path(path: str) -> Optional[str]:
+    """The structured sidecar saved next to a markdown roadmap, if any"""
+    base = os.path.splitext(path)[0]
+    for extension in SIDECAR_EXTENSIONS:
+        if os.path.exists(base + extension):
+            return base + extension
+    return None
+
+
+def _load_structured(path: str) -> Roadmap:
+    with open(path, "r", encoding="utf-8") as file:
+        text = file.read()
+    data = json.loads(text) if path.endswith(".json") else yaml.safe_load(text)
+    if not isinstance(data, dict):
+        raise ValueError(f"Roadmap {path} is not a mapping")
+    return Roadmap(**data)
+
+
+def load_roadmap(path: str) -> Roadmap:
+    """Read a roadmap from its markdown file or its structured sidecar
+
+    A JSON or YAML path is read as it is. For a markdown path the sidecar
+    saved next to it is read instead, unless the markdown was edited after
+    the sidecar was written.
+    """
+    if path.endswith(SIDECAR_EXTENSIONS):
+        return _load_structured(path)
+    sidecar = sidecar_path(path)
+    if sidecar is not None and os.path.getmtime(sidecar) >= os.path.getmtime(path):
+        return _load_structured(sidecar)
+    with open(path, "r", encoding="utf-8") as file:
+        return parse_markdown(file)
+
+
+def save_roadmap(roadmap: Roadmap, path: str = ROADMAP_PATH) -> str:
+    """Write the markdown roadmap and its JSON sidecar, returning the path"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(render_markdown(roadmap))
+    # Written second so that it is never older than the markdown
+    with open(os.path.splitext(path)[0] + ".json", "w", encoding="utf-8") as file:
+        file.write(roadmap.model_dump_json(indent=2))
+    return path
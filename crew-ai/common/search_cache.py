@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Results are always shared within the process. Setting SEARCH_CACHE_PATH also
+# keeps them on disk so later runs can reuse them, and SEARCH_CACHE_TTL=0
+# turns the cache off entirely
+SEARCH_CACHE_PATH_ENV = "SEARCH_CACHE_PATH"
+SEARCH_CACHE_TTL_ENV = "SEARCH_CACHE_TTL"
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+# Results kept in memory; the least recently used are dropped beyond it
+SEARCH_CACHE_MAX_ENTRIES_ENV = "SEARCH_CACHE_MAX_ENTRIES"
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase a query and collapse whitespace and trailing punctuation"""
+    query = " ".join(str(query).lower().split())
+    return re.sub(r"[\s?!.]+$", "", query)
+
+
+class _Flight:
+    """A search that is in progress, shared by every caller asking for it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SearchCache:
+    """Web-search result cache with TTL expiry and single-flight lookups
+
+    Results are keyed by the search provider, the normalized query and any
+    parameters that change the results. Fresh results are served from memory
+    first and then from the optional SQLite file. Memory holds at most
+    max_entries results and evicts the least recently used ones. Concurrent
+    lookups of the same key wait for the request already in flight instead of
+    sending their own.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        path: Optional[str] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+        self._connection = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(
+                path, check_same_thread=False, isolation_level=None
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+
+    @staticmethod
+    def make_key(provider: str, query: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps(
+            {"provider": provider, "query": normalize_query(query), "params": params},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str, now: float) -> Tuple[bool, Any]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                return True, entry[1]
+            del self._memory[key]
+
+        if self._connection is not None:
+            row = self._connection.execute(
+                "SELECT result, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                if row[1] > now:
+                    result = json.loads(row[0])
+                    self._remember(key, row[1], result)
+                    return True, result
+                self._connection.execute("DELETE FROM results WHERE key = ?", (key,))
+        return False, None
+
+    def _remember(self, key: str, expires_at: float, result: Any) -> None:
+        self._memory[key] = (expires_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _store(self, key: str, result: Any) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, expires_at, result)
+        if self._connection is not None:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (key, result, expires_at)"
+                " VALUES (?, ?, ?)",
+                (key, json.dumps(result), expires_at),
+            )
+
+    def get_or_search(
+        self,
+        provider: str,
+        query: str,
+        search: Callable[[], Any],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """Return the cached result for a query, running search() on a miss"""
+        key = self.make_key(provider, query, params or {})
+        with self._lock:
+            found, result = self._lookup(key, time.time())
+            if found:
+                self.hits += 1
+                return result
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = search()
+        except BaseException as error:
+            # Failures are handed to the waiting callers but never cached
+            flight.error = error
+            raise
+        else:
+            with self._lock:
+                self._store(key, flight.result)
+            return flight.result
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared": self.shared,
+                "evictions": self.evictions,
+                "entries": len(self._memory),
+            }
+
+
+_default_cache: Optional[SearchCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Returns the process-wide cache, or None when caching is turned off"""
+    global _default_cache
+    ttl_seconds = float(os.getenv(SEARCH_CACHE_TTL_ENV, DEFAULT_TTL_SECONDS))
+    if ttl_seconds <= 0:
+        return None
+    path = os.getenv(SEARCH_CACHE_PATH_ENV) or None
+    max_entries = int(os.getenv(SEARCH_CACHE_MAX_ENTRIES_ENV, DEFAULT_MAX_ENTRIES))
+    with _default_cache_lock:
+        if (
+            _default_cache is None
+            or _default_cache.path != path
+            or _default_cache.ttl_seconds != ttl_seconds
+            or _default_cache.max_entries != max(1, max_entries)
+        ):
+            _default_cache = SearchCache(
+                ttl_seconds, path=path, max_entries=max_entries
+            )
+        return _default_cache
@@ -0,0 +1,35 @@
+import pytest
+
+crewai = pytest.importorskip("crewai")
+
+from common.crew.estimate import ANSWER_TOKENS, estimate_crew  # noqa: E402
+
+
+@pytest.fixture
+def crew(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    writer = crewai.Agent(
+        role="{topic} writer", goal="Write", backstory="Writes", llm="gpt-4o-mini"
+    )
+    research = crewai.Task(
+        description="Research {topic}", expected_output="Notes", agent=writer
+    )
+    write = crewai.Task(
+        description="Write about {topic}", expected_output="A post", agent=writer
+    )
+    return crewai.Crew(agents=[writer], tasks=[research, write])
+
+
+def test_renders_the_inputs_without_changing_the_crew(crew):
+    rows = estimate_crew(crew, {"topic": "Rust"}, "post")
+
+    assert [row.agent for row in rows] == ["Rust writer", "Rust writer"]
+    assert crew.agents[0].role == "{topic} writer"
+    assert crew.tasks[0].description == "Research {topic}"
+    # The second task is sent the answer of the first
+    assert rows[0].prompt_tokens < ANSWER_TOKENS < rows[1].prompt_tokens
+
+
+def test_missing_input_is_reported(crew):
+    with pytest.raises(ValueError, match="topic"):
+        estimate_crew(crew, {"goal": "Teach"}, "post")
@@ -0,0 +1,114 @@
+import sys
+
+import pytest
+
+crewai = pytest.importorskip("crewai")
+
+from common.crew.llm import CachedLLM  # noqa: E402
+from common.crew.model_router import RoutedLLM  # noqa: E402
+from common.crew.tracing import TracedLLM  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "Say hello"}]
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Replaces crewai's LLM.call and records the arguments it gets"""
+    calls = []
+
+    def call(self, messages, *args, **kwargs):
+        calls.append({"model": self.model, "args": args, "kwargs": kwargs})
+        return "hello"
+
+    monkeypatch.setattr(crewai.LLM, "call", call)
+    monkeypatch.delenv("LLM_CACHE_PATH", raising=False)
+    return calls
+
+
+@pytest.mark.parametrize("llm_class", [TracedLLM, CachedLLM])
+def test_callbacks_are_passed_by_keyword(llm_calls, llm_class):
+    callback = object()
+
+    llm_class(model="gpt-4o-mini").call(MESSAGES, callbacks=[callback])
+
+    assert llm_calls[0]["args"] == ()
+    assert llm_calls[0]["kwargs"]["callbacks"] == [callback]
+    assert not llm_calls[0]["kwargs"].get("tools")
+
+
+def test_routed_llm_passes_tools_and_functions_on(llm_calls):
+    tools = [{"type": "function", "function": {"name": "search"}}]
+    functions = {"search": lambda: None}
+
+    RoutedLLM("test.route", ["gpt-4o-mini"]).call(
+        MESSAGES, tools=tools, available_functions=functions
+    )
+
+    assert llm_calls[0]["kwargs"]["tools"] == tools
+    assert llm_calls[0]["kwargs"]["available_functions"] == functions
+
+
+@pytest.fixture
+def completions(monkeypatch, tmp_path):
+    """Counts the requests litellm makes, with the LLM cache turned on"""
+    import litellm
+
+    requests = []
+    completion = litellm.completion
+
+    def counted_completion(*args, **kwargs):
+        requests.append(kwargs)
+        return completion(*args, **kwargs)
+
+    monkeypatch.setattr(litellm, "completion", counted_completion)
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.sqlite"))
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    return requests
+
+
+def test_repeated_call_is_served_from_the_cache(completions):
+    # mock_response is passed on to litellm, which answers without a request
+    llm = CachedLLM(model="gpt-4o-mini", temperature=0, mock_response="hello")
+
+    assert llm.call(MESSAGES) == "hello"
+    assert llm.call(MESSAGES) == "hello"
+    assert len(completions) == 1
+    assert llm.sampling_params()["mock_response"] == "hello"
+
+
+def test_sampling_params_are_part_of_the_cache_key(completions):
+    CachedLLM(model="gpt-4o-mini", temperature=0, mock_response="a").call(MESSAGES)
+    CachedLLM(model="gpt-4o-mini", temperature=1, mock_response="a").call(MESSAGES)
+
+    assert len(completions) == 2
+
+
+def test_stream_uses_the_api_base_and_the_cache(completions):
+    llm = CachedLLM(
+        model="gpt-4o-mini", base_url="http://localhost:9/v1", mock_response="hi"
+    )
+
+    assert "".join(llm.stream(MESSAGES)) == "hi"
+    assert "".join(llm.stream(MESSAGES)) == "hi"
+    assert len(completions) == 1
+    assert completions[0]["api_base"] == "http://localhost:9/v1"
+
+
+def test_calls_leave_the_output_streams_in_place(monkeypatch, completions):
+    import litellm
+
+    streams = []
+    completion = litellm.completion
+
+    def completion_seeing_stdout(*args, **kwargs):
+        streams.append(sys.stdout)
+        return completion(*args, **kwargs)
+
+    # Replacing sys.stdout during a call crashes concurrent crews that print
+    monkeypatch.setattr(litellm, "completion", completion_seeing_stdout)
+    stdout = sys.stdout
+
+    CachedLLM(model="gpt-4o-mini", mock_response="hello").call(MESSAGES)
+
+    assert streams == [stdout]
+    assert sys.stdout is stdout
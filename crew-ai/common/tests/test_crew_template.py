@@ -0,0 +1,51 @@
+import pytest
+
+crewai = pytest.importorskip("crewai")
+
+from common.crew.templates import CrewTemplate  # noqa: E402
+from common.crew.tracing import TracedAgent, TracedTask  # noqa: E402
+
+
+@pytest.fixture
+def template(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+    def build():
+        writer = TracedAgent(
+            role="Writer", goal="Write", backstory="Writes", llm="gpt-4o-mini"
+        )
+        research = TracedTask(
+            description="Research the topic",
+            expected_output="Notes",
+            agent=writer,
+            async_execution=True,
+        )
+        write = TracedTask(
+            description="Write the post",
+            expected_output="A post",
+            agent=writer,
+            context=[research],
+        )
+        return crewai.Crew(agents=[writer], tasks=[research, write])
+
+    return CrewTemplate(build)
+
+
+def test_copies_keep_the_task_and_agent_classes(template):
+    crew = template.crew()
+
+    assert [type(task) for task in crew.tasks] == [TracedTask, TracedTask]
+    assert type(crew.agents[0]) is TracedAgent
+    assert crew.tasks[0].async_execution
+
+
+def test_copies_are_independent_of_the_prototype(template):
+    prototype = template.prototype()
+    crew = template.crew()
+
+    assert crew.tasks[0] is not prototype.tasks[0]
+    # The context points to the copied task, and the task to the copied agent
+    assert crew.tasks[1].context == [crew.tasks[0]]
+    assert crew.tasks[1].context[0] is crew.tasks[0]
+    assert crew.tasks[0].agent is crew.agents[0]
+    assert crew.agents[0] is not prototype.agents[0]
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+crewai = pytest.importorskip("crewai")
+
+from common.crew.templates import CrewTemplate  # noqa: E402
+from common.crew.tracing import TracedAgent, TracedLLM, TracedTask  # noqa: E402
+from common.tracing import start_tracing, stop_tracing, trace_span  # noqa: E402
+
+
+@pytest.fixture
+def template(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    monkeypatch.delenv("LLM_CACHE_PATH", raising=False)
+
+    def build():
+        # litellm answers with mock_response instead of calling the API
+        llm = TracedLLM(
+            model="gpt-4o-mini",
+            mock_response="Thought: I know the answer\nFinal Answer: Done",
+        )
+        researcher = TracedAgent(
+            role="Researcher", goal="Research", backstory="Researches", llm=llm
+        )
+        writer = TracedAgent(role="Writer", goal="Write", backstory="Writes", llm=llm)
+        research = TracedTask(
+            description="Research the topic",
+            expected_output="Notes",
+            agent=researcher,
+            async_execution=True,
+        )
+        write = TracedTask(
+            description="Write the post",
+            expected_output="A post",
+            agent=writer,
+            context=[research],
+        )
+        return crewai.Crew(agents=[researcher, writer], tasks=[research, write])
+
+    return CrewTemplate(build)
+
+
+def test_async_task_spans_attach_to_the_kickoff_trace(template, tmp_path):
+    tracer = start_tracing("test-run", str(tmp_path))
+    try:
+        with trace_span("crew", "Test"):
+            template.crew().kickoff()
+    finally:
+        stop_tracing()
+
+    events = [json.loads(line) for line in tracer.path.read_text().splitlines()]
+    tasks = {event["agent"]: event for event in events if event["kind"] == "task"}
+    llm_calls = [event for event in events if event["kind"] == "llm_call"]
+    (crew,) = [event for event in events if event["kind"] == "crew"]
+
+    assert set(tasks) == {"Researcher", "Writer"}
+    assert {call["agent"] for call in llm_calls} == {"Researcher", "Writer"}
+    # The async task's LLM call rolls up into the crew span like the other's
+    assert crew["llm_calls"] == len(llm_calls)
+    assert crew["prompt_tokens"] == sum(call["prompt_tokens"] for call in llm_calls)
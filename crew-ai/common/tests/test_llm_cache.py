@@ -0,0 +1,42 @@
+from common.llm_cache import LLMResponseCache, get_llm_cache
+
+MESSAGES = [{"role": "user", "content": "Say hello"}]
+
+
+def test_keys_change_with_the_model_messages_and_params():
+    key = LLMResponseCache.make_key("gpt-4o", MESSAGES, {"temperature": 0})
+
+    assert key == LLMResponseCache.make_key("gpt-4o", MESSAGES, {"temperature": 0})
+    assert key != LLMResponseCache.make_key("gpt-4o-mini", MESSAGES, {"temperature": 0})
+    assert key != LLMResponseCache.make_key("gpt-4o", MESSAGES, {"temperature": 1})
+
+
+def test_responses_persist_across_caches(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    cache = LLMResponseCache(path)
+    assert cache.get("key") is None
+    cache.put("key", "hello")
+
+    reopened = LLMResponseCache(path)
+    assert reopened.get("key") == "hello"
+    assert reopened.stats()["hits"] == 1
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite"), max_bytes=10)
+    cache.put("old", "12345")
+    cache.put("used", "12345")
+    cache.get("old")
+    cache.put("new", "12345")
+
+    assert cache.get("used") is None
+    assert cache.get("old") == "12345"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_is_off_unless_a_path_is_set(monkeypatch, tmp_path):
+    monkeypatch.delenv("LLM_CACHE_PATH", raising=False)
+    assert get_llm_cache() is None
+
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.sqlite"))
+    assert get_llm_cache() is get_llm_cache()
@@ -0,0 +1,130 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from common.page_cache import PageCache
+
+
+class Page:
+    """The page the test server serves, and the requests it received"""
+
+    def __init__(self):
+        self.body = "<p>first version</p>"
+        self.etag = '"v1"'
+        self.last_modified = "Mon, 05 Oct 2026 10:00:00 GMT"
+        self.requests = []
+
+
+@pytest.fixture
+def page():
+    page = Page()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            page.requests.append(dict(self.headers))
+            if page.etag and self.headers.get("If-None-Match") == page.etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = page.body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            if page.etag:
+                self.send_header("ETag", page.etag)
+            if page.last_modified:
+                self.send_header("Last-Modified", page.last_modified)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    page.url = f"http://127.0.0.1:{server.server_port}/post"
+    yield page
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def extract_text(response):
+    return response.text
+
+
+def make_cache(tmp_path, max_age_seconds):
+    return PageCache(str(tmp_path / "pages.sqlite"), max_age_seconds=max_age_seconds)
+
+
+def test_200_is_stored_with_its_validators(tmp_path, page):
+    cache = make_cache(tmp_path, max_age_seconds=3600)
+
+    assert cache.fetch(page.url, "text", extract_text) == page.body
+    assert cache.fetch(page.url, "text", extract_text) == page.body
+
+    # The second fetch is served from the cache without a request
+    assert len(page.requests) == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+    etag, last_modified = cache._connection.execute(
+        "SELECT etag, last_modified FROM pages WHERE url = ?", (page.url,)
+    ).fetchone()
+    assert etag == page.etag
+    assert last_modified == page.last_modified
+
+
+def test_304_reuses_the_cached_body(tmp_path, page):
+    cache = make_cache(tmp_path, max_age_seconds=0)
+    extracted = []
+
+    def extract(response):
+        extracted.append(response.status_code)
+        return response.text
+
+    first = cache.fetch(page.url, "text", extract)
+    second = cache.fetch(page.url, "text", extract)
+
+    assert second == first == page.body
+    assert page.requests[1]["If-None-Match"] == page.etag
+    assert page.requests[1]["If-Modified-Since"] == page.last_modified
+    # The 304 is not extracted again
+    assert extracted == [200]
+    assert cache.stats()["revalidated"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_changed_etag_refreshes_the_body(tmp_path, page):
+    cache = make_cache(tmp_path, max_age_seconds=0)
+    cache.fetch(page.url, "text", extract_text)
+
+    page.body = "<p>second version</p>"
+    page.etag = '"v2"'
+
+    assert cache.fetch(page.url, "text", extract_text) == "<p>second version</p>"
+    assert page.requests[1]["If-None-Match"] == '"v1"'
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["revalidated"] == 0
+    # The first version is no longer referenced, so its text is dropped
+    assert cache.stats()["contents"] == 1
+    (etag,) = cache._connection.execute(
+        "SELECT etag FROM pages WHERE url = ?", (page.url,)
+    ).fetchone()
+    assert etag == '"v2"'
+
+
+def test_expired_page_without_validators_is_downloaded_again(tmp_path, page):
+    page.etag = None
+    page.last_modified = None
+    cache = make_cache(tmp_path, max_age_seconds=0)
+
+    cache.fetch(page.url, "text", extract_text)
+    page.body = "<p>second version</p>"
+
+    assert cache.fetch(page.url, "text", extract_text) == "<p>second version</p>"
+    assert len(page.requests) == 2
+    assert "If-None-Match" not in page.requests[1]
+    assert "If-Modified-Since" not in page.requests[1]
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["revalidated"] == 0
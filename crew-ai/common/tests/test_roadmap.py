@@ -0,0 +1,65 @@
+import os
+
+from common.roadmap import (
+    BlogPostOutline,
+    Roadmap,
+    load_roadmap,
+    parse_markdown,
+    render_markdown,
+    save_roadmap,
+)
+
+ROADMAP = Roadmap(
+    topic="Rust",
+    goal="Teach ownership\nto Python developers",
+    posts=[
+        BlogPostOutline(title="Ownership", description="Moves and borrows"),
+        BlogPostOutline(title="Lifetimes", description="Why they exist"),
+    ],
+)
+
+
+def test_rendered_markdown_parses_back():
+    assert parse_markdown(render_markdown(ROADMAP)) == ROADMAP
+
+
+def test_hand_edited_markdown_is_parsed():
+    markdown = """# My series
+
+# Topic
+Rust
+
+## Goals: Teach ownership
+
+## Posts
+#### Post 1: Ownership
+Moves and borrows
+##### Example
+```
+# not a heading
+```
+
+#### 2) Lifetimes
+Why they exist
+"""
+
+    roadmap = parse_markdown(markdown)
+
+    assert roadmap.topic == "Rust"
+    assert roadmap.goal == "Teach ownership"
+    assert [post.title for post in roadmap.posts] == ["Ownership", "Lifetimes"]
+    assert "# not a heading" in roadmap.posts[0].description
+    assert "##### Example" in roadmap.posts[0].description
+
+
+def test_sidecar_is_read_unless_the_markdown_is_newer(tmp_path):
+    path = save_roadmap(ROADMAP, str(tmp_path / "roadmap.md"))
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("### 3. Traits\n\nShared behaviour\n")
+
+    # The sidecar is written last, so it is read until the markdown changes
+    assert load_roadmap(path) == ROADMAP
+    sidecar = str(tmp_path / "roadmap.json")
+    os.utime(path, (os.path.getmtime(sidecar) + 1,) * 2)
+    assert [post.title for post in load_roadmap(path).posts][-1] == "Traits"
+    assert load_roadmap(sidecar) == ROADMAP
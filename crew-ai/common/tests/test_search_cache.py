@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+from common.search_cache import SearchCache
+
+
+def test_results_are_reused_for_the_same_query_and_params():
+    cache = SearchCache()
+    searches = []
+
+    def search():
+        searches.append(1)
+        return ["result"]
+
+    assert cache.get_or_search("serper", "Rust traits?", search) == ["result"]
+    assert cache.get_or_search("serper", "  rust   TRAITS", search) == ["result"]
+    cache.get_or_search("serper", "rust traits", search, params={"n_results": 3})
+
+    assert len(searches) == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_concurrent_lookups_share_one_search():
+    cache = SearchCache()
+    release = threading.Event()
+    searches = []
+
+    def search():
+        searches.append(1)
+        release.wait(5)
+        return "result"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_search("ddg", "q", search))
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.stats()["shared"] < 3:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["result"] * 4
+    assert len(searches) == 1
+
+
+def test_failures_and_expired_results_are_searched_again():
+    cache = SearchCache(ttl_seconds=0)
+
+    def fail():
+        raise RuntimeError("rate limited")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_search("ddg", "q", fail)
+    assert cache.get_or_search("ddg", "q", lambda: "first") == "first"
+    assert cache.get_or_search("ddg", "q", lambda: "second") == "second"
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    path = str(tmp_path / "search.sqlite")
+    cache = SearchCache(path=path, max_entries=2)
+    for query in ("a", "b", "c"):
+        cache.get_or_search("ddg", query, lambda query=query: query)
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 2
+    # Evicted results are read back from disk, by this cache or a new one
+    assert cache.get_or_search("ddg", "a", lambda: "searched") == "a"
+    assert SearchCache(path=path).get_or_search("ddg", "b", lambda: "searched") == "b"
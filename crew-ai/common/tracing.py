@@ -0,0 +1,292 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Every run writes its trace to <TRACE_DIR>/<run id>.jsonl
+TRACE_DIR_ENV = "TRACE_DIR"
+DEFAULT_TRACE_DIR = "traces"
+
+# Column name, width and number format of the summary table
+SUMMARY_COLUMNS = (
+    ("kind", 12, ""),
+    ("name", 40, ""),
+    ("count", 7, "d"),
+    ("wall_s", 10, ".2f"),
+    ("queue_s", 10, ".2f"),
+    ("prompt_tokens", 15, "d"),
+    ("completion_tokens", 19, "d"),
+    ("retries", 9, "d"),
+    ("cost_usd", 10, ".4f"),
+)
+
+
+class Span:
+    """A unit of work in progress that LLM calls and agent steps roll up into"""
+
+    def __init__(self, kind: str, name: str, fields: Dict[str, Any]):
+        self.kind = kind
+        self.name = name
+        self.fields = fields
+        self.started = time.perf_counter()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.retries = 0
+        self.llm_calls = 0
+        # The largest prompt of a single LLM call made inside the span
+        self.peak_prompt_tokens = 0
+        # Used by the innermost span to time agent steps and tool calls
+        self.owner: Optional[Tuple[int, int]] = None
+        self.last_llm_end = self.started
+        self.last_step_end = self.started
+        self.step_llm_calls = 0
+        self.step_prompt_tokens = 0
+        self.step_completion_tokens = 0
+        self.step_cost_usd = 0.0
+
+    def end_step(self) -> Dict[str, Any]:
+        """Close the current agent step and return what it took
+
+        wall_s is the time since the previous step ended and tool_wall_s the
+        time since the last LLM call of the step, spent in the tool it ran.
+        """
+        now = time.perf_counter()
+        with _span_lock:
+            step = {
+                "wall_s": now - self.last_step_end,
+                "tool_wall_s": now - self.last_llm_end,
+                "llm_calls": self.step_llm_calls,
+                "prompt_tokens": self.step_prompt_tokens,
+                "completion_tokens": self.step_completion_tokens,
+                "cost_usd": self.step_cost_usd,
+            }
+            self.last_step_end = self.last_llm_end = now
+            self.step_llm_calls = 0
+            self.step_prompt_tokens = self.step_completion_tokens = 0
+            self.step_cost_usd = 0.0
+        return step
+
+
+_span_stack: ContextVar[Tuple[Span, ...]] = ContextVar("trace_spans", default=())
+_span_lock = threading.Lock()
+
+
+class RunTracer:
+    """Writes trace events for one run to a JSONL file and aggregates them
+
+    Each event records the wall time, queue time, prompt and completion
+    tokens, retries and estimated cost of a crew, task, agent run, agent
+    step, LLM call or tool call.
+    """
+
+    def __init__(self, run_id: str, path: str):
+        self.run_id = run_id
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._totals: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def record(
+        self,
+        kind: str,
+        name: str,
+        wall_s: float,
+        queue_s: float = 0.0,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        retries: int = 0,
+        cost_usd: float = 0.0,
+        **fields: Any,
+    ) -> None:
+        event = {
+            "run_id": self.run_id,
+            "timestamp": time.time(),
+            "kind": kind,
+            "name": name,
+            "wall_s": round(wall_s, 4),
+            "queue_s": round(queue_s, 4),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "retries": retries,
+            "cost_usd": round(cost_usd, 6),
+            **fields,
+        }
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            totals = self._totals.setdefault(
+                (kind, name),
+                {column: 0 for column, _, _ in SUMMARY_COLUMNS[2:]},
+            )
+            totals["count"] += 1
+            totals["wall_s"] += wall_s
+            totals["queue_s"] += queue_s
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens
+            totals["retries"] += retries
+            totals["cost_usd"] += cost_usd
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Totals per kind and name, slowest first"""
+        with self._lock:
+            rows = [
+                {"kind": kind, "name": name, **totals}
+                for (kind, name), totals in self._totals.items()
+            ]
+        return sorted(rows, key=lambda row: (row["kind"], -row["wall_s"]))
+
+    def format_summary(self) -> str:
+        lines = [
+            "".join(
+                f"{column:>{width}}" if number_format else f"{column:<{width}}"
+                for column, width, number_format in SUMMARY_COLUMNS
+            )
+        ]
+        for row in self.summary():
+            lines.append(
+                "".join(
+                    f"{row[column]:>{width}{number_format}}"
+                    if number_format
+                    else f"{str(row[column])[: width - 1]:<{width}}"
+                    for column, width, number_format in SUMMARY_COLUMNS
+                )
+            )
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+_tracer: Optional[RunTracer] = None
+
+
+def start_tracing(run_id: str, directory: Optional[str] = None) -> RunTracer:
+    """Start writing the trace of a run, replacing any active tracer"""
+    global _tracer
+    directory = directory or os.getenv(TRACE_DIR_ENV, DEFAULT_TRACE_DIR)
+    stop_tracing()
+    _tracer = RunTracer(run_id, os.path.join(directory, f"{run_id}.jsonl"))
+    return _tracer
+
+
+def get_tracer() -> Optional[RunTracer]:
+    return _tracer
+
+
+def stop_tracing() -> Optional[RunTracer]:
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+    return tracer
+
+
+@contextmanager
+def trace_span(kind: str, name: str, queue_s: float = 0.0, **fields: Any):
+    """Record the wall time and usage of the work done inside the block"""
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+
+    span = Span(kind, name, fields)
+    token = _span_stack.set(_span_stack.get() + (span,))
+    error = None
+    try:
+        yield span
+    except BaseException as exc:
+        error = repr(exc)
+        raise
+    finally:
+        _span_stack.reset(token)
+        tracer.record(
+            kind,
+            name,
+            wall_s=time.perf_counter() - span.started,
+            queue_s=queue_s,
+            prompt_tokens=span.prompt_tokens,
+            completion_tokens=span.completion_tokens,
+            retries=span.retries,
+            cost_usd=span.cost_usd,
+            llm_calls=span.llm_calls,
+            peak_prompt_tokens=span.peak_prompt_tokens,
+            error=error,
+            **fields,
+        )
+
+
+def current_spans() -> Tuple[Span, ...]:
+    """The spans the calling code runs inside, outermost first"""
+    return _span_stack.get()
+
+
+def current_span() -> Optional[Span]:
+    """The innermost span the calling code runs inside"""
+    stack = _span_stack.get()
+    return stack[-1] if stack else None
+
+
+def current_agent() -> Optional[str]:
+    """The agent of the innermost span that names one"""
+    for span in reversed(_span_stack.get()):
+        if "agent" in span.fields:
+            return span.fields["agent"]
+    return None
+
+
+def record_llm_call(
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    started: float,
+    cost_usd: float = 0.0,
+    cached: bool = False,
+    error: Optional[BaseException] = None,
+) -> None:
+    """Record an LLM call and roll its usage up into the enclosing spans
+
+    The framework adapters count the tokens and price them, since each
+    framework reports usage differently.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        return
+
+    now = time.perf_counter()
+    stack = _span_stack.get()
+    with _span_lock:
+        # Usage rolls up into every enclosing span, timing and the current
+        # step only into the innermost one
+        for span in stack:
+            span.prompt_tokens += prompt_tokens
+            span.completion_tokens += completion_tokens
+            span.cost_usd += cost_usd
+            span.llm_calls += 1
+            span.peak_prompt_tokens = max(span.peak_prompt_tokens, prompt_tokens)
+        if stack:
+            span = stack[-1]
+            span.last_llm_end = now
+            span.step_llm_calls += 1
+            span.step_prompt_tokens += prompt_tokens
+            span.step_completion_tokens += completion_tokens
+            span.step_cost_usd += cost_usd
+
+    tracer.record(
+        "llm_call",
+        model,
+        wall_s=now - started,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cost_usd=cost_usd,
+        agent=current_agent(),
+        cached=cached,
+        error=repr(error) if error is not None else None,
+    )
@@ -17,13 +17,17 @@ Usage:
 import logging
 import os
 import sys
+import uuid
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import typer
 from common.utils import get_openai_api_key, get_serper_api_key, load_configs
-from crewai import Agent, Crew, Task
-from crewai_tools import FileReadTool, MDXSearchTool, ScrapeWebsiteTool, SerperDevTool
+
+# crewai and its tools are imported where they are used, so --help does not
+# wait for them to load
+if TYPE_CHECKING:
+    from crewai import Agent, Task
 
 logging.basicConfig(
     level=logging.INFO,
@@ -36,7 +40,7 @@ app = typer.Typer(help="Tailor a resume for a specific job posting.")
 
 def create_agents(
     agents_config: dict[str, Any], resume_path: str, llm_name: str
-) -> tuple[Agent, Agent, Agent, Agent]:
+) -> tuple["Agent", "Agent", "Agent", "Agent"]:
     """
     Create and return the agents for the crew.
 
@@ -49,10 +53,14 @@ def create_agents(
         Tuple of agents (researcher, profiler, resume_strategist,
         interview_preparer)
     """
+    from common.crew.tools import CachedScrapeWebsiteTool
+    from common.crew.tracing import TracedAgent, TracedLLM
+    from crewai_tools import FileReadTool, MDXSearchTool, SerperDevTool
+
     # Initialize tools
     tools: dict[str, Any] = {
         "search": SerperDevTool(),
-        "scrape": ScrapeWebsiteTool(),
+        "scrape": CachedScrapeWebsiteTool(),
         "read_resume": FileReadTool(file_path=resume_path),
         "semantic_search": MDXSearchTool(mdx=resume_path),
     }
@@ -62,29 +70,29 @@ def create_agents(
     resume_tools: list[Any] = [tools["read_resume"], tools["semantic_search"]]
 
     # Create agents
-    researcher = Agent(
+    researcher = TracedAgent(
         config=agents_config["researcher_agent"],
         tools=common_tools,
-        llm=llm_name,
+        llm=TracedLLM(model=llm_name),
     )
 
-    profiler = Agent(
+    profiler = TracedAgent(
         config=agents_config["profiler_agent"],
         tools=common_tools + resume_tools,
-        llm=llm_name,
+        llm=TracedLLM(model=llm_name),
     )
 
-    resume_strategist = Agent(
+    resume_strategist = TracedAgent(
         config=agents_config["resume_strategist_agent"],
         tools=common_tools + resume_tools,
-        llm=llm_name,
+        llm=TracedLLM(model=llm_name),
         verbose=True,
     )
 
-    interview_preparer = Agent(
+    interview_preparer = TracedAgent(
         config=agents_config["interview_preparer_agent"],
         tools=common_tools + resume_tools,
-        llm=llm_name,
+        llm=TracedLLM(model=llm_name),
         verbose=True,
     )
 
@@ -93,9 +101,9 @@ def create_agents(
 
 def create_tasks(
     tasks_config: dict[str, Any],
-    agents: tuple[Agent, Agent, Agent, Agent],
+    agents: tuple["Agent", "Agent", "Agent", "Agent"],
     output_dir: str,
-) -> list[Task]:
+) -> list["Task"]:
     """
     Create and return the tasks for the crew.
 
@@ -107,10 +115,12 @@ def create_tasks(
     Returns:
         List of tasks for the crew to execute
     """
+    from common.crew.tracing import TracedTask
+
     researcher, profiler, resume_strategist, interview_preparer = agents
 
     # Task for Researcher Agent: Extract Job Requirements
-    research_task = Task(
+    research_task = TracedTask(
         description=tasks_config["research_task"]["description"],
         expected_output=tasks_config["research_task"]["expected_output"],
         agent=researcher,
@@ -118,7 +128,7 @@ def create_tasks(
     )
 
     # Task for Profiler Agent: Compile Comprehensive Profile
-    profile_task = Task(
+    profile_task = TracedTask(
         description=tasks_config["profile_task"]["description"],
         expected_output=tasks_config["profile_task"]["expected_output"],
         agent=profiler,
@@ -126,7 +136,7 @@ def create_tasks(
     )
 
     # Task for Resume Strategist Agent: Align Resume with Job Requirements
-    resume_strategy_task = Task(
+    resume_strategy_task = TracedTask(
         description=tasks_config["resume_strategy_task"]["description"],
         expected_output=(tasks_config["resume_strategy_task"]["expected_output"]),
         output_file=f"{output_dir}/tailored_resume.md",
@@ -135,7 +145,7 @@ def create_tasks(
     )
 
     # Task for Interview Preparer Agent: Develop Interview Materials
-    interview_preparation_task = Task(
+    interview_preparation_task = TracedTask(
         description=tasks_config["interview_preparation_task"]["description"],
         expected_output=(tasks_config["interview_preparation_task"]["expected_output"]),
         output_file=f"{output_dir}/interview_materials.md",
@@ -162,6 +172,8 @@ def setup_environment(output_dir: Path, model: str) -> Path:
     Returns:
         Path object for the output directory
     """
+    from common.http_pool import share_http_client
+
     # Ensure output directory exists
     output_dir.mkdir(exist_ok=True)
 
@@ -170,6 +182,9 @@ def setup_environment(output_dir: Path, model: str) -> Path:
     os.environ["OPENAI_MODEL_NAME"] = model
     os.environ["SERPER_API_KEY"] = get_serper_api_key()
 
+    # The agents' LLM calls share one pool of kept-alive connections
+    share_http_client()
+
     return output_dir
 
 
@@ -217,6 +232,11 @@ def tailor_resume(
     The output files (tailored_resume.md and interview_materials.md) are saved
     to the specified output directory.
     """
+    from common.http_pool import pool_stats
+    from common.page_cache import get_page_cache
+    from common.tracing import start_tracing, stop_tracing, trace_span
+    from crewai import Crew
+
     # Validate resume file is in markdown format
     if not validate_markdown_file(resume):
         logger.error(
@@ -254,7 +274,19 @@ def tailor_resume(
 
     # Run the crew
     logger.info(f"Starting job application crew with Markdown resume: {resume}")
-    result = job_application_crew.kickoff(inputs=job_application_inputs)
+    tracer = start_tracing(str(uuid.uuid4()), str(output_path / "traces"))
+    try:
+        with trace_span("crew", "JobApplicationCrew"):
+            result = job_application_crew.kickoff(inputs=job_application_inputs)
+    finally:
+        stop_tracing()
+        logger.info(f"Run summary:\n{tracer.format_summary()}")
+        logger.info(f"Trace written to {tracer.path}")
+
+    page_cache = get_page_cache()
+    if page_cache is not None:
+        logger.info(f"Page cache: {page_cache.stats()}")
+    logger.info(f"HTTP pools: {pool_stats()}")
 
     # Log completion message
     logger.info("Job application crew completed successfully!")
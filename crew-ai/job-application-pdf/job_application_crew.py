@@ -9,12 +9,11 @@ a tailored resume and interview preparation materials.
 
 import logging
 import os
+import uuid
 from pathlib import Path
 
 import typer
 from common.utils import get_openai_api_key, get_serper_api_key, load_configs
-from crewai import Agent, Crew, Task
-from crewai_tools import PDFSearchTool, ScrapeWebsiteTool, SerperDevTool
 
 # Configure logging
 logging.basicConfig(
@@ -29,10 +28,14 @@ app = typer.Typer(help="Convert LinkedIn PDF to tailored job application")
 
 def create_agents(config, linkedin_pdf_path, model_name):
     """Create and return agents with specialized roles."""
+    from common.crew.tools import CachedScrapeWebsiteTool
+    from common.crew.tracing import TracedAgent, TracedLLM
+    from crewai_tools import PDFSearchTool, SerperDevTool
+
     # Set up tools
     tools = {
         "search": SerperDevTool(),
-        "scrape": ScrapeWebsiteTool(),
+        "scrape": CachedScrapeWebsiteTool(),
         "pdf_search": PDFSearchTool(pdf=linkedin_pdf_path),
     }
 
@@ -42,29 +45,29 @@ def create_agents(config, linkedin_pdf_path, model_name):
     all_tools = common_tools + profile_tools
 
     # Create specialized agents
-    researcher = Agent(
+    researcher = TracedAgent(
         config=config["researcher_agent"],
         tools=common_tools,
-        llm=model_name,
+        llm=TracedLLM(model=model_name),
     )
 
-    profiler = Agent(
+    profiler = TracedAgent(
         config=config["profiler_agent"],
         tools=all_tools,
-        llm=model_name,
+        llm=TracedLLM(model=model_name),
     )
 
-    resume_strategist = Agent(
+    resume_strategist = TracedAgent(
         config=config["resume_strategist_agent"],
         tools=all_tools,
-        llm=model_name,
+        llm=TracedLLM(model=model_name),
         verbose=True,
     )
 
-    interview_preparer = Agent(
+    interview_preparer = TracedAgent(
         config=config["interview_preparer_agent"],
         tools=all_tools,
-        llm=model_name,
+        llm=TracedLLM(model=model_name),
         verbose=True,
     )
 
@@ -73,10 +76,12 @@ def create_agents(config, linkedin_pdf_path, model_name):
 
 def create_tasks(config, agents, output_dir):
     """Create workflow tasks for the job application process."""
+    from common.crew.tracing import TracedTask
+
     researcher, profiler, resume_strategist, interview_preparer = agents
 
     # Research job requirements
-    research_task = Task(
+    research_task = TracedTask(
         description=config["research_task"]["description"],
         expected_output=config["research_task"]["expected_output"],
         agent=researcher,
@@ -84,7 +89,7 @@ def create_tasks(config, agents, output_dir):
     )
 
     # Analyze LinkedIn profile
-    profile_task = Task(
+    profile_task = TracedTask(
         description=config["profile_task"]["description"],
         expected_output=config["profile_task"]["expected_output"],
         agent=profiler,
@@ -92,7 +97,7 @@ def create_tasks(config, agents, output_dir):
     )
 
     # Create tailored resume
-    resume_task = Task(
+    resume_task = TracedTask(
         description=config["resume_strategy_task"]["description"],
         expected_output=config["resume_strategy_task"]["expected_output"],
         output_file=f"{output_dir}/tailored_resume.md",
@@ -101,7 +106,7 @@ def create_tasks(config, agents, output_dir):
     )
 
     # Prepare interview materials
-    interview_task = Task(
+    interview_task = TracedTask(
         description=config["interview_preparation_task"]["description"],
         expected_output=config["interview_preparation_task"]["expected_output"],
         output_file=f"{output_dir}/interview_materials.md",
@@ -114,6 +119,8 @@ def create_tasks(config, agents, output_dir):
 
 def setup_environment(output_dir, model):
     """Set up environment variables and create output directory."""
+    from common.http_pool import share_http_client
+
     # Ensure output directory exists
     output_dir.mkdir(exist_ok=True)
 
@@ -122,6 +129,9 @@ def setup_environment(output_dir, model):
     os.environ["OPENAI_MODEL_NAME"] = model
     os.environ["SERPER_API_KEY"] = get_serper_api_key()
 
+    # The agents' LLM calls share one pool of kept-alive connections
+    share_http_client()
+
     return output_dir
 
 
@@ -145,6 +155,11 @@ def tailor_resume(
     1. A tailored resume matching the job requirements
     2. Interview preparation materials with talking points
     """
+    from common.http_pool import pool_stats
+    from common.page_cache import get_page_cache
+    from common.tracing import start_tracing, stop_tracing, trace_span
+    from crewai import Crew
+
     # Convert string path to Path object
     output_path = Path(output_dir)
 
@@ -174,7 +189,19 @@ def tailor_resume(
 
     # Run the crew
     logger.info("Starting job application process...")
-    job_application_crew.kickoff(inputs=inputs)
+    tracer = start_tracing(str(uuid.uuid4()), str(output_path / "traces"))
+    try:
+        with trace_span("crew", "JobApplicationCrew"):
+            job_application_crew.kickoff(inputs=inputs)
+    finally:
+        stop_tracing()
+        logger.info(f"Run summary:\n{tracer.format_summary()}")
+        logger.info(f"Trace written to {tracer.path}")
+
+    page_cache = get_page_cache()
+    if page_cache is not None:
+        logger.info(f"Page cache: {page_cache.stats()}")
+    logger.info(f"HTTP pools: {pool_stats()}")
 
     # Log completion and output locations
     logger.info("Job application process completed successfully!")
@@ -0,0 +1,47 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable
+
+from write_a_book_with_flows.types import Chapter
+
+# Large write buffer so the final book is produced in a single buffered pass
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+class BookAssembler:
+    """Writes chapters to their own slot files and stitches them into the book"""
+
+    def __init__(self, book_title: str, output_dir: str = "."):
+        file_stem = book_title.replace(" ", "_")
+        self.book_path = Path(output_dir) / f"{file_stem}.md"
+        self.chapters_dir = Path(output_dir) / f"{file_stem}_chapters"
+
+    def chapter_path(self, index: int) -> Path:
+        return self.chapters_dir / f"{index + 1:03d}.md"
+
+    def write_chapter(self, index: int, chapter: Chapter) -> Path:
+        """Write a finished chapter to its slot so it can be read right away"""
+        self.chapters_dir.mkdir(parents=True, exist_ok=True)
+        path = self.chapter_path(index)
+        tmp_path = path.with_suffix(".md.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            # Add the chapter title as an H1 heading followed by the content
+            file.write(f"# {chapter.title}\n\n")
+            file.write(f"{chapter.content}\n\n")
+        os.replace(tmp_path, path)
+        return path
+
+    def assemble(self, indices: Iterable[int]) -> Path:
+        """Concatenate the given chapter slots, in order, into the book file"""
+        tmp_path = self.book_path.with_suffix(".md.tmp")
+        with open(
+            tmp_path, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE
+        ) as book_file:
+            for index in indices:
+                with open(
+                    self.chapter_path(index), "r", encoding="utf-8"
+                ) as chapter_file:
+                    shutil.copyfileobj(chapter_file, book_file)
+        os.replace(tmp_path, self.book_path)
+        return self.book_path
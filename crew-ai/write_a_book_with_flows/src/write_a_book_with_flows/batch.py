@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+import yaml
+from pydantic import BaseModel, ConfigDict
+from write_a_book_with_flows.checkpoint import DEFAULT_CHECKPOINT_DIR, CheckpointStore
+from write_a_book_with_flows.main import print_run_stats
+from write_a_book_with_flows.scheduler import (
+    DEFAULT_MAX_CONCURRENT_CHAPTERS,
+    CrewScheduler,
+)
+
+DEFAULT_MAX_CONCURRENT_CREWS = 8
+
+
+class BookManifestEntry(BaseModel):
+    """One book of a batch manifest"""
+
+    model_config = ConfigDict(extra="forbid")
+
+    topic: str
+    goal: str
+    title: Optional[str] = None
+    priority: int = 0
+    max_concurrent_chapters: int = DEFAULT_MAX_CONCURRENT_CHAPTERS
+    pipeline_outline: bool = False
+    # Run id of a checkpoint to resume instead of starting the book over
+    resume: Optional[str] = None
+
+
+def load_manifest(path: str) -> List[BookManifestEntry]:
+    """Read the books to write from a YAML or JSON manifest
+
+    The manifest is either a list of books or a mapping with a "books" list.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    data = json.loads(text) if path.endswith(".json") else yaml.safe_load(text)
+    if isinstance(data, dict):
+        data = data.get("books")
+    if not isinstance(data, list) or not data:
+        raise ValueError(f"Manifest {path} does not list any books")
+
+    entries = [BookManifestEntry(**book) for book in data]
+    titles = [entry.title or entry.topic for entry in entries]
+    duplicates = sorted({title for title in titles if titles.count(title) > 1})
+    if duplicates:
+        # Books are saved under their title, so they would overwrite each other
+        raise ValueError(f"Manifest has duplicate book titles: {duplicates}")
+    return entries
+
+
+def book_inputs(entry: BookManifestEntry, checkpoints: CheckpointStore) -> dict:
+    from write_a_book_with_flows.flow import BookState
+
+    inputs = {}
+    if entry.resume:
+        inputs = checkpoints.load(entry.resume, BookState).model_dump()
+    inputs.update(
+        topic=entry.topic,
+        goal=entry.goal,
+        title=entry.title or entry.topic,
+        priority=entry.priority,
+        max_concurrent_chapters=entry.max_concurrent_chapters,
+        pipeline_outline=entry.pipeline_outline,
+    )
+    return inputs
+
+
+async def run_batch(
+    entries: List[BookManifestEntry],
+    max_concurrent_crews: int = DEFAULT_MAX_CONCURRENT_CREWS,
+    checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR,
+):
+    """Write every book of the manifest, sharing one pool of crew slots"""
+    from common.tracing import trace_span
+    from write_a_book_with_flows.flow import BookFlow
+
+    scheduler = CrewScheduler(max_concurrent_crews)
+    flows = [
+        BookFlow(checkpoint_dir=checkpoint_dir, scheduler=scheduler) for _ in entries
+    ]
+
+    async def run_book(entry, flow):
+        inputs = book_inputs(entry, flow.checkpoints)
+        with trace_span("flow", "BookFlow", book=inputs["title"]):
+            return await flow.kickoff_async(inputs=inputs)
+
+    # Flow.kickoff starts its own event loop, so the books are run with
+    # kickoff_async on a single loop where the scheduler can see all of them
+    results = await asyncio.gather(
+        *(run_book(entry, flow) for entry, flow in zip(entries, flows)),
+        return_exceptions=True,
+    )
+    return list(zip(flows, results))
+
+
+def kickoff():
+    parser = argparse.ArgumentParser(
+        description="Write several books from a manifest with CrewAI flows"
+    )
+    parser.add_argument(
+        "manifest", help="YAML or JSON file listing the topic and goal of each book"
+    )
+    parser.add_argument(
+        "--max-concurrent-crews",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENT_CREWS,
+        help="Maximum number of crews running at the same time across all books",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=DEFAULT_CHECKPOINT_DIR,
+        help="Directory where run checkpoints are stored",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Check every book and print the projected LLM calls, tokens and "
+        "cost of its tasks without running anything",
+    )
+    args = parser.parse_args()
+
+    from common.tracing import start_tracing, stop_tracing
+    from write_a_book_with_flows.dry_run import estimate_book_run
+    from write_a_book_with_flows.flow import BookState
+
+    entries = load_manifest(args.manifest)
+
+    # Every book is checked before any of them starts
+    checkpoints = CheckpointStore(args.checkpoint_dir)
+    estimates = {}
+    for entry in entries:
+        title = entry.title or entry.topic
+        try:
+            estimates[title] = estimate_book_run(
+                BookState(**book_inputs(entry, checkpoints))
+            )
+        except ValueError as exc:
+            sys.exit(f"Not starting the batch, '{title}' is invalid: {exc}")
+    totals = [estimate.totals() for estimate in estimates.values()]
+    calls = sum(total["calls"] for total in totals)
+    cost_usd = sum(total["cost_usd"] for total in totals)
+    if args.dry_run:
+        for title, estimate in estimates.items():
+            print(f"{title}:\n{estimate.format_table()}\n")
+        print(f"Batch total: {calls} LLM calls, ${cost_usd:.4f}")
+        return
+    print(f"Projected usage: {calls} LLM calls, ${cost_usd:.4f}")
+    print(f"Writing {len(entries)} books with up to {args.max_concurrent_crews} crews")
+    tracer = start_tracing(f"batch-{uuid.uuid4()}")
+    try:
+        results = asyncio.run(
+            run_batch(entries, args.max_concurrent_crews, args.checkpoint_dir)
+        )
+    finally:
+        stop_tracing()
+        print_run_stats(tracer)
+
+    for flow, result in results:
+        if isinstance(result, BaseException):
+            print(f"Failed to write '{flow.state.title}': {result}")
+            print(f"  Resume it with run id {flow.state.id}")
+        else:
+            print(f"'{flow.state.title}' saved as {result}")
+            if flow.state.failed_chapters:
+                print(f"  Failed chapters: {flow.state.failed_chapters}")
+
+
+if __name__ == "__main__":
+    kickoff()
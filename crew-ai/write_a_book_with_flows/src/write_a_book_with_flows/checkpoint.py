@@ -0,0 +1,36 @@
+import os
+from pathlib import Path
+from typing import Type, TypeVar
+
+from pydantic import BaseModel
+
+StateT = TypeVar("StateT", bound=BaseModel)
+
+DEFAULT_CHECKPOINT_DIR = ".checkpoints"
+
+
+class CheckpointStore:
+    """Stores flow state snapshots as JSON files keyed by run id"""
+
+    def __init__(self, directory: str = DEFAULT_CHECKPOINT_DIR):
+        self.directory = Path(directory)
+
+    def path_for(self, run_id: str) -> Path:
+        return self.directory / f"{run_id}.json"
+
+    def save(self, state: BaseModel) -> Path:
+        """Write the state to disk, replacing any previous checkpoint atomically"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(state.id)
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(state.model_dump_json(indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+        return path
+
+    def load(self, run_id: str, state_cls: Type[StateT]) -> StateT:
+        path = self.path_for(run_id)
+        if not path.exists():
+            raise FileNotFoundError(
+                f"No checkpoint found for run '{run_id}' in {self.directory}"
+            )
+        return state_cls.model_validate_json(path.read_text(encoding="utf-8"))
@@ -1,8 +1,17 @@
+from typing import Iterator
+
+from common.crew.model_router import RoutedLLM, routed_llm
+from common.crew.tools import CachedSerperDevTool
+from common.crew.tracing import TracedAgent
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import SerperDevTool
-from langchain_openai import ChatOpenAI
-from write_a_book_with_flows.types import BookOutline
+from write_a_book_with_flows.outline_parser import ChapterOutlineStreamParser
+from write_a_book_with_flows.types import BookOutline, ChapterOutline
+
+OUTLINE_JSON_INSTRUCTIONS = """
+Respond only with JSON in the following format, listing the chapters in order:
+{"chapters": [{"title": "Chapter title", "description": "Chapter description"}]}
+"""
 
 
 @CrewBase
@@ -11,24 +20,26 @@ class OutlineCrew:
 
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
-    # llm = ChatOpenAI(model="chatgpt-4o-latest")
-    llm = ChatOpenAI(model="gpt-4o")
+
+    def route(self, agent_name: str) -> RoutedLLM:
+        """The LLM routed by the llm_route of an agent in agents.yaml"""
+        return routed_llm(f"outline.{agent_name}", self.agents_config[agent_name])
 
     @agent
     def researcher(self) -> Agent:
-        search_tool = SerperDevTool()
-        return Agent(
+        search_tool = CachedSerperDevTool()
+        return TracedAgent(
             config=self.agents_config["researcher"],
             tools=[search_tool],
-            llm=self.llm,
+            llm=self.route("researcher"),
             verbose=True,
         )
 
     @agent
     def outliner(self) -> Agent:
-        return Agent(
+        return TracedAgent(
             config=self.agents_config["outliner"],
-            llm=self.llm,
+            llm=self.route("outliner"),
             verbose=True,
         )
 
@@ -53,3 +64,48 @@ class OutlineCrew:
             process=Process.sequential,
             verbose=True,
         )
+
+    def research_crew(self) -> Crew:
+        """Creates a crew that only runs the research task"""
+        return Crew(
+            agents=[self.researcher()],
+            tasks=[self.research_topic()],
+            process=Process.sequential,
+            verbose=True,
+        )
+
+    def stream_outline(
+        self, topic: str, goal: str, research: str
+    ) -> Iterator[ChapterOutline]:
+        """Streams the outline, yielding each chapter as soon as it is complete
+
+        Once the stream ends the outline is validated as a BookOutline, as the
+        generate_outline task does. Raises ValueError if it is incomplete or
+        invalid, or lists other chapters than the ones yielded.
+        """
+        inputs = {"topic": topic, "goal": goal}
+        outliner = self.agents_config["outliner"]
+        outline_task = self.tasks_config["generate_outline"]
+        messages = [
+            {
+                "role": "system",
+                "content": f"You are {outliner['role'].strip()}. "
+                f"{outliner['backstory'].strip()}\n"
+                f"Your personal goal is: {outliner['goal'].format(**inputs).strip()}",
+            },
+            {
+                "role": "user",
+                "content": f"{outline_task['description'].format(**inputs)}\n"
+                f"Here are the research findings:\n\n{research}\n"
+                f"{OUTLINE_JSON_INSTRUCTIONS}",
+            },
+        ]
+
+        parser = ChapterOutlineStreamParser()
+        streamed = []
+        for text in self.route("outliner").stream(messages):
+            for chapter in parser.feed(text):
+                streamed.append(chapter)
+                yield chapter
+        if parser.outline().chapters != streamed:
+            raise ValueError("The streamed chapters do not match the outline")
@@ -1,7 +1,9 @@
+from common.crew.model_router import RoutedLLM, routed_llm
+from common.crew.templates import CrewTemplate
+from common.crew.tools import CachedSerperDevTool
+from common.crew.tracing import TracedAgent
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import SerperDevTool
-from langchain_openai import ChatOpenAI
 from write_a_book_with_flows.types import Chapter
 
 
@@ -11,22 +13,25 @@ class WriteBookChapterCrew:
 
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
-    llm = ChatOpenAI(model="gpt-4o")
+
+    def route(self, agent_name: str) -> RoutedLLM:
+        """The LLM routed by the llm_route of an agent in agents.yaml"""
+        return routed_llm(f"chapter.{agent_name}", self.agents_config[agent_name])
 
     @agent
     def researcher(self) -> Agent:
-        search_tool = SerperDevTool()
-        return Agent(
+        search_tool = CachedSerperDevTool()
+        return TracedAgent(
             config=self.agents_config["researcher"],
             tools=[search_tool],
-            llm=self.llm,
+            llm=self.route("researcher"),
         )
 
     @agent
     def writer(self) -> Agent:
-        return Agent(
+        return TracedAgent(
             config=self.agents_config["writer"],
-            llm=self.llm,
+            llm=self.route("writer"),
         )
 
     @task
@@ -48,3 +53,7 @@ class WriteBookChapterCrew:
             process=Process.sequential,
             verbose=True,
         )
+
+
+# Shared by every chapter so the config and agents are only built once
+write_book_chapter_crew_template = CrewTemplate(lambda: WriteBookChapterCrew().crew())
@@ -0,0 +1,88 @@
+from typing import Optional
+
+from common.crew.estimate import ANSWER_TOKENS, RunEstimate, estimate_crew
+from crewai import Task
+from write_a_book_with_flows.crews.outline_book_crew.outline_crew import OutlineCrew
+from write_a_book_with_flows.crews.write_book_chapter_crew.write_book_chapter_crew import (
+    write_book_chapter_crew_template,
+)
+from write_a_book_with_flows.flow import BookState
+from write_a_book_with_flows.types import Chapter, ChapterOutline
+
+# The writer is asked for chapters of around 3,000 words
+CHAPTER_TOKENS = 4000
+# Chapters assumed when the outline is still to be generated
+DEFAULT_ESTIMATED_CHAPTERS = 8
+
+
+def _answer_tokens(task: Task) -> int:
+    return CHAPTER_TOKENS if task.output_pydantic is Chapter else ANSWER_TOKENS
+
+
+def estimate_book_run(
+    state: BookState, estimated_chapters: Optional[int] = None
+) -> RunEstimate:
+    """Check the inputs and configs of a book run and project what it will spend
+
+    state is the state the flow starts from, so a resumed run only projects
+    the outline and chapters its checkpoint still lacks. Every task prompt
+    is rendered with the inputs the flow would pass and its tokens are
+    counted locally; no LLM is called. Without an outline the chapter crew is
+    projected for estimated_chapters chapters, or DEFAULT_ESTIMATED_CHAPTERS
+    when it is None.
+
+    Raises ValueError when an input or config would make the run fail.
+    """
+    if state.max_concurrent_chapters < 1:
+        raise ValueError("max_concurrent_chapters must be at least 1")
+
+    estimate = RunEstimate()
+    if state.outline_complete:
+        outlines = state.book_outline
+        if not outlines:
+            raise ValueError("The outline in the checkpoint has no chapters")
+        if state.completed_chapters:
+            estimate.notes.append(
+                f"{len(state.completed_chapters)} of {len(outlines)} chapters are "
+                f"already in the checkpoint"
+            )
+    else:
+        estimate.rows.extend(
+            estimate_crew(
+                OutlineCrew().crew(),
+                {"topic": state.topic, "goal": state.goal},
+                "outline",
+            )
+        )
+        estimated_chapters = estimated_chapters or DEFAULT_ESTIMATED_CHAPTERS
+        outlines = [
+            ChapterOutline(
+                title=f"Chapter {index + 1} on {state.topic}",
+                description=state.goal,
+            )
+            for index in range(estimated_chapters)
+        ]
+        estimate.notes.append(
+            f"The outline is not generated yet, so {estimated_chapters} chapters "
+            f"are assumed"
+        )
+
+    for index, outline in enumerate(outlines):
+        if index in state.completed_chapters:
+            continue
+        inputs = {
+            "goal": state.goal,
+            "topic": state.topic,
+            "chapter_title": outline.title,
+            "chapter_description": outline.description,
+            "book_outline": [chapter.model_dump_json() for chapter in outlines],
+        }
+        estimate.rows.extend(
+            estimate_crew(
+                write_book_chapter_crew_template.crew(),
+                inputs,
+                f"{index + 1}. {outline.title}",
+                answer_tokens=_answer_tokens,
+            )
+        )
+    return estimate
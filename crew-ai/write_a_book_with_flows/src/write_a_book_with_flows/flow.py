@@ -0,0 +1,281 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from common.tracing import trace_span
+from crewai.flow.flow import Flow, listen, start
+from pydantic import BaseModel, Field
+from write_a_book_with_flows.assembler import BookAssembler
+from write_a_book_with_flows.checkpoint import DEFAULT_CHECKPOINT_DIR, CheckpointStore
+from write_a_book_with_flows.crews.write_book_chapter_crew.write_book_chapter_crew import (
+    write_book_chapter_crew_template,
+)
+from write_a_book_with_flows.scheduler import (
+    DEFAULT_MAX_CONCURRENT_CHAPTERS,
+    CrewScheduler,
+)
+from write_a_book_with_flows.types import Chapter, ChapterOutline
+
+from .crews.outline_book_crew.outline_crew import OutlineCrew
+
+
+class BookState(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    title: str = "Python Design Patterns for Machine Learning"
+    book: List[Chapter] = []
+    book_outline: List[ChapterOutline] = []
+    outline_complete: bool = False
+    completed_chapters: Dict[int, Chapter] = {}
+    failed_chapters: List[str] = []
+    max_concurrent_chapters: int = DEFAULT_MAX_CONCURRENT_CHAPTERS
+    pipeline_outline: bool = False
+    # Books with a higher priority get crew slots first in a batch run
+    priority: int = 0
+    topic: str = "Python Design Patterns for Machine Learning"
+    goal: str = """
+        The goal of this book is to provide a comprehensive overview with examples of the most common design patterns used in machine learning.
+        It will be a practical guide with real-world examples and use cases.
+        It will be written in a way that is easy to understand and follow.
+    """
+
+
+def run_chapter_crew(inputs):
+    return write_book_chapter_crew_template.crew().kickoff(inputs=inputs)
+
+
+class BookFlow(Flow[BookState]):
+    initial_state = BookState
+
+    def __init__(
+        self,
+        checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR,
+        scheduler: Optional[CrewScheduler] = None,
+    ):
+        super().__init__()
+        self.checkpoints = CheckpointStore(checkpoint_dir)
+        # Shared by every book of a batch run to cap crews across all of them
+        self.scheduler = scheduler
+        # Chapter crews that have been dispatched, keyed by outline index
+        self._chapter_tasks: Dict[int, asyncio.Task] = {}
+        self._chapter_semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def assembler(self) -> BookAssembler:
+        return BookAssembler(self.state.title)
+
+    @asynccontextmanager
+    async def crew_slot(self):
+        """Hold one of the scheduler's crew slots while a crew runs"""
+        if self.scheduler is None:
+            yield
+            return
+        async with self.scheduler.slot(self.state.id, self.state.priority):
+            yield
+
+    def save_checkpoint(self):
+        path = self.checkpoints.save(self.state)
+        print(f"Checkpoint saved to {path}")
+
+    @start()
+    async def generate_book_outline(self):
+        print(f"Book run id: {self.state.id} (resume with --resume {self.state.id})")
+        # A resumed run already has its outline in the checkpoint
+        if self.state.outline_complete:
+            print("Using book outline from checkpoint")
+            return self.state.book_outline
+
+        # Chapters written against a partial outline cannot be matched to a
+        # freshly generated one, so an unfinished outline starts over
+        self.state.book_outline = []
+        self.state.completed_chapters = {}
+
+        if self.state.pipeline_outline:
+            return await self.stream_outline_into_chapters()
+        return await self.run_outline_crew()
+
+    async def run_outline_crew(self):
+        """Generate the whole outline before any chapter is written"""
+        print("Kickoff the Book Outline Crew")
+        inputs = {"topic": self.state.topic, "goal": self.state.goal}
+        async with self.crew_slot():
+            with trace_span("crew", "OutlineCrew", book=self.state.title):
+                output = await asyncio.to_thread(
+                    lambda: OutlineCrew().crew().kickoff(inputs=inputs)
+                )
+
+        chapters = output["chapters"]
+        print("Chapters:", chapters)
+
+        self.state.book_outline = chapters
+        self.state.outline_complete = True
+        self.save_checkpoint()
+        return chapters
+
+    async def stream_outline_into_chapters(self):
+        """Dispatch chapter crews while the outline is still being generated"""
+        print("Kickoff the Book Outline research")
+        outline_crew = OutlineCrew()
+        inputs = {"topic": self.state.topic, "goal": self.state.goal}
+        async with self.crew_slot():
+            with trace_span("crew", "OutlineResearchCrew", book=self.state.title):
+                research = await asyncio.to_thread(
+                    lambda: outline_crew.research_crew().kickoff(inputs=inputs)
+                )
+
+        print("Streaming the Book Outline")
+        loop = asyncio.get_running_loop()
+        outlines: asyncio.Queue = asyncio.Queue()
+
+        def produce_outline():
+            try:
+                for chapter_outline in outline_crew.stream_outline(
+                    self.state.topic, self.state.goal, research.raw
+                ):
+                    loop.call_soon_threadsafe(outlines.put_nowait, chapter_outline)
+            finally:
+                loop.call_soon_threadsafe(outlines.put_nowait, None)
+
+        async def run_producer():
+            async with self.crew_slot():
+                with trace_span("crew", "OutlineStream", book=self.state.title):
+                    await asyncio.to_thread(produce_outline)
+
+        producer = asyncio.create_task(run_producer())
+
+        # Each chapter crew starts as soon as its outline entry has been parsed
+        while (chapter_outline := await outlines.get()) is not None:
+            index = len(self.state.book_outline)
+            print(f"Outlined Chapter {index + 1}: {chapter_outline.title}")
+            self.state.book_outline.append(chapter_outline)
+            self.start_chapter(index, chapter_outline)
+        try:
+            await producer
+        except ValueError as exc:
+            # The chapters started so far may not belong to the outline the
+            # crew generates, so they are dropped along with the stream
+            print(f"Streamed outline is invalid ({exc}), generating it again")
+            await self.cancel_chapters()
+            self.state.book_outline = []
+            self.state.completed_chapters = {}
+            return await self.run_outline_crew()
+
+        print("Chapters:", self.state.book_outline)
+        self.state.outline_complete = True
+        self.save_checkpoint()
+        return self.state.book_outline
+
+    async def cancel_chapters(self):
+        """Cancel every dispatched chapter crew and wait for it to stop"""
+        for task in self._chapter_tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._chapter_tasks.values(), return_exceptions=True)
+        self._chapter_tasks = {}
+
+    def start_chapter(self, index, chapter_outline):
+        """Schedule a chapter crew without waiting for it to finish"""
+        if self._chapter_semaphore is None:
+            # Crew kickoff is blocking, so each chapter runs in a worker thread
+            # and the semaphore caps how many chapter crews are in flight
+            self._chapter_semaphore = asyncio.Semaphore(
+                max(1, self.state.max_concurrent_chapters)
+            )
+        self._chapter_tasks[index] = asyncio.create_task(
+            self.write_single_chapter(index, chapter_outline)
+        )
+
+    async def write_single_chapter(self, index, chapter_outline):
+        queued = time.perf_counter()
+        async with self._chapter_semaphore, self.crew_slot():
+            queue_s = time.perf_counter() - queued
+            print(f"Writing Chapter: {chapter_outline.title}")
+            print(f"Description: {chapter_outline.description}")
+            inputs = {
+                "goal": self.state.goal,
+                "topic": self.state.topic,
+                "chapter_title": chapter_outline.title,
+                "chapter_description": chapter_outline.description,
+                # In pipelined mode this is the part of the outline known so far
+                "book_outline": [
+                    outline.model_dump_json() for outline in self.state.book_outline
+                ],
+            }
+            with trace_span(
+                "crew",
+                "WriteBookChapterCrew",
+                queue_s=queue_s,
+                book=self.state.title,
+                chapter=index + 1,
+            ):
+                output = await asyncio.to_thread(run_chapter_crew, inputs)
+        title = output["title"]
+        content = output["content"]
+        chapter = Chapter(title=title, content=content)
+
+        # Persist every finished chapter so a crashed run can resume, and
+        # write it to its slot on disk so it can be read while others run
+        self.state.completed_chapters[index] = chapter
+        self.save_checkpoint()
+        chapter_path = self.assembler.write_chapter(index, chapter)
+        print(f"Chapter {index + 1} saved as {chapter_path}")
+        return chapter
+
+    @listen(generate_book_outline)
+    async def write_chapters(self):
+        print("Writing Book Chapters")
+        restored = 0
+        for index, chapter_outline in enumerate(self.state.book_outline):
+            # Chapters already dispatched by the pipelined outline are skipped
+            if index in self._chapter_tasks:
+                continue
+            if index in self.state.completed_chapters:
+                # Refresh the slots of restored chapters so the book never picks
+                # up stale files left behind by another run with the same title
+                chapter = self.state.completed_chapters[index]
+                self.assembler.write_chapter(index, chapter)
+                restored += 1
+            else:
+                self.start_chapter(index, chapter_outline)
+        if restored:
+            print(f"Skipping {restored} chapters already completed in checkpoint")
+
+        # Gather keeps the results in outline order and return_exceptions stops
+        # one failed chapter from cancelling the others
+        indices = sorted(self._chapter_tasks)
+        results = await asyncio.gather(
+            *(self._chapter_tasks[index] for index in indices), return_exceptions=True
+        )
+
+        chapters = []
+        self.state.failed_chapters = []
+        for index, result in zip(indices, results):
+            if isinstance(result, BaseException):
+                title = self.state.book_outline[index].title
+                print(f"Failed to write chapter '{title}': {result}")
+                self.state.failed_chapters.append(title)
+            else:
+                chapters.append(result)
+
+        print("Newly generated chapters:", chapters)
+        self.state.book = [
+            self.state.completed_chapters[index]
+            for index in range(len(self.state.book_outline))
+            if index in self.state.completed_chapters
+        ]
+        self.save_checkpoint()
+
+        if self.state.failed_chapters:
+            print("Failed chapters:", self.state.failed_chapters)
+
+        print("Book Chapters", self.state.book)
+
+    @listen(write_chapters)
+    async def join_and_save_chapter(self):
+        print("Joining and Saving Book Chapters")
+        # Stitch the chapter slots together in outline order; chapters that
+        # failed to generate have no entry and are left out
+        filename = self.assembler.assemble(sorted(self.state.completed_chapters))
+
+        print(f"Book saved as {filename}")
+        return str(filename)
@@ -1,120 +1,122 @@
 #!/usr/bin/env python
-import asyncio
-from typing import List
-
-from crewai.flow.flow import Flow, listen, start
-from pydantic import BaseModel
-from write_a_book_with_flows.crews.write_book_chapter_crew.write_book_chapter_crew import (
-    WriteBookChapterCrew,
-)
-from write_a_book_with_flows.types import Chapter, ChapterOutline
-
-from .crews.outline_book_crew.outline_crew import OutlineCrew
-
-
-class BookState(BaseModel):
-    title: str = "Python Design Patterns for Machine Learning"
-    book: List[Chapter] = []
-    book_outline: List[ChapterOutline] = []
-    topic: str = "Python Design Patterns for Machine Learning"
-    goal: str = """
-        The goal of this book is to provide a comprehensive overview with examples of the most common design patterns used in machine learning.
-        It will be a practical guide with real-world examples and use cases.
-        It will be written in a way that is easy to understand and follow.
-    """
-
-
-class BookFlow(Flow[BookState]):
-    initial_state = BookState
-
-    @start()
-    def generate_book_outline(self):
-        print("Kickoff the Book Outline Crew")
-        output = (
-            OutlineCrew()
-            .crew()
-            .kickoff(inputs={"topic": self.state.topic, "goal": self.state.goal})
-        )
-
-        chapters = output["chapters"]
-        print("Chapters:", chapters)
-
-        self.state.book_outline = chapters
-        return chapters
-
-    @listen(generate_book_outline)
-    async def write_chapters(self):
-        print("Writing Book Chapters")
-        tasks = []
-
-        async def write_single_chapter(chapter_outline):
-            output = (
-                WriteBookChapterCrew()
-                .crew()
-                .kickoff(
-                    inputs={
-                        "goal": self.state.goal,
-                        "topic": self.state.topic,
-                        "chapter_title": chapter_outline.title,
-                        "chapter_description": chapter_outline.description,
-                        "book_outline": [
-                            chapter_outline.model_dump_json()
-                            for chapter_outline in self.state.book_outline
-                        ],
-                    }
-                )
-            )
-            title = output["title"]
-            content = output["content"]
-            chapter = Chapter(title=title, content=content)
-            return chapter
-
-        for chapter_outline in self.state.book_outline:
-            print(f"Writing Chapter: {chapter_outline.title}")
-            print(f"Description: {chapter_outline.description}")
-            # Schedule each chapter writing task
-            task = asyncio.create_task(write_single_chapter(chapter_outline))
-            tasks.append(task)
-
-        # Await all chapter writing tasks concurrently
-        chapters = await asyncio.gather(*tasks)
-        print("Newly generated chapters:", chapters)
-        self.state.book.extend(chapters)
-
-        print("Book Chapters", self.state.book)
-
-    @listen(write_chapters)
-    async def join_and_save_chapter(self):
-        print("Joining and Saving Book Chapters")
-        # Combine all chapters into a single markdown string
-        book_content = ""
-
-        for chapter in self.state.book:
-            # Add the chapter title as an H1 heading
-            book_content += f"# {chapter.title}\n\n"
-            # Add the chapter content
-            book_content += f"{chapter.content}\n\n"
-
-        # The title of the book from self.state.title
-        book_title = self.state.title
-
-        # Create the filename by replacing spaces with underscores and adding .md extension
-        filename = f"./{book_title.replace(' ', '_')}.md"
-
-        # Save the combined content into the file
-        with open(filename, "w", encoding="utf-8") as file:
-            file.write(book_content)
-
-        print(f"Book saved as {filename}")
-        return book_content
+import argparse
+import sys
+
+from write_a_book_with_flows.checkpoint import DEFAULT_CHECKPOINT_DIR
+from write_a_book_with_flows.scheduler import DEFAULT_MAX_CONCURRENT_CHAPTERS
+
+
+def __getattr__(name):
+    # The flow pulls in crewai, so it is only imported once it is used
+    if name in ("BookFlow", "BookState", "run_chapter_crew"):
+        from write_a_book_with_flows import flow
+
+        return getattr(flow, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def print_run_stats(tracer) -> None:
+    """Print the trace summary of a run and the cache, pool and route stats"""
+    from common.crew.model_router import route_metrics
+    from common.http_pool import pool_stats
+    from common.llm_cache import get_llm_cache
+    from common.search_cache import get_search_cache
+
+    print(tracer.format_summary())
+    print(f"Trace written to {tracer.path}")
+
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        print("LLM cache:", llm_cache.stats())
+
+    search_cache = get_search_cache()
+    if search_cache is not None:
+        print("Search cache:", search_cache.stats())
+
+    if pool_stats():
+        print("HTTP pools:", pool_stats())
+
+    if route_metrics.summary():
+        print(f"Model routes:\n{route_metrics.format_summary()}")
 
 
 def kickoff():
-    poem_flow = BookFlow()
-    poem_flow.kickoff()
+    parser = argparse.ArgumentParser(description="Write a book with CrewAI flows")
+    parser.add_argument(
+        "--max-concurrent-chapters",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENT_CHAPTERS,
+        help="Maximum number of chapters written at the same time",
+    )
+    parser.add_argument(
+        "--pipeline-outline",
+        action="store_true",
+        help="Start writing chapters while the outline is still being generated",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Resume a previous run from its checkpoint, skipping completed work",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=DEFAULT_CHECKPOINT_DIR,
+        help="Directory where run checkpoints are stored",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Check the inputs and configs and print the projected LLM calls, "
+        "tokens and cost of every task without running anything",
+    )
+    parser.add_argument(
+        "--dry-run-chapters",
+        type=int,
+        help="Number of chapters projected when the outline is not generated yet",
+    )
+    args = parser.parse_args()
+
+    from common.tracing import (
+        start_tracing,
+        stop_tracing,
+        trace_span,
+    )
+    from write_a_book_with_flows.dry_run import estimate_book_run
+    from write_a_book_with_flows.flow import BookFlow, BookState
+
+    poem_flow = BookFlow(checkpoint_dir=args.checkpoint_dir)
+    inputs = {}
+    if args.resume:
+        inputs = poem_flow.checkpoints.load(args.resume, BookState).model_dump()
+    inputs["max_concurrent_chapters"] = args.max_concurrent_chapters
+    inputs["pipeline_outline"] = args.pipeline_outline
+
+    # Rendering every prompt up front catches a bad config or input before
+    # the first crew spends anything
+    try:
+        estimate = estimate_book_run(BookState(**inputs), args.dry_run_chapters)
+    except ValueError as exc:
+        sys.exit(f"Not starting the run: {exc}")
+    if args.dry_run:
+        print("Dry run, no LLM was called:")
+        print(estimate.format_table())
+        return
+    print(f"Projected usage: {estimate.format_summary()}")
+
+    tracer = start_tracing(inputs.get("id", poem_flow.state.id))
+    try:
+        with trace_span(
+            "flow", "BookFlow", book=inputs.get("title", poem_flow.state.title)
+        ):
+            poem_flow.kickoff(inputs=inputs)
+    finally:
+        stop_tracing()
+        print_run_stats(tracer)
 
 
 def plot():
+    from write_a_book_with_flows.flow import BookFlow
+
     poem_flow = BookFlow()
     poem_flow.plot()
 
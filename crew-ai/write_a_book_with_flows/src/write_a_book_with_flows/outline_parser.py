@@ -0,0 +1,83 @@
+import json
+from typing import List, Optional
+
+from write_a_book_with_flows.types import BookOutline, ChapterOutline
+
+
+class ChapterOutlineStreamParser:
+    """Incrementally extracts chapter outlines from a streamed JSON outline
+
+    Text is fed in chunks as it arrives from the LLM. Every JSON object is
+    tracked by its braces, and as soon as an object with a title and a
+    description closes it is returned as a ChapterOutline, so chapters can be
+    dispatched before the rest of the outline has been generated.
+
+    The chapters are not checked against each other or the outline as a
+    whole, so once the stream ends outline() validates the complete
+    document.
+    """
+
+    def __init__(self):
+        self._chars: List[str] = []
+        self._object_starts: List[int] = []
+        self._in_string = False
+        self._escaped = False
+        # The outermost JSON object, once its closing brace has been read
+        self._document: Optional[str] = None
+
+    def feed(self, text: str) -> List[ChapterOutline]:
+        """Consume a chunk of text and return the chapters completed by it"""
+        chapters = []
+        for char in text:
+            self._chars.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._object_starts.append(len(self._chars) - 1)
+            elif char == "}" and self._object_starts:
+                start = self._object_starts.pop()
+                candidate = "".join(self._chars[start:])
+                if not self._object_starts and self._document is None:
+                    self._document = candidate
+                chapter = self._parse_chapter(candidate)
+                if chapter is not None:
+                    chapters.append(chapter)
+        return chapters
+
+    def outline(self) -> BookOutline:
+        """The complete outline the streamed text parses to
+
+        Raises ValueError if the text stopped before the outline was closed,
+        or if the outline does not validate as a BookOutline with at least
+        one chapter.
+        """
+        if self._document is None:
+            raise ValueError("The streamed outline ended before it was complete")
+        outline = BookOutline.model_validate_json(self._document)
+        if not outline.chapters:
+            raise ValueError("The streamed outline has no chapters")
+        return outline
+
+    @staticmethod
+    def _parse_chapter(candidate: str):
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        if not isinstance(data.get("title"), str) or not isinstance(
+            data.get("description"), str
+        ):
+            return None
+        return ChapterOutline(title=data["title"], description=data["description"])
@@ -0,0 +1,78 @@
+import asyncio
+import itertools
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict
+
+# Chapters of one book written at the same time unless a run asks otherwise
+DEFAULT_MAX_CONCURRENT_CHAPTERS = 4
+
+
+class CrewScheduler:
+    """Hands out a global number of crew slots fairly across many books
+
+    Every crew kickoff waits for a slot first. When a slot frees up it goes to
+    the waiting book with the highest priority; between books of equal
+    priority the one with the fewest crews running wins, and ties go to the
+    book that was served least recently. A book with many chapters queued can
+    therefore never starve the others.
+    """
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max(1, max_concurrent)
+        self._running: Dict[str, int] = {}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {}
+        self._priorities: Dict[str, int] = {}
+        self._last_granted: Dict[str, int] = {}
+        self._grants = itertools.count()
+
+    @property
+    def in_flight(self) -> int:
+        return sum(self._running.values())
+
+    @asynccontextmanager
+    async def slot(self, book_id: str, priority: int = 0):
+        await self.acquire(book_id, priority)
+        try:
+            yield
+        finally:
+            self.release(book_id)
+
+    async def acquire(self, book_id: str, priority: int = 0) -> None:
+        self._priorities[book_id] = priority
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(book_id, deque()).append(future)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just before the cancellation arrived
+                self.release(book_id)
+            elif future in self._waiters[book_id]:
+                self._waiters[book_id].remove(future)
+            raise
+
+    def release(self, book_id: str) -> None:
+        self._running[book_id] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self.in_flight < self.max_concurrent:
+            waiting = [book_id for book_id, queue in self._waiters.items() if queue]
+            if not waiting:
+                return
+            book_id = min(
+                waiting,
+                key=lambda book_id: (
+                    -self._priorities[book_id],
+                    self._running.get(book_id, 0),
+                    self._last_granted.get(book_id, -1),
+                ),
+            )
+            future = self._waiters[book_id].popleft()
+            if future.cancelled():
+                continue
+            self._running[book_id] = self._running.get(book_id, 0) + 1
+            self._last_granted[book_id] = next(self._grants)
+            future.set_result(None)
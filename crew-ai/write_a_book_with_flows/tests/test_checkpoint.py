@@ -0,0 +1,24 @@
+import pytest
+from pydantic import BaseModel
+from write_a_book_with_flows.checkpoint import CheckpointStore
+
+
+class State(BaseModel):
+    id: str
+    chapters: list = []
+
+
+def test_saved_state_is_loaded_back(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    store.save(State(id="run", chapters=["one"]))
+    path = store.save(State(id="run", chapters=["one", "two"]))
+
+    assert store.load("run", State) == State(id="run", chapters=["one", "two"])
+    assert [item.name for item in path.parent.iterdir()] == ["run.json"]
+
+
+def test_missing_checkpoint_is_reported(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+
+    with pytest.raises(FileNotFoundError, match="other"):
+        store.load("other", State)
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+from write_a_book_with_flows.outline_parser import ChapterOutlineStreamParser
+
+OUTLINE = {
+    "chapters": [
+        {"title": "Basics", "description": 'Sets up {the} "terms"'},
+        {"title": "Patterns", "description": "The common patterns"},
+    ]
+}
+
+
+def test_chapters_are_returned_as_soon_as_they_close():
+    parser = ChapterOutlineStreamParser()
+    text = json.dumps(OUTLINE)
+    first_end = text.index("},") + 1
+
+    assert parser.feed(text[: first_end - 1]) == []
+    chapters = parser.feed(text[first_end - 1 : first_end])
+    assert [chapter.title for chapter in chapters] == ["Basics"]
+    # Braces and quotes inside strings do not end the chapter early
+    assert chapters[0].description == 'Sets up {the} "terms"'
+
+    with pytest.raises(ValueError, match="ended before"):
+        parser.outline()
+
+
+def test_outline_is_validated_once_the_stream_ends():
+    parser = ChapterOutlineStreamParser()
+    text = "Here is the outline:\n" + json.dumps(OUTLINE)
+    chapters = []
+    for start in range(0, len(text), 7):
+        chapters.extend(parser.feed(text[start : start + 7]))
+
+    assert [chapter.title for chapter in chapters] == ["Basics", "Patterns"]
+    assert parser.outline().chapters == chapters
+
+
+def test_outline_without_chapters_is_rejected():
+    parser = ChapterOutlineStreamParser()
+    parser.feed('{"chapters": []}')
+
+    with pytest.raises(ValueError, match="no chapters"):
+        parser.outline()
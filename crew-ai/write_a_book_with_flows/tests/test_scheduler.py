@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from write_a_book_with_flows.scheduler import CrewScheduler
+
+
+def test_no_more_crews_run_than_there_are_slots():
+    async def main():
+        scheduler = CrewScheduler(2)
+        peak = 0
+
+        async def crew():
+            nonlocal peak
+            async with scheduler.slot("book"):
+                peak = max(peak, scheduler.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(crew() for _ in range(6)))
+        return peak, scheduler.in_flight
+
+    assert asyncio.run(main()) == (2, 0)
+
+
+def test_books_take_turns():
+    order = []
+
+    async def main():
+        scheduler = CrewScheduler(1)
+
+        async def crew(book_id):
+            async with scheduler.slot(book_id):
+                order.append(book_id)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*(crew("long") for _ in range(3)), crew("short"))
+
+    asyncio.run(main())
+    # The book that queued last is not held up by every chapter of the other
+    assert order == ["long", "short", "long", "long"]
+
+
+def test_higher_priority_books_go_first():
+    order = []
+
+    async def main():
+        scheduler = CrewScheduler(1)
+        await scheduler.acquire("running")
+
+        async def crew(book_id, priority):
+            async with scheduler.slot(book_id, priority):
+                order.append(book_id)
+
+        waiting = [
+            asyncio.create_task(crew("low", 0)),
+            asyncio.create_task(crew("high", 5)),
+        ]
+        await asyncio.sleep(0)
+        scheduler.release("running")
+        await asyncio.gather(*waiting)
+
+    asyncio.run(main())
+    assert order == ["high", "low"]
+
+
+def test_cancelled_wait_gives_up_its_place():
+    async def main():
+        scheduler = CrewScheduler(1)
+        await scheduler.acquire("running")
+        waiter = asyncio.create_task(scheduler.acquire("cancelled"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        scheduler.release("running")
+        return scheduler.in_flight
+
+    assert asyncio.run(main()) == 0
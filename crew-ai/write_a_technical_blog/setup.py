@@ -6,6 +6,7 @@ setup(
     packages=find_packages("src"),
     package_dir={"": "src"},
     install_requires=[
+        "agent-experiments-common[crewai]",
         "crewai",
         "langchain-openai",
         "crewai-tools",
@@ -0,0 +1,183 @@
+import copy
+import threading
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from common.crew.tracing import TracedAgent
+from common.tracing import get_tracer
+from crewai import Crew
+from pydantic import BaseModel, PrivateAttr
+
+MAX_DELEGATION_DEPTH = "max_delegation_depth"
+MAX_DELEGATIONS = "max_delegations"
+MAX_LLM_CALLS = "max_llm_calls"
+
+# Ids of the delegated tasks the current thread is working on, outermost first
+_delegation_stack: ContextVar[Tuple[int, ...]] = ContextVar(
+    "delegation_stack", default=()
+)
+
+
+class BudgetLimits(BaseModel):
+    """Limits on the work one crew run may do; None means unlimited
+
+    In a hierarchical crew every task the manager hands out is a delegation of
+    depth 1, and an agent that delegates again from there goes one level
+    deeper.
+    """
+
+    max_delegation_depth: Optional[int] = None
+    max_delegations: Optional[int] = None
+    max_llm_calls: Optional[int] = None
+
+    def with_overrides(self, **overrides: Optional[int]) -> "BudgetLimits":
+        """Returns a copy with every limit that is not None replaced"""
+        return self.model_copy(
+            update={
+                name: value for name, value in overrides.items() if value is not None
+            }
+        )
+
+
+class CrewBudget:
+    """Enforces the delegation and LLM call limits of a single crew run
+
+    When a limit is hit the crew degrades instead of failing: further
+    delegations are refused so the delegating agent finishes the work itself,
+    and further LLM calls are answered with the best result so far so every
+    remaining task completes immediately. The limits that tripped are kept in
+    tripped and recorded in the run trace.
+    """
+
+    def __init__(self, limits: BudgetLimits):
+        self.limits = limits
+        self.llm_calls = 0
+        self.delegations = 0
+        self.max_depth_reached = 0
+        self.tripped: List[str] = []
+        self.best_result = ""
+        self._task_ids = set()
+        self._lock = threading.Lock()
+
+    def bind(self, crew: Crew) -> Crew:
+        """Makes the agents and LLMs of a crew draw on this budget
+
+        The LLMs are copied first since they are shared between crews.
+        """
+        self._task_ids = {id(task) for task in crew.tasks}
+        for crew_agent in crew.agents:
+            crew_agent.llm = self._budgeted(crew_agent.llm)
+            if isinstance(crew_agent, BudgetedAgent):
+                crew_agent._budget = self
+        if crew.manager_llm is not None:
+            crew.manager_llm = self._budgeted(crew.manager_llm)
+        return crew
+
+    def _budgeted(self, llm):
+        if not hasattr(llm, "budget"):
+            return llm
+        llm = copy.copy(llm)
+        llm.budget = self
+        return llm
+
+    def is_crew_task(self, task) -> bool:
+        return id(task) in self._task_ids
+
+    def allow_llm_call(self) -> bool:
+        with self._lock:
+            limit = self.limits.max_llm_calls
+            if limit is None or self.llm_calls < limit:
+                self.llm_calls += 1
+                return True
+        self._trip(MAX_LLM_CALLS)
+        return False
+
+    def start_delegation(self, depth: int) -> Optional[str]:
+        """Counts a delegation, or returns the refusal to give the delegator"""
+        with self._lock:
+            if (
+                self.limits.max_delegation_depth is not None
+                and depth > self.limits.max_delegation_depth
+            ):
+                limit = MAX_DELEGATION_DEPTH
+            elif (
+                self.limits.max_delegations is not None
+                and self.delegations >= self.limits.max_delegations
+            ):
+                limit = MAX_DELEGATIONS
+            else:
+                self.delegations += 1
+                self.max_depth_reached = max(self.max_depth_reached, depth)
+                return None
+        self._trip(limit)
+        return (
+            f"Delegation refused: this crew has reached its {limit} limit. "
+            "Do not delegate again; complete the task yourself with the "
+            "information you already have."
+        )
+
+    def record_result(self, result: str) -> None:
+        if result and result.strip():
+            with self._lock:
+                self.best_result = result
+
+    def final_answer(self) -> str:
+        """LLM response that makes an agent stop with the best result so far"""
+        with self._lock:
+            best = self.best_result
+        return (
+            "Thought: The LLM call budget of this crew is used up, so I return "
+            "the best result so far.\n"
+            f"Final Answer: {best or 'No result was produced within the budget.'}"
+        )
+
+    def _trip(self, limit: str) -> None:
+        with self._lock:
+            if limit in self.tripped:
+                return
+            self.tripped.append(limit)
+        tracer = get_tracer()
+        if tracer is not None:
+            tracer.record(
+                "budget",
+                limit,
+                wall_s=0.0,
+                llm_calls=self.llm_calls,
+                delegations=self.delegations,
+                max_depth_reached=self.max_depth_reached,
+            )
+
+    def stats(self) -> dict:
+        return {
+            "llm_calls": self.llm_calls,
+            "delegations": self.delegations,
+            "max_depth_reached": self.max_depth_reached,
+            "tripped": list(self.tripped),
+        }
+
+
+class BudgetedAgent(TracedAgent):
+    """TracedAgent whose delegations draw on the budget of its crew run"""
+
+    _budget: Optional[CrewBudget] = PrivateAttr(default=None)
+
+    def execute_task(self, task, context=None, tools=None) -> str:
+        budget = self._budget
+        stack = _delegation_stack.get()
+        # Agent.execute_task calls itself again when an attempt fails, which
+        # is a retry of the same work rather than a new delegation
+        if budget is None or budget.is_crew_task(task) or id(task) in stack:
+            result = super().execute_task(task, context, tools)
+        else:
+            refusal = budget.start_delegation(len(stack) + 1)
+            if refusal is not None:
+                return refusal
+            token = _delegation_stack.set(stack + (id(task),))
+            try:
+                result = super().execute_task(task, context, tools)
+            finally:
+                _delegation_stack.reset(token)
+
+        if budget is not None:
+            budget.record_result(result)
+        return result
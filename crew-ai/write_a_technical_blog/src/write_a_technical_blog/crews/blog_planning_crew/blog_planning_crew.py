@@ -1,7 +1,10 @@
+from common.crew.model_router import RoutedLLM, routed_llm
+from common.crew.tools import CachedSerperDevTool
+from common.crew.tracing import TracedTask
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import SerperDevTool
-from langchain_openai import ChatOpenAI
+from write_a_technical_blog.budget import BudgetedAgent, BudgetLimits
+from write_a_technical_blog.task_graph import DAG, HIERARCHICAL, apply_task_graph
 from write_a_technical_blog.types import BlogRoadmap
 
 
@@ -11,58 +14,78 @@ class BlogPlanningCrew:
 
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
-    llm = ChatOpenAI(model="gpt-4o-mini")  # Default model, can be changed later
+
+    # Limits of a single run; the flow binds a CrewBudget before each kickoff
+    budget_limits = BudgetLimits(
+        max_delegation_depth=2,
+        max_delegations=8,
+        max_llm_calls=60,
+    )
+
+    # Dependencies between the tasks when the crew runs in the dag process mode
+    task_graph = {
+        "develop_strategy": [],
+        "create_blog_outlines": ["develop_strategy"],
+        "review_roadmap": ["develop_strategy", "create_blog_outlines"],
+    }
+
+    def __init__(self, process_mode: str = HIERARCHICAL):
+        self.process_mode = process_mode
+
+    def route(self, agent_name: str) -> RoutedLLM:
+        """The LLM routed by the llm_route of an agent in agents.yaml"""
+        return routed_llm(f"planning.{agent_name}", self.agents_config[agent_name])
 
     @agent
     def strategist(self) -> Agent:
         """Strategist agent - develops high-level strategy for the blog series"""
-        search_tool = SerperDevTool()
-        return Agent(
+        search_tool = CachedSerperDevTool()
+        return BudgetedAgent(
             config=self.agents_config["strategist"],
             tools=[search_tool],
-            llm=self.llm,
-            allow_delegation=True,
+            llm=self.route("strategist"),
+            allow_delegation=self.process_mode == HIERARCHICAL,
             verbose=True,
         )
 
     @agent
     def planner(self) -> Agent:
         """Planner agent - creates detailed outlines for each blog post"""
-        return Agent(
+        return BudgetedAgent(
             config=self.agents_config["planner"],
-            llm=self.llm,
-            allow_delegation=True,
+            llm=self.route("planner"),
+            allow_delegation=self.process_mode == HIERARCHICAL,
             verbose=True,
         )
 
     @agent
     def reviewer(self) -> Agent:
         """Reviewer agent - ensures the plan is coherent and valuable"""
-        return Agent(
+        return BudgetedAgent(
             config=self.agents_config["reviewer"],
-            llm=self.llm,
-            allow_delegation=True,
+            llm=self.route("reviewer"),
+            allow_delegation=self.process_mode == HIERARCHICAL,
             verbose=True,
         )
 
     @task
     def develop_strategy(self) -> Task:
         """Task for developing the high-level strategy for the blog series"""
-        return Task(
+        return TracedTask(
             config=self.tasks_config["develop_strategy"],
         )
 
     @task
     def create_blog_outlines(self) -> Task:
         """Task for creating detailed outlines for each blog post"""
-        return Task(
+        return TracedTask(
             config=self.tasks_config["create_blog_outlines"],
         )
 
     @task
     def review_roadmap(self) -> Task:
         """Task for reviewing the blog roadmap"""
-        return Task(
+        return TracedTask(
             config=self.tasks_config["review_roadmap"],
             output_pydantic=BlogRoadmap,
         )
@@ -70,10 +93,17 @@ class BlogPlanningCrew:
     @crew
     def crew(self) -> Crew:
         """Creates the Blog Planning Crew"""
+        if self.process_mode == DAG:
+            return Crew(
+                agents=self.agents,
+                tasks=apply_task_graph(self.tasks, self.task_graph),
+                process=Process.sequential,
+                verbose=True,
+            )
         return Crew(
             agents=self.agents,
             tasks=self.tasks,
-            manager_llm=ChatOpenAI(model="gpt-4o", temperature=0.3),
+            manager_llm=routed_llm("planning.manager", tier="strong", temperature=0.3),
             process=Process.hierarchical,
             verbose=True,
         )
@@ -1,11 +1,20 @@
+import functools
+
+from common.crew.model_router import RoutedLLM, routed_llm
+from common.crew.templates import CrewTemplate
+from common.crew.tools import CachedScrapeWebsiteTool, CachedSerperDevTool
+from common.crew.tracing import TracedTask
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import ScrapeWebsiteTool, SerperDevTool
-from langchain_openai import ChatOpenAI
+from write_a_technical_blog.budget import BudgetedAgent, BudgetLimits
+from write_a_technical_blog.task_graph import DAG, HIERARCHICAL, apply_task_graph
 from write_a_technical_blog.types import BlogPost
 
-search_tool = SerperDevTool()
-scrape_tool = ScrapeWebsiteTool()
+
+@functools.lru_cache(maxsize=None)
+def research_tools() -> tuple:
+    """The search and scrape tools, built once and shared by every agent"""
+    return CachedSerperDevTool(), CachedScrapeWebsiteTool()
 
 
 @CrewBase
@@ -14,93 +23,120 @@ class BlogWritingCrew:
 
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
-    llm = ChatOpenAI(model="gpt-4o-mini")  # Default model, can be changed later
+
+    # Limits of a single run; the flow binds a CrewBudget before each kickoff
+    budget_limits = BudgetLimits(
+        max_delegation_depth=2,
+        max_delegations=12,
+        max_llm_calls=120,
+    )
+
+    # Dependencies between the tasks when the crew runs in the dag process
+    # mode; code examples and diagrams are written in parallel
+    task_graph = {
+        "research_topic": [],
+        "write_content": ["research_topic"],
+        "create_code_examples": ["research_topic", "write_content"],
+        "create_diagrams": ["write_content"],
+        "review_blog_post": [
+            "write_content",
+            "create_code_examples",
+            "create_diagrams",
+        ],
+    }
+
+    def __init__(self, process_mode: str = HIERARCHICAL):
+        self.process_mode = process_mode
+
+    def route(self, agent_name: str) -> RoutedLLM:
+        """The LLM routed by the llm_route of an agent in agents.yaml"""
+        return routed_llm(f"writing.{agent_name}", self.agents_config[agent_name])
 
     @agent
     def researcher(self) -> Agent:
         """Researcher agent - gathers information on the topic"""
-        return Agent(
+        return BudgetedAgent(
             config=self.agents_config["researcher"],
-            tools=[search_tool, scrape_tool],
-            llm=self.llm,
-            allow_delegation=True,
+            tools=list(research_tools()),
+            llm=self.route("researcher"),
+            allow_delegation=self.process_mode == HIERARCHICAL,
             verbose=True,
         )
 
     @agent
     def content_writer(self) -> Agent:
         """Content Writer agent - creates the main blog content"""
-        return Agent(
+        return BudgetedAgent(
             config=self.agents_config["content_writer"],
-            tools=[search_tool, scrape_tool],
-            llm=self.llm,
-            allow_delegation=True,
+            tools=list(research_tools()),
+            llm=self.route("content_writer"),
+            allow_delegation=self.process_mode == HIERARCHICAL,
             verbose=True,
         )
 
     @agent
     def code_writer(self) -> Agent:
         """Code Writer agent - develops clear, well-documented code examples"""
-        return Agent(
+        return BudgetedAgent(
             config=self.agents_config["code_writer"],
-            tools=[search_tool, scrape_tool],
-            llm=self.llm,
-            allow_delegation=True,
+            tools=list(research_tools()),
+            llm=self.route("code_writer"),
+            allow_delegation=self.process_mode == HIERARCHICAL,
             verbose=True,
         )
 
     @agent
     def diagram_creator(self) -> Agent:
         """Diagram Creator agent - creates visual diagrams using Mermaid"""
-        return Agent(
+        return BudgetedAgent(
             config=self.agents_config["diagram_creator"],
-            llm=self.llm,
-            allow_delegation=True,
+            llm=self.route("diagram_creator"),
+            allow_delegation=self.process_mode == HIERARCHICAL,
             verbose=True,
         )
 
     @agent
     def reviewer(self) -> Agent:
         """Reviewer agent - ensures the blog post is accurate and engaging"""
-        return Agent(
+        return BudgetedAgent(
             config=self.agents_config["reviewer"],
-            llm=self.llm,
-            allow_delegation=True,
+            llm=self.route("reviewer"),
+            allow_delegation=self.process_mode == HIERARCHICAL,
             verbose=True,
         )
 
     @task
     def research_topic(self) -> Task:
         """Task for researching the blog post topic"""
-        return Task(
+        return TracedTask(
             config=self.tasks_config["research_topic"],
         )
 
     @task
     def write_content(self) -> Task:
         """Task for writing the main blog content"""
-        return Task(
+        return TracedTask(
             config=self.tasks_config["write_content"],
         )
 
     @task
     def create_code_examples(self) -> Task:
         """Task for creating code examples for the blog post"""
-        return Task(
+        return TracedTask(
             config=self.tasks_config["create_code_examples"],
         )
 
     @task
     def create_diagrams(self) -> Task:
         """Task for creating diagrams for the blog post"""
-        return Task(
+        return TracedTask(
             config=self.tasks_config["create_diagrams"],
         )
 
     @task
     def review_blog_post(self) -> Task:
         """Task for reviewing the blog post"""
-        return Task(
+        return TracedTask(
             config=self.tasks_config["review_blog_post"],
             output_pydantic=BlogPost,
         )
@@ -108,10 +144,22 @@ class BlogWritingCrew:
     @crew
     def crew(self) -> Crew:
         """Creates the Blog Writing Crew"""
+        if self.process_mode == DAG:
+            return Crew(
+                agents=self.agents,
+                tasks=apply_task_graph(self.tasks, self.task_graph),
+                process=Process.sequential,
+                verbose=True,
+            )
         return Crew(
             agents=self.agents,
             tasks=self.tasks,
-            manager_llm=ChatOpenAI(model="gpt-4o", temperature=0.3),
+            manager_llm=routed_llm("writing.manager", tier="strong", temperature=0.3),
             process=Process.hierarchical,
             verbose=True,
         )
+
+
+# Shared by every post so the config and agents are only built once
+blog_writing_crew_template = CrewTemplate(lambda: BlogWritingCrew().crew())
+blog_writing_dag_crew_template = CrewTemplate(lambda: BlogWritingCrew(DAG).crew())
@@ -0,0 +1,138 @@
+from typing import List, Optional
+
+from common.crew.estimate import RunEstimate, TaskEstimate, estimate_crew
+from common.roadmap import load_roadmap
+from write_a_technical_blog.crews.blog_planning_crew.blog_planning_crew import (
+    BlogPlanningCrew,
+)
+from write_a_technical_blog.crews.blog_writing_crew.blog_writing_crew import (
+    BlogWritingCrew,
+    blog_writing_crew_template,
+    blog_writing_dag_crew_template,
+)
+from write_a_technical_blog.post_manifest import (
+    PostManifest,
+    crew_config_hash,
+    post_crew_inputs,
+    post_input_hash,
+)
+from write_a_technical_blog.task_graph import DAG, HIERARCHICAL, PROCESS_MODES
+from write_a_technical_blog.types import BlogPostOutline
+
+# Posts assumed when the roadmap is still to be planned
+DEFAULT_ESTIMATED_POSTS = 5
+
+
+def _check_limits(
+    estimate: RunEstimate,
+    item: str,
+    rows: List[TaskEstimate],
+    max_llm_calls: Optional[int],
+) -> None:
+    calls = sum(row.calls for row in rows)
+    if max_llm_calls is not None and calls > max_llm_calls:
+        estimate.notes.append(
+            f"{item}: {calls} projected calls exceed the limit of {max_llm_calls} "
+            f"per crew run, so the run would stop early"
+        )
+
+
+def estimate_blog_run(
+    topic: str,
+    goal: str,
+    skip_planning: bool = False,
+    roadmap_file: Optional[str] = None,
+    process_mode: str = HIERARCHICAL,
+    max_concurrent_posts: int = 1,
+    max_delegation_depth: Optional[int] = None,
+    max_delegations: Optional[int] = None,
+    max_llm_calls: Optional[int] = None,
+    incremental: bool = False,
+    estimated_posts: Optional[int] = None,
+) -> RunEstimate:
+    """Check the inputs and configs of a blog run and project what it will spend
+
+    Every task prompt is rendered with the inputs the flow would pass and its
+    tokens are counted locally; no LLM is called. Without a roadmap the
+    writing crew is projected for estimated_posts posts, or
+    DEFAULT_ESTIMATED_POSTS when it is None.
+
+    Raises ValueError when an input or config would make the run fail.
+    """
+    if process_mode not in PROCESS_MODES:
+        raise ValueError(
+            f"Unknown process mode {process_mode!r}, expected one of {PROCESS_MODES}"
+        )
+    if max_concurrent_posts < 1:
+        raise ValueError("max_concurrent_posts must be at least 1")
+    limits = {
+        "max_delegation_depth": max_delegation_depth,
+        "max_delegations": max_delegations,
+        "max_llm_calls": max_llm_calls,
+    }
+    for name, value in limits.items():
+        if value is not None and value < 0:
+            raise ValueError(f"{name} must not be negative")
+    if skip_planning and not roadmap_file:
+        raise ValueError("roadmap_file must be provided when skip_planning is True")
+
+    estimate = RunEstimate()
+    if skip_planning:
+        try:
+            roadmap = load_roadmap(roadmap_file)
+        except Exception as exc:
+            raise ValueError(f"Cannot read roadmap {roadmap_file}: {exc}") from exc
+        if not roadmap.posts:
+            raise ValueError(f"Roadmap {roadmap_file} has no posts")
+        topic, goal, outlines = roadmap.topic, roadmap.goal, roadmap.posts
+    else:
+        estimated_posts = estimated_posts or DEFAULT_ESTIMATED_POSTS
+        planning_limits = BlogPlanningCrew.budget_limits.with_overrides(**limits)
+        rows = estimate_crew(
+            BlogPlanningCrew(process_mode).crew(),
+            {"topic": topic, "goal": goal},
+            "roadmap",
+        )
+        estimate.rows.extend(rows)
+        _check_limits(estimate, "roadmap", rows, planning_limits.max_llm_calls)
+        outlines = [
+            BlogPostOutline(title=f"Post {index + 1} on {topic}", description=goal)
+            for index in range(estimated_posts)
+        ]
+        estimate.notes.append(
+            f"The roadmap is not planned yet, so {estimated_posts} posts are "
+            f"assumed; pass a roadmap file for an exact projection"
+        )
+
+    reused = set()
+    if incremental and skip_planning:
+        manifest = PostManifest()
+        config_hash = crew_config_hash(BlogWritingCrew)
+        for index in range(len(outlines)):
+            input_hash = post_input_hash(
+                post_crew_inputs(outlines, index, topic, goal),
+                config_hash,
+                process_mode,
+            )
+            if manifest.lookup(input_hash) is not None:
+                reused.add(index)
+        if reused:
+            estimate.notes.append(
+                f"{len(reused)} of {len(outlines)} posts are up to date and reused"
+            )
+
+    crew_template = (
+        blog_writing_dag_crew_template
+        if process_mode == DAG
+        else blog_writing_crew_template
+    )
+    writing_limits = BlogWritingCrew.budget_limits.with_overrides(**limits)
+    for index, outline in enumerate(outlines):
+        if index in reused:
+            continue
+        item = f"{index + 1}. {outline.title}"
+        inputs = post_crew_inputs(outlines, index, topic, goal)
+        rows = estimate_crew(crew_template.crew(), inputs, item)
+        estimate.rows.extend(rows)
+        _check_limits(estimate, item, rows, writing_limits.max_llm_calls)
+    return estimate
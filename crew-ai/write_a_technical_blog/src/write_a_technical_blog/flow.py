@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Optional
+
+from common.log_config import LOGGER_NAME, log_context
+from common.roadmap import Roadmap, load_roadmap, save_roadmap
+from common.tracing import trace_span
+from crewai.flow.flow import Flow, listen, start
+from pydantic import BaseModel, Field
+from write_a_technical_blog.budget import CrewBudget
+from write_a_technical_blog.crews.blog_planning_crew.blog_planning_crew import (
+    BlogPlanningCrew,
+)
+from write_a_technical_blog.crews.blog_writing_crew.blog_writing_crew import (
+    BlogWritingCrew,
+    blog_writing_crew_template,
+    blog_writing_dag_crew_template,
+)
+from write_a_technical_blog.post_manifest import (
+    PostManifest,
+    crew_config_hash,
+    post_crew_inputs,
+    post_input_hash,
+)
+from write_a_technical_blog.task_graph import DAG, HIERARCHICAL
+from write_a_technical_blog.types import BlogPost, BlogPostOutline
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class BlogState(BaseModel):
+    """State for the blog writing flow"""
+
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    title: str = "Python Design Patterns for Machine Learning"
+    blog_posts: list[BlogPost] = []
+    blog_roadmap: list[BlogPostOutline] = []
+    failed_posts: list[str] = []
+    # Reuse posts whose inputs have not changed since they were last written
+    incremental: bool = False
+    # Titles of the posts read back from the output directory
+    reused_posts: list[str] = []
+    # Number of posts written at the same time; 1 writes them one by one
+    max_concurrent_posts: int = 1
+    # "hierarchical" crews are run by a manager LLM, "dag" crews follow their
+    # task graph without one
+    process_mode: str = HIERARCHICAL
+    # Override the budget limits declared on the crews when set
+    max_delegation_depth: Optional[int] = None
+    max_delegations: Optional[int] = None
+    max_llm_calls: Optional[int] = None
+    # Limits that tripped, keyed by "roadmap" or the title of the post
+    budget_trips: dict[str, list[str]] = {}
+    topic: str = "Python Design Patterns for Machine Learning"
+    goal: str = """
+        Create a comprehensive series of technical blog posts about comprehensive
+        overview with examples of the most common design patterns used in machine
+        learning. Each post should explain a specific pattern with real-world
+        examples, code snippets, and diagrams. The content should be suitable for
+        intermediate Python ML Engineers looking to improve their skills.
+    """
+
+
+class BlogFlow(Flow[BlogState]):
+    """Flow for the blog writing process"""
+
+    initial_state = BlogState
+    skip_planning = False
+
+    def __init__(self, skip_planning=False, roadmap_file=None):
+        """Initialize the flow with options to skip planning phase."""
+        super().__init__()
+        self.skip_planning = skip_planning
+        self.roadmap_file = roadmap_file
+
+        # If skipping planning and using roadmap file, parse it
+        if self.skip_planning and self.roadmap_file:
+            roadmap = load_roadmap(self.roadmap_file)
+            self.state.topic = roadmap.topic
+            self.state.goal = roadmap.goal
+            self.state.blog_roadmap = roadmap.posts
+            logger.info(
+                f"Loaded roadmap from {roadmap_file} with {len(roadmap.posts)} posts"
+            )
+
+    def crew_budget(self, crew_class) -> CrewBudget:
+        """Budget for one run of a crew, with the limits set on the state"""
+        return CrewBudget(
+            crew_class.budget_limits.with_overrides(
+                max_delegation_depth=self.state.max_delegation_depth,
+                max_delegations=self.state.max_delegations,
+                max_llm_calls=self.state.max_llm_calls,
+            )
+        )
+
+    def record_budget(self, key, budget, span):
+        """Log and keep the limits a crew run hit"""
+        if span is not None:
+            span.fields["budget"] = budget.stats()
+        if budget.tripped:
+            logger.warning(
+                f"{key}: budget limit {budget.tripped} reached, using the best "
+                f"result so far ({budget.stats()})"
+            )
+            self.state.budget_trips[key] = budget.tripped
+
+    @start()
+    def generate_blog_roadmap(self):
+        """Generate the roadmap for the blog series"""
+        # Skip planning if using an existing roadmap
+        if self.skip_planning:
+            logger.info("Skipping planning phase, using provided roadmap")
+            return self.state.blog_roadmap
+
+        logger.info("Starting the Blog Planning Crew")
+        budget = self.crew_budget(BlogPlanningCrew)
+        with trace_span(
+            "crew", "BlogPlanningCrew", process_mode=self.state.process_mode
+        ) as span:
+            crew = budget.bind(BlogPlanningCrew(self.state.process_mode).crew())
+            output = crew.kickoff(
+                inputs={"topic": self.state.topic, "goal": self.state.goal}
+            )
+            self.record_budget("roadmap", budget, span)
+
+        posts = output["posts"]
+        logger.info(f"Blog Posts Roadmap: {posts}")
+
+        self.state.blog_roadmap = posts
+
+        # Save the roadmap with its JSON sidecar to the output directory
+        roadmap_path = save_roadmap(
+            Roadmap(topic=self.state.topic, goal=self.state.goal, posts=posts)
+        )
+        logger.info(f"Roadmap saved to {roadmap_path}")
+
+        return posts
+
+    @listen(generate_blog_roadmap)
+    async def write_blog_posts(self):
+        """Write each blog post in the roadmap"""
+        logger.info("Writing Blog Posts")
+
+        os.makedirs("output", exist_ok=True)
+
+        # Crew kickoff is blocking, so each post runs in a worker thread and
+        # the semaphore caps how many posts are written at the same time
+        semaphore = asyncio.Semaphore(max(1, self.state.max_concurrent_posts))
+        crew_template = (
+            blog_writing_dag_crew_template
+            if self.state.process_mode == DAG
+            else blog_writing_crew_template
+        )
+
+        # Every post written is recorded in the manifest, so an incremental
+        # run can reuse the posts of any earlier run
+        manifest = PostManifest()
+        config_hash = crew_config_hash(BlogWritingCrew)
+        post_inputs = [
+            post_crew_inputs(
+                self.state.blog_roadmap, i, self.state.topic, self.state.goal
+            )
+            for i in range(len(self.state.blog_roadmap))
+        ]
+        input_hashes = [
+            post_input_hash(inputs, config_hash, self.state.process_mode)
+            for inputs in post_inputs
+        ]
+        self.state.reused_posts = []
+
+        async def write_single_post(post_outline, index):
+            """Write a single blog post"""
+            with log_context(post_index=index):
+                if self.state.incremental:
+                    post = manifest.lookup(input_hashes[index])
+                    if post is not None:
+                        logger.info(
+                            f"Blog Post {index + 1} is up to date: {post_outline.title}"
+                        )
+                        self.state.reused_posts.append(post_outline.title)
+                        return post
+
+                queued = time.perf_counter()
+                async with semaphore:
+                    queue_s = time.perf_counter() - queued
+                    logger.info(f"Writing Blog Post {index + 1}: {post_outline.title}")
+                    inputs = post_inputs[index]
+                    budget = self.crew_budget(BlogWritingCrew)
+                    with trace_span(
+                        "crew",
+                        "BlogWritingCrew",
+                        queue_s=queue_s,
+                        post=index + 1,
+                        process_mode=self.state.process_mode,
+                    ) as span:
+                        output = await asyncio.to_thread(
+                            lambda: budget.bind(crew_template.crew()).kickoff(
+                                inputs=inputs
+                            )
+                        )
+                        self.record_budget(post_outline.title, budget, span)
+
+                if output.pydantic is not None:
+                    post = BlogPost(title=output["title"], content=output["content"])
+                else:
+                    # A crew that ran out of budget may return plain text
+                    post = BlogPost(title=post_outline.title, content=output.raw)
+                title = post.title
+                content = post.content
+
+                # Save the blog post as soon as it is written
+                filename = f"output/Blog_Post_{index + 1}_{title.replace(' ', '_')}.md"
+                with open(filename, "w", encoding="utf-8") as file:
+                    file.write(content)
+
+                logger.info(f"Blog post saved as {filename}")
+
+                # A post cut short by its budget is written again next time
+                if post_outline.title not in self.state.budget_trips:
+                    manifest.record(input_hashes[index], post, filename)
+                    manifest.save()
+
+                return post
+
+        # Gather keeps the posts in roadmap order and return_exceptions stops
+        # one failed post from cancelling the others
+        results = await asyncio.gather(
+            *(
+                write_single_post(post_outline, i)
+                for i, post_outline in enumerate(self.state.blog_roadmap)
+            ),
+            return_exceptions=True,
+        )
+
+        self.state.failed_posts = []
+        for post_outline, result in zip(self.state.blog_roadmap, results):
+            if isinstance(result, BaseException):
+                logger.error(
+                    f"Failed to write blog post '{post_outline.title}': {result}"
+                )
+                self.state.failed_posts.append(post_outline.title)
+            else:
+                self.state.blog_posts.append(result)
+
+        if self.state.failed_posts:
+            logger.error(f"Failed blog posts: {self.state.failed_posts}")
+
+        for path in manifest.prune(input_hashes):
+            logger.info(f"{path} is no longer in the roadmap")
+        manifest.save()
+        if self.state.incremental:
+            logger.info(
+                f"Reused {len(self.state.reused_posts)} of "
+                f"{len(self.state.blog_roadmap)} blog posts"
+            )
+
+        logger.info(f"Completed writing {len(self.state.blog_posts)} blog posts")
+        return self.state.blog_posts
@@ -1,222 +1,146 @@
 #!/usr/bin/env python
 import logging
 import os
-import re
-import uuid
 
-from crewai.flow.flow import Flow, listen, start
-from pydantic import BaseModel, Field
-from write_a_technical_blog.crews.blog_planning_crew.blog_planning_crew import (
-    BlogPlanningCrew,
-)
-from write_a_technical_blog.crews.blog_writing_crew.blog_writing_crew import (
-    BlogWritingCrew,
-)
-from write_a_technical_blog.types import BlogPost, BlogPostOutline
+from common.log_config import LOGGER_NAME, log_context, setup_logging
+from write_a_technical_blog.task_graph import HIERARCHICAL, PROCESS_MODES
 
+logger = logging.getLogger(LOGGER_NAME)
 
-# Configure logging
-def setup_logging(log_file="output/blog_generation.log"):
-    """Set up logging to file and console"""
-    # Create output directory if it doesn't exist
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
 
-    # Create logger
-    logger = logging.getLogger("blog_generator")
-    logger.setLevel(logging.DEBUG)
+def __getattr__(name):
+    # The flow pulls in crewai, so it is only imported once it is used
+    if name in ("BlogFlow", "BlogState"):
+        from write_a_technical_blog import flow
 
-    # File handler (with rotation)
-    file_handler = logging.FileHandler(log_file)
+        return getattr(flow, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    # # Console handler
-    console_handler = logging.StreamHandler()
 
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-
-    return logger
-
-
-# Initialize logger
-logger = setup_logging()
-
-
-class BlogState(BaseModel):
-    """State for the blog writing flow"""
+def kickoff(
+    skip_planning=False,
+    roadmap_file=None,
+    max_concurrent_posts=1,
+    process_mode=HIERARCHICAL,
+    max_delegation_depth=None,
+    max_delegations=None,
+    max_llm_calls=None,
+    incremental=False,
+    dry_run=False,
+    estimated_posts=None,
+):
+    """Run the blog flow
 
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    title: str = "Python Design Patterns for Machine Learning"
-    blog_posts: list[BlogPost] = []
-    blog_roadmap: list[BlogPostOutline] = []
-    topic: str = "Python Design Patterns for Machine Learning"
-    goal: str = """
-        Create a comprehensive series of technical blog posts about comprehensive
-        overview with examples of the most common design patterns used in machine
-        learning. Each post should explain a specific pattern with real-world
-        examples, code snippets, and diagrams. The content should be suitable for
-        intermediate Python ML Engineers looking to improve their skills.
+    Args:
+        skip_planning: If True, skip the planning phase and use roadmap_file instead
+        roadmap_file: Path to the roadmap markdown file, or its JSON or YAML
+            sidecar, to use when skipping planning
+        max_concurrent_posts: Number of blog posts written at the same time
+        process_mode: "hierarchical" to run the crews with a manager LLM, or
+            "dag" to run them along their task graphs
+        max_delegation_depth: Deepest chain of delegations allowed in a crew run
+        max_delegations: Number of delegations allowed in a crew run
+        max_llm_calls: Number of LLM calls allowed in a crew run
+        incremental: If True, only write the posts whose outline or other
+            inputs changed since they were last written
+        dry_run: If True, only check the inputs and configs and log the
+            projected LLM calls, tokens and cost of every task
+        estimated_posts: Number of posts projected when the roadmap is not
+            planned yet, 5 by default
     """
-
-
-def parse_roadmap_file(roadmap_file_path):
-    """Parse a roadmap markdown file to extract topic, goal, and blog post outlines."""
-    with open(roadmap_file_path, "r", encoding="utf-8") as file:
-        content = file.read()
-
-    # Extract topic
-    topic_match = re.search(r"## Topic: (.+?)(?:\n|$)", content)
-    topic = topic_match.group(1).strip() if topic_match else ""
-
-    # Extract goal
-    goal_match = re.search(r"## Goal\n(.*?)\n\n## Planned Posts", content, re.DOTALL)
-    goal = goal_match.group(1).strip() if goal_match else ""
-
-    # Extract planned posts
-    post_outlines = []
-    post_sections = re.finditer(
-        r"### \d+\. (.+?)\n\n(.*?)(?=\n\n### \d+\.|$)", content, re.DOTALL
+    from common.crew.model_router import route_metrics
+    from common.http_pool import pool_stats
+    from common.llm_cache import get_llm_cache
+    from common.page_cache import get_page_cache
+    from common.search_cache import get_search_cache
+    from common.tracing import (
+        TRACE_DIR_ENV,
+        start_tracing,
+        stop_tracing,
+        trace_span,
     )
+    from write_a_technical_blog.dry_run import estimate_blog_run
+    from write_a_technical_blog.flow import BlogFlow, BlogState
 
-    for match in post_sections:
-        title = match.group(1).strip()
-        description = match.group(2).strip()
-        post_outlines.append(BlogPostOutline(title=title, description=description))
-
-    return topic, goal, post_outlines
-
-
-class BlogFlow(Flow[BlogState]):
-    """Flow for the blog writing process"""
-
-    initial_state = BlogState
-    skip_planning = False
-
-    def __init__(self, skip_planning=False, roadmap_file=None):
-        """Initialize the flow with options to skip planning phase."""
-        super().__init__()
-        self.skip_planning = skip_planning
-        self.roadmap_file = roadmap_file
-
-        # If skipping planning and using roadmap file, parse it
-        if self.skip_planning and self.roadmap_file:
-            topic, goal, post_outlines = parse_roadmap_file(self.roadmap_file)
-            self.state.topic = topic
-            self.state.goal = goal
-            self.state.blog_roadmap = post_outlines
-            logger.info(
-                f"Loaded roadmap from {roadmap_file} with {len(post_outlines)} posts"
-            )
-
-    @start()
-    def generate_blog_roadmap(self):
-        """Generate the roadmap for the blog series"""
-        # Skip planning if using an existing roadmap
-        if self.skip_planning:
-            logger.info("Skipping planning phase, using provided roadmap")
-            return self.state.blog_roadmap
-
-        logger.info("Starting the Blog Planning Crew")
-        output = (
-            BlogPlanningCrew()
-            .crew()
-            .kickoff(inputs={"topic": self.state.topic, "goal": self.state.goal})
-        )
-
-        posts = output["posts"]
-        logger.info(f"Blog Posts Roadmap: {posts}")
-
-        self.state.blog_roadmap = posts
-
-        # Create output directory if it doesn't exist
-        os.makedirs("output", exist_ok=True)
-
-        # Save the roadmap to the output directory
-        roadmap_content = "# Blog Series Roadmap\n\n"
-        roadmap_content += f"## Topic: {self.state.topic}\n\n"
-        roadmap_content += f"## Goal\n{self.state.goal}\n\n"
-        roadmap_content += "## Planned Posts\n\n"
-
-        for i, post in enumerate(posts, 1):
-            roadmap_content += f"### {i}. {post.title}\n\n"
-            roadmap_content += f"{post.description}\n\n"
-
-        with open("output/Blog_Series_Roadmap.md", "w", encoding="utf-8") as file:
-            file.write(roadmap_content)
+    setup_logging()
+    logger.info("Starting Blog Generation Flow")
 
-        logger.info("Roadmap saved to output/Blog_Series_Roadmap.md")
+    if skip_planning and not roadmap_file:
+        logger.error("roadmap_file must be provided when skip_planning is True")
+        return
 
-        return posts
+    if skip_planning:
+        logger.info(f"Using roadmap file: {roadmap_file}")
 
-    @listen(generate_blog_roadmap)
-    async def write_blog_posts(self):
-        """Write each blog post in the roadmap"""
-        logger.info("Writing Blog Posts")
+    # Rendering every prompt up front catches a bad config or input before
+    # the first crew spends anything
+    state = BlogState()
+    try:
+        estimate = estimate_blog_run(
+            state.topic,
+            state.goal,
+            skip_planning=skip_planning,
+            roadmap_file=roadmap_file,
+            process_mode=process_mode,
+            max_concurrent_posts=max_concurrent_posts,
+            max_delegation_depth=max_delegation_depth,
+            max_delegations=max_delegations,
+            max_llm_calls=max_llm_calls,
+            incremental=incremental,
+            estimated_posts=estimated_posts,
+        )
+    except ValueError as exc:
+        logger.error(f"Not starting the run: {exc}")
+        return
+    if dry_run:
+        logger.info(f"Dry run, no LLM was called:\n{estimate.format_table()}")
+        return
+    logger.info(f"Projected usage: {estimate.format_summary()}")
 
-        async def write_single_post(post_outline, index):
-            """Write a single blog post"""
-            logger.info(f"Writing Blog Post {index + 1}: {post_outline.title}")
-            post_index_plus_one = index + 1  # Calculate this value separately
-            output = (
-                BlogWritingCrew()
-                .crew()
-                .kickoff(
+    blog_flow = BlogFlow(skip_planning=skip_planning, roadmap_file=roadmap_file)
+    # Everything logged from here on is tagged with the run id
+    with log_context(run_id=blog_flow.state.id):
+        tracer = start_tracing(
+            blog_flow.state.id, os.getenv(TRACE_DIR_ENV, "output/traces")
+        )
+        try:
+            with trace_span("flow", "BlogFlow"):
+                blog_flow.kickoff(
                     inputs={
-                        "goal": self.state.goal,
-                        "topic": self.state.topic,
-                        "post_title": post_outline.title,
-                        "post_description": post_outline.description,
-                        "blog_roadmap": [
-                            outline.model_dump() for outline in self.state.blog_roadmap
-                        ],
-                        "post_index": index,
-                        "post_index_plus_one": post_index_plus_one,
-                        "total_posts": len(self.state.blog_roadmap),
+                        "max_concurrent_posts": max_concurrent_posts,
+                        "process_mode": process_mode,
+                        "max_delegation_depth": max_delegation_depth,
+                        "max_delegations": max_delegations,
+                        "max_llm_calls": max_llm_calls,
+                        "incremental": incremental,
                     }
                 )
-            )
-
-            title = output["title"]
-            content = output["content"]
-            post = BlogPost(title=title, content=content)
-
-            # Save the blog post to a file
-            filename = f"output/Blog_Post_{index + 1}_{title.replace(' ', '_')}.md"
-            with open(filename, "w", encoding="utf-8") as file:
-                file.write(content)
-
-            logger.info(f"Blog post saved as {filename}")
+        finally:
+            stop_tracing()
+            logger.info(f"Run summary:\n{tracer.format_summary()}")
+            logger.info(f"Trace written to {tracer.path}")
+        logger.info("Blog Generation Flow completed")
 
-            return post
+        if blog_flow.state.budget_trips:
+            logger.warning(f"Budget limits reached: {blog_flow.state.budget_trips}")
 
-        # Process one blog post at a time sequentially
-        for i, post_outline in enumerate(self.state.blog_roadmap):
-            post = await write_single_post(post_outline, i)
-            self.state.blog_posts.append(post)
+        llm_cache = get_llm_cache()
+        if llm_cache is not None:
+            logger.info(f"LLM cache: {llm_cache.stats()}")
 
-        logger.info(f"Completed writing {len(self.state.blog_posts)} blog posts")
-        return self.state.blog_posts
+        search_cache = get_search_cache()
+        if search_cache is not None:
+            logger.info(f"Search cache: {search_cache.stats()}")
 
+        page_cache = get_page_cache()
+        if page_cache is not None:
+            logger.info(f"Page cache: {page_cache.stats()}")
 
-def kickoff(skip_planning=False, roadmap_file=None):
-    """Run the blog flow
+        if pool_stats():
+            logger.info(f"HTTP pools: {pool_stats()}")
 
-    Args:
-        skip_planning: If True, skip the planning phase and use roadmap_file instead
-        roadmap_file: Path to the roadmap markdown file to use when skipping planning
-    """
-    logger.info("Starting Blog Generation Flow")
-
-    if skip_planning and not roadmap_file:
-        logger.error("roadmap_file must be provided when skip_planning is True")
-        return
-
-    if skip_planning:
-        logger.info(f"Using roadmap file: {roadmap_file}")
-
-    blog_flow = BlogFlow(skip_planning=skip_planning, roadmap_file=roadmap_file)
-    blog_flow.kickoff()
-    logger.info("Blog Generation Flow completed")
+        if route_metrics.summary():
+            logger.info(f"Model routes:\n{route_metrics.format_summary()}")
 
 
 if __name__ == "__main__":
@@ -231,9 +155,66 @@ if __name__ == "__main__":
     parser.add_argument(
         "--roadmap-file",
         type=str,
-        help="Path to the roadmap markdown file (required if --skip-planning is used)",
+        help="Path to the roadmap markdown file or its JSON or YAML sidecar "
+        "(required if --skip-planning is used)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of blog posts written at the same time",
+    )
+    parser.add_argument(
+        "--process-mode",
+        choices=PROCESS_MODES,
+        default=HIERARCHICAL,
+        help="Run the crews with a manager LLM or along their task dependency graph",
+    )
+    parser.add_argument(
+        "--max-delegation-depth",
+        type=int,
+        help="Deepest chain of delegations allowed in a crew run",
+    )
+    parser.add_argument(
+        "--max-delegations",
+        type=int,
+        help="Number of delegations allowed in a crew run",
+    )
+    parser.add_argument(
+        "--max-llm-calls",
+        type=int,
+        help="Number of LLM calls allowed in a crew run",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only write the posts whose outline or other inputs changed "
+        "since the last run",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Check the inputs and configs and print the projected LLM calls, "
+        "tokens and cost of every task without running anything",
+    )
+    parser.add_argument(
+        "--dry-run-posts",
+        type=int,
+        help="Number of posts projected when the roadmap is not planned yet",
     )
 
     args = parser.parse_args()
 
-    kickoff(skip_planning=args.skip_planning, roadmap_file=args.roadmap_file)
+    kickoff(
+        skip_planning=args.skip_planning,
+        roadmap_file=args.roadmap_file,
+        max_concurrent_posts=args.workers,
+        process_mode=args.process_mode,
+        max_delegation_depth=args.max_delegation_depth,
+        max_delegations=args.max_delegations,
+        max_llm_calls=args.max_llm_calls,
+        incremental=args.incremental,
+        dry_run=args.dry_run,
+        estimated_posts=args.dry_run_posts,
+    )
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from common.crew.model_router import MODEL_TIERS
+from pydantic import BaseModel
+from write_a_technical_blog.types import BlogPost, BlogPostOutline
+
+DEFAULT_MANIFEST_PATH = "output/blog_manifest.json"
+# Bump when a code change alters what a post is written from, so every post
+# is rewritten once
+MANIFEST_VERSION = 3
+
+
+class ManifestEntry(BaseModel):
+    """A post written from inputs with a given hash"""
+
+    title: str
+    path: str
+
+
+class PostManifest:
+    """Maps the input hash of each written post to the file it was saved in
+
+    A post whose inputs hash to an entry whose file still exists is up to
+    date and can be read back instead of being written again.
+    """
+
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH):
+        self.path = Path(path)
+        self.entries: Dict[str, ManifestEntry] = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            # A manifest written by another version says nothing about the
+            # posts this version would write
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = {
+                    key: ManifestEntry(**entry)
+                    for key, entry in data.get("posts", {}).items()
+                }
+
+    def lookup(self, input_hash: str) -> Optional[BlogPost]:
+        """The saved post written from these inputs, if it is still on disk"""
+        entry = self.entries.get(input_hash)
+        if entry is None or not os.path.exists(entry.path):
+            return None
+        content = Path(entry.path).read_text(encoding="utf-8")
+        return BlogPost(title=entry.title, content=content)
+
+    def record(self, input_hash: str, post: BlogPost, path: str) -> None:
+        self.entries[input_hash] = ManifestEntry(title=post.title, path=path)
+
+    def prune(self, input_hashes: Iterable[str]) -> List[str]:
+        """Forgets every post not written from one of the given inputs
+
+        Returns the files of the forgotten posts that no remaining post was
+        saved in; they are left on disk.
+        """
+        keep = set(input_hashes)
+        stale = [self.entries.pop(key) for key in list(self.entries) if key not in keep]
+        kept_paths = {entry.path for entry in self.entries.values()}
+        return [entry.path for entry in stale if entry.path not in kept_paths]
+
+    def save(self) -> Path:
+        """Write the manifest to disk, replacing the previous one atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "posts": {key: entry.model_dump() for key, entry in self.entries.items()},
+        }
+        tmp_path = self.path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        return self.path
+
+
+def crew_config_hash(crew_class) -> str:
+    """Hash of the prompts and models a @CrewBase crew is built from"""
+    digest = hashlib.sha256()
+    for config_path in (
+        crew_class.original_agents_config_path,
+        crew_class.original_tasks_config_path,
+    ):
+        digest.update((crew_class.base_directory / config_path).read_bytes())
+    # The agents pick their models by tier in the agents config
+    digest.update(json.dumps(MODEL_TIERS, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def post_crew_inputs(
+    outlines: List[BlogPostOutline], index: int, topic: str, goal: str
+) -> Dict[str, Any]:
+    """The inputs the writing crew writes the post at index from
+
+    A post is given its own outline, its position in the series and the
+    titles of the posts before and after it, not the whole roadmap, so
+    editing one post only changes the inputs of it and its neighbours.
+    """
+    outline = outlines[index]
+    return {
+        "goal": goal,
+        "topic": topic,
+        "post_title": outline.title,
+        "post_description": outline.description,
+        "previous_post": (
+            outlines[index - 1].title
+            if index > 0
+            else "none, this post opens the series"
+        ),
+        "next_post": (
+            outlines[index + 1].title
+            if index + 1 < len(outlines)
+            else "none, this post closes the series"
+        ),
+        "post_index": index,
+        "post_index_plus_one": index + 1,
+        "total_posts": len(outlines),
+    }
+
+
+def post_input_hash(inputs: Dict[str, Any], config_hash: str, process_mode: str) -> str:
+    """Hash of everything a post is written from
+
+    That is the inputs the writing crew is given, see post_crew_inputs, and
+    the prompts, models and process mode of the crew.
+    """
+    data = {
+        "version": MANIFEST_VERSION,
+        "config": config_hash,
+        "process_mode": process_mode,
+        "inputs": inputs,
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
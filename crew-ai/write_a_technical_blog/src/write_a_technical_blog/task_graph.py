@@ -0,0 +1,56 @@
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    from crewai import Task
+
+# A hierarchical crew lets a manager LLM hand out every task. A dag crew runs
+# the tasks along a declared dependency graph without a manager.
+HIERARCHICAL = "hierarchical"
+DAG = "dag"
+PROCESS_MODES = (HIERARCHICAL, DAG)
+
+
+def apply_task_graph(tasks: List["Task"], graph: Dict[str, List[str]]) -> List["Task"]:
+    """Order tasks along a dependency graph for a sequential crew
+
+    graph maps every task name to the names of the tasks whose output it
+    needs. Each task receives those tasks as its context, and tasks are
+    grouped into levels whose dependencies are all in earlier levels. The
+    tasks of a level are run asynchronously, so a sequential crew runs them in
+    parallel and waits for all of them when the next synchronous task starts.
+    A crew only waits for asynchronous tasks before a synchronous one, so a
+    level is fully parallel only when it is followed by a single task;
+    otherwise its last task runs synchronously after the others.
+    """
+    by_name = {task.name: task for task in tasks}
+    missing = set(by_name) ^ set(graph)
+    unknown = {dep for deps in graph.values() for dep in deps} - set(by_name)
+    if missing or unknown:
+        raise ValueError(
+            f"Task graph does not match the crew tasks: {sorted(missing | unknown)}"
+        )
+
+    levels: List[List[str]] = []
+    placed: Dict[str, int] = {}
+    remaining = [task.name for task in tasks]
+    while remaining:
+        ready = [
+            name for name in remaining if all(dep in placed for dep in graph[name])
+        ]
+        if not ready:
+            raise ValueError(f"Task graph has a cycle between {remaining}")
+        for name in ready:
+            placed[name] = len(levels)
+        levels.append(ready)
+        remaining = [name for name in remaining if name not in placed]
+
+    ordered = []
+    for index, level in enumerate(levels):
+        joined = index + 1 < len(levels) and len(levels[index + 1]) == 1
+        for position, name in enumerate(level):
+            task = by_name[name]
+            task.context = [by_name[dep] for dep in graph[name]]
+            is_last = position == len(level) - 1
+            task.async_execution = len(level) > 1 and (joined or not is_last)
+            ordered.append(task)
+    return ordered
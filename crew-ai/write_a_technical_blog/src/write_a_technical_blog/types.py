@@ -1,13 +1,7 @@
+from common.roadmap import BlogPostOutline
 from pydantic import BaseModel
 
 
-class BlogPostOutline(BaseModel):
-    """Model for a single blog post outline"""
-
-    title: str
-    description: str
-
-
 class BlogRoadmap(BaseModel):
     """Model for the entire blog series roadmap"""
 
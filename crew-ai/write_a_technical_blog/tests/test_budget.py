@@ -0,0 +1,44 @@
+import pytest
+
+pytest.importorskip("crewai")
+
+from write_a_technical_blog.budget import (  # noqa: E402
+    MAX_DELEGATION_DEPTH,
+    MAX_DELEGATIONS,
+    MAX_LLM_CALLS,
+    BudgetLimits,
+    CrewBudget,
+)
+
+
+def test_llm_calls_stop_at_the_limit_with_the_best_result():
+    budget = CrewBudget(BudgetLimits(max_llm_calls=2))
+    budget.record_result("draft")
+    budget.record_result("  ")
+
+    assert [budget.allow_llm_call() for _ in range(3)] == [True, True, False]
+    assert budget.tripped == [MAX_LLM_CALLS]
+    assert budget.final_answer().endswith("Final Answer: draft")
+
+
+def test_delegations_are_refused_beyond_their_limits():
+    budget = CrewBudget(BudgetLimits(max_delegation_depth=1, max_delegations=2))
+
+    assert budget.start_delegation(1) is None
+    assert MAX_DELEGATION_DEPTH in budget.start_delegation(2)
+    assert budget.start_delegation(1) is None
+    assert MAX_DELEGATIONS in budget.start_delegation(1)
+    assert budget.stats() == {
+        "llm_calls": 0,
+        "delegations": 2,
+        "max_depth_reached": 1,
+        "tripped": [MAX_DELEGATION_DEPTH, MAX_DELEGATIONS],
+    }
+
+
+def test_overrides_replace_only_the_limits_given():
+    limits = BudgetLimits(max_delegations=3, max_llm_calls=10)
+
+    assert limits.with_overrides(max_llm_calls=5, max_delegations=None) == (
+        BudgetLimits(max_delegations=3, max_llm_calls=5)
+    )
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from write_a_technical_blog.post_manifest import (  # noqa: E402
+    PostManifest,
+    post_crew_inputs,
+    post_input_hash,
+)
+from write_a_technical_blog.types import BlogPost, BlogPostOutline  # noqa: E402
+
+
+def outlines(*titles):
+    return [BlogPostOutline(title=title, description=title.lower()) for title in titles]
+
+
+def hashes(posts):
+    return [
+        post_input_hash(post_crew_inputs(posts, index, "Rust", "Teach"), "c", "dag")
+        for index in range(len(posts))
+    ]
+
+
+def test_posts_are_given_their_neighbours():
+    inputs = post_crew_inputs(outlines("One", "Two"), 0, "Rust", "Teach")
+
+    assert inputs["post_title"] == "One"
+    assert inputs["previous_post"].startswith("none")
+    assert inputs["next_post"] == "Two"
+    assert inputs["total_posts"] == 2
+
+
+def test_editing_a_post_changes_only_it_and_its_neighbours():
+    before = hashes(outlines("One", "Two", "Three", "Four"))
+    after = hashes(outlines("One", "Two", "Three", "4"))
+
+    assert [old == new for old, new in zip(before, after)] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+
+
+def test_written_posts_are_found_while_their_file_exists(tmp_path):
+    post_path = tmp_path / "one.md"
+    post_path.write_text("Body", encoding="utf-8")
+    manifest = PostManifest(str(tmp_path / "manifest.json"))
+    manifest.record("one", BlogPost(title="One", content="Body"), str(post_path))
+    manifest.save()
+
+    reloaded = PostManifest(str(tmp_path / "manifest.json"))
+    assert reloaded.lookup("one") == BlogPost(title="One", content="Body")
+    post_path.unlink()
+    assert reloaded.lookup("one") is None
+
+
+def test_prune_returns_files_no_remaining_post_uses(tmp_path):
+    manifest = PostManifest(str(tmp_path / "manifest.json"))
+    post = BlogPost(title="Post", content="")
+    manifest.record("old", post, "shared.md")
+    manifest.record("new", post, "shared.md")
+    manifest.record("gone", post, "gone.md")
+
+    assert manifest.prune(["new"]) == ["gone.md"]
+    assert list(manifest.entries) == ["new"]
+
+
+def test_manifest_of_another_version_is_ignored(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text(
+        json.dumps({"version": 0, "posts": {"one": {"title": "One", "path": "x"}}}),
+        encoding="utf-8",
+    )
+
+    assert PostManifest(str(path)).entries == {}
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+import pytest
+from write_a_technical_blog.task_graph import apply_task_graph
+
+
+def make_tasks(*names):
+    return [
+        SimpleNamespace(name=name, context=None, async_execution=False)
+        for name in names
+    ]
+
+
+def test_tasks_run_in_levels_with_their_dependencies_as_context():
+    tasks = make_tasks("write", "research", "examples", "review")
+    graph = {
+        "research": [],
+        "examples": [],
+        "write": ["research", "examples"],
+        "review": ["write"],
+    }
+
+    ordered = apply_task_graph(tasks, graph)
+
+    assert [task.name for task in ordered] == [
+        "research",
+        "examples",
+        "write",
+        "review",
+    ]
+    assert [dep.name for dep in ordered[2].context] == ["research", "examples"]
+    # Both research tasks run in parallel and the writer waits for them
+    assert [task.async_execution for task in ordered] == [True, True, False, False]
+
+
+def test_level_followed_by_several_tasks_ends_synchronously():
+    tasks = make_tasks("a", "b", "c", "d")
+    graph = {"a": [], "b": [], "c": ["a"], "d": ["b"]}
+
+    ordered = apply_task_graph(tasks, graph)
+
+    assert [task.async_execution for task in ordered] == [True, False, True, False]
+
+
+def test_cycles_and_unknown_tasks_are_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        apply_task_graph(make_tasks("a", "b"), {"a": ["b"], "b": ["a"]})
+    with pytest.raises(ValueError, match="missing"):
+        apply_task_graph(make_tasks("a"), {"a": ["missing"]})
@@ -1,12 +1,16 @@
 """Smolagents-based technical blog writing system."""
 
-from technical_blog_smolagents.agents.blog_planning_agent import BlogPlanningAgent
-from technical_blog_smolagents.agents.blog_writing_agent import BlogWritingAgent
-from technical_blog_smolagents.models.blog_models import (
-    BlogPost,
-    BlogPostOutline,
-    BlogRoadmap,
-)
+import importlib
+
+# Modules the public names live in; they are imported on first access, so
+# importing the package (and running its CLI) does not load smolagents
+_EXPORTS = {
+    "BlogPlanningAgent": "technical_blog_smolagents.agents.blog_planning_agent",
+    "BlogWritingAgent": "technical_blog_smolagents.agents.blog_writing_agent",
+    "BlogPost": "technical_blog_smolagents.models.blog_models",
+    "BlogPostOutline": "technical_blog_smolagents.models.blog_models",
+    "BlogRoadmap": "technical_blog_smolagents.models.blog_models",
+}
 
 __all__ = [
     "BlogPlanningAgent",
@@ -15,3 +19,9 @@ __all__ = [
     "BlogPostOutline",
     "BlogRoadmap",
 ]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
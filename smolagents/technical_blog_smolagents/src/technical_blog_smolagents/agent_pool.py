@@ -0,0 +1,59 @@
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Generic, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+class AgentPool(Generic[T]):
+    """Leases independent agents to the posts written at the same time
+
+    A CodeAgent keeps the memory and Python state of the task it runs, so
+    two posts must never share one. Agents are built on first demand, up to
+    size of them, and reused by later posts once they are returned. A lease
+    waits while all size agents are in use.
+    """
+
+    def __init__(self, factory: Callable[[], T], size: int, agents: Iterable[T] = ()):
+        self.size = max(1, size)
+        self._factory = factory
+        self._idle: List[T] = list(agents)[: self.size]
+        self._created = len(self._idle)
+        self._in_use = 0
+        self._available = threading.Condition()
+
+    @contextmanager
+    def lease(self) -> Iterator[T]:
+        agent = self._acquire()
+        try:
+            yield agent
+        finally:
+            self._release(agent)
+
+    def _acquire(self) -> T:
+        with self._available:
+            while not self._idle and self._created >= self.size:
+                self._available.wait()
+            self._in_use += 1
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        # Building an agent is slow, so other leases are not held up by it
+        try:
+            return self._factory()
+        except BaseException:
+            with self._available:
+                self._created -= 1
+                self._in_use -= 1
+                self._available.notify()
+            raise
+
+    def _release(self, agent: T) -> None:
+        with self._available:
+            self._idle.append(agent)
+            self._in_use -= 1
+            self._available.notify()
+
+    def stats(self) -> Dict[str, int]:
+        with self._available:
+            return {"size": self.size, "created": self._created, "in_use": self._in_use}
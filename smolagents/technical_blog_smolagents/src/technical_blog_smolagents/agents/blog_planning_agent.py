@@ -1,16 +1,16 @@
 from typing import Dict
 
+from common.tracing import trace_span
+from technical_blog_smolagents.page_cache import CachedVisitWebpageTool
+from technical_blog_smolagents.search_cache import CachedDuckDuckGoSearchTool
 from technical_blog_smolagents.tools.blog_tools import (
     create_roadmap_file,
     research_topic,
+    research_topics,
 )
+from technical_blog_smolagents.tracing import record_agent_step, trace_tools
 
-from smolagents import (
-    CodeAgent,
-    DuckDuckGoSearchTool,
-    HfApiModel,
-    VisitWebpageTool,
-)
+from smolagents import CodeAgent, HfApiModel
 
 
 class BlogPlanningAgent:
@@ -26,18 +26,22 @@ class BlogPlanningAgent:
         self.model = model or HfApiModel()
 
         # Create search and research tools for the agent
-        self.tools = [
-            DuckDuckGoSearchTool(),
-            VisitWebpageTool(),
-            research_topic,
-            create_roadmap_file,
-        ]
+        self.tools = trace_tools(
+            [
+                CachedDuckDuckGoSearchTool(),
+                CachedVisitWebpageTool(),
+                research_topic,
+                research_topics,
+                create_roadmap_file,
+            ]
+        )
 
         # Create the agent with tools
         self.agent = CodeAgent(
             tools=self.tools,
             model=self.model,
             name="blog_planning_agent",
+            step_callbacks=[record_agent_step],
             description="This agent plans blog posts by researching topics and creating outlines.",
         )
 
@@ -78,7 +82,8 @@ class BlogPlanningAgent:
         """
 
         # Run the agent with the task
-        result = self.agent.run(task)
+        with trace_span("task", "create_blog_roadmap", agent=self.agent.name):
+            result = self.agent.run(task)
 
         # Convert the result to a dictionary if it's in string format
         if isinstance(result, str):
@@ -1,40 +1,55 @@
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 
+from common.tracing import trace_span
+from technical_blog_smolagents.memory_policy import MemoryPolicy, run_metrics
+from technical_blog_smolagents.page_cache import CachedVisitWebpageTool
+from technical_blog_smolagents.search_cache import CachedDuckDuckGoSearchTool
 from technical_blog_smolagents.tools.blog_tools import (
     read_file,
     research_topic,
+    research_topics,
     save_to_file,
 )
+from technical_blog_smolagents.tracing import record_agent_step, trace_tools
 
-from smolagents import CodeAgent, DuckDuckGoSearchTool, HfApiModel, VisitWebpageTool
+from smolagents import CodeAgent, HfApiModel
 
 
 class BlogWritingAgent:
     """Agent responsible for writing blog posts."""
 
-    def __init__(self, model=None):
+    def __init__(self, model=None, memory_policy: Optional[MemoryPolicy] = None):
         """Initialize the blog writing agent.
 
         Args:
             model: The model to use for the agent (default: HfApiModel)
+            memory_policy: How the agent's memory is kept between the posts it
+                writes (default: reset before every post)
         """
         # Use provided model or default to HfApiModel
         self.model = model or HfApiModel()
+        self.memory_policy = memory_policy or MemoryPolicy()
+        # Memory and prompt size of the last post written
+        self.last_run_metrics: Optional[Dict[str, Any]] = None
 
         # Create tools for the agent
-        self.tools = [
-            DuckDuckGoSearchTool(),
-            VisitWebpageTool(),
-            research_topic,
-            save_to_file,
-            read_file,
-        ]
+        self.tools = trace_tools(
+            [
+                CachedDuckDuckGoSearchTool(),
+                CachedVisitWebpageTool(),
+                research_topic,
+                research_topics,
+                save_to_file,
+                read_file,
+            ]
+        )
 
         # Create the agent with tools
         self.agent = CodeAgent(
             tools=self.tools,
             model=self.model,
             name="blog_writing_agent",
+            step_callbacks=[record_agent_step, self.memory_policy],
             description="This agent writes high-quality blog posts based on outlines.",
         )
 
@@ -74,7 +89,7 @@ class BlogWritingAgent:
         POST DESCRIPTION: {post_description}
         POST NUMBER: {post_index_plus_one} of {total_posts}
 
-        First, research the topic thoroughly using the research_topic tool to gather relevant information and facts.
+        First, research the topic thoroughly to gather relevant information and facts. Pass all your queries to the research_topics tool in one call rather than calling research_topic once per query.
 
         Then, write a comprehensive blog post that:
         1. Has an engaging introduction that hooks the reader
@@ -100,8 +115,21 @@ class BlogWritingAgent:
         }}
         """
 
+        # Steps of earlier posts the memory policy keeps for this one
+        carried_steps = 0 if self.memory_policy.reset else len(self.agent.memory.steps)
+
         # Run the agent with the task
-        result = self.agent.run(task)
+        with trace_span(
+            "task",
+            "write_blog_post",
+            agent=self.agent.name,
+            memory=self.memory_policy.mode,
+            carried_steps=carried_steps,
+        ) as span:
+            result = self.agent.run(task, reset=self.memory_policy.reset)
+        self.last_run_metrics = run_metrics(
+            self.memory_policy, self.agent, carried_steps, span, post_index
+        )
 
         # Convert the result to a dictionary if it's in string format
         if isinstance(result, str):
@@ -0,0 +1,65 @@
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from common.http_pool import get_http_client
+from common.llm_cache import get_llm_cache
+from technical_blog_smolagents.tracing import TracedOpenAIServerModel, record_model_call
+
+from smolagents import ChatMessage, Tool
+
+
+class CachedOpenAIServerModel(TracedOpenAIServerModel):
+    """OpenAIServerModel that serves repeated calls from the LLM response cache
+
+    Every instance sends its requests over the shared HTTP connection pool,
+    unless client_kwargs names another http_client.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        client_kwargs: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ):
+        client_kwargs = {"http_client": get_http_client(), **(client_kwargs or {})}
+        super().__init__(model_id, client_kwargs=client_kwargs, **kwargs)
+
+    def __call__(
+        self,
+        messages: List[Dict[str, str]],
+        stop_sequences: Optional[List[str]] = None,
+        grammar: Optional[str] = None,
+        tools_to_call_from: Optional[List[Tool]] = None,
+        **kwargs,
+    ) -> ChatMessage:
+        cache = get_llm_cache()
+        if cache is None:
+            return super().__call__(
+                messages, stop_sequences, grammar, tools_to_call_from, **kwargs
+            )
+
+        started = time.perf_counter()
+        # Everything the model is called with, including the sampling params
+        # it was built with
+        params = {
+            "stop_sequences": stop_sequences,
+            "grammar": grammar,
+            "tools": {tool.name: tool.description for tool in tools_to_call_from or []},
+            "custom_role_conversions": self.custom_role_conversions,
+            **self.kwargs,
+            **kwargs,
+        }
+        key = cache.make_key(self.model_id, messages, params)
+
+        cached = cache.get(key)
+        if cached is not None:
+            # Nothing was sent to the API, so no tokens were spent
+            record_model_call(self.model_id, 0, 0, started, cached=True)
+            return ChatMessage.from_dict(json.loads(cached))
+
+        message = super().__call__(
+            messages, stop_sequences, grammar, tools_to_call_from, **kwargs
+        )
+        cache.put(key, message.model_dump_json())
+        return message
@@ -3,63 +3,66 @@ import argparse
 import asyncio
 import logging
 import os
-from typing import Dict, List
-
-from technical_blog_smolagents.agents.blog_planning_agent import BlogPlanningAgent
-from technical_blog_smolagents.agents.blog_writing_agent import BlogWritingAgent
-from technical_blog_smolagents.tools.blog_tools import parse_roadmap_file
-
-from smolagents import CodeAgent, OpenAIServerModel
-
-
-# Configure logging
-def setup_logging(log_file="output/blog_generation.log"):
-    """Set up logging to file and console"""
-    # Create output directory if it doesn't exist
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
-
-    # Create logger
-    logger = logging.getLogger("blog_generator")
-    logger.setLevel(logging.DEBUG)
-
-    # File handler
-    file_handler = logging.FileHandler(log_file)
-
-    # Console handler
-    console_handler = logging.StreamHandler()
-
-    # Formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-
-    return logger
-
-
-# Initialize logger
-logger = setup_logging()
+import uuid
+from typing import Dict, List, Optional
+
+from common.log_config import (
+    LOGGER_NAME,
+    log_context,
+    setup_logging,
+)
+from common.roadmap import load_roadmap
+from technical_blog_smolagents.memory_policy import (
+    DEFAULT_KEEP_STEPS,
+    MEMORY_MODES,
+    RESET,
+    MemoryPolicy,
+    format_run_metrics,
+)
+
+logger = logging.getLogger(LOGGER_NAME)
 
 
 class BlogManager:
     """Manager agent that coordinates the planning and writing agents."""
 
-    def __init__(self, model=None):
+    def __init__(self, model=None, max_concurrent_posts: int = 1, memory_policy=None):
         """Initialize the manager with specialized agents.
 
         Args:
             model: The LLM model to use (default: OpenAIServerModel)
+            max_concurrent_posts: Number of blog posts written at the same time,
+                each by its own writing agent
+            memory_policy: MemoryPolicy of the writing agents, which are
+                reused across posts (default: reset before every post)
         """
-        self.model = OpenAIServerModel(model_id="gpt-4o")
+        # smolagents and the agents are only imported once a manager is
+        # built, so `technical-blog --help` starts without them
+        from technical_blog_smolagents.agent_pool import AgentPool
+        from technical_blog_smolagents.agents.blog_planning_agent import (
+            BlogPlanningAgent,
+        )
+        from technical_blog_smolagents.agents.blog_writing_agent import (
+            BlogWritingAgent,
+        )
+        from technical_blog_smolagents.llm_cache import CachedOpenAIServerModel
+
+        from smolagents import CodeAgent
+
+        self.model = CachedOpenAIServerModel(model_id="gpt-4o")
 
         # Create specialized agents
         self.planning_agent = BlogPlanningAgent(model=self.model)
-        self.writing_agent = BlogWritingAgent(model=self.model)
+        self.writing_agent = BlogWritingAgent(
+            model=self.model, memory_policy=memory_policy
+        )
+        # Posts written at the same time each lease their own writing agent;
+        # the pool starts with the one the manager agent delegates to
+        self.writing_pool = AgentPool(
+            lambda: BlogWritingAgent(model=self.model, memory_policy=memory_policy),
+            max_concurrent_posts,
+            agents=[self.writing_agent],
+        )
 
         # Create manager agent that can delegate to specialized agents
         self.manager_agent = CodeAgent(
@@ -73,6 +76,9 @@ class BlogManager:
         # Initialize state storage
         self.blog_roadmap = []
         self.blog_posts = []
+        self.failed_posts = []
+        # Memory and prompt size of each post, in roadmap order
+        self.post_metrics = []
         self.topic = ""
         self.goal = ""
 
@@ -84,7 +90,8 @@ class BlogManager:
         Args:
             topic: The main topic for the blog series
             goal: The goal/purpose of the blog series
-            roadmap_file: Optional path to an existing roadmap file
+            roadmap_file: Optional path to an existing roadmap file, or its JSON
+                or YAML sidecar
 
         Returns:
             List of blog post outlines
@@ -97,10 +104,10 @@ class BlogManager:
         # If a roadmap file is provided, parse it
         if roadmap_file:
             logger.info(f"Using existing roadmap file: {roadmap_file}")
-            roadmap_data = parse_roadmap_file(roadmap_file)
-            self.topic = roadmap_data["topic"] or self.topic
-            self.goal = roadmap_data["goal"] or self.goal
-            self.blog_roadmap = roadmap_data["post_outlines"]
+            roadmap = load_roadmap(roadmap_file)
+            self.topic = roadmap.topic or self.topic
+            self.goal = roadmap.goal or self.goal
+            self.blog_roadmap = [post.model_dump() for post in roadmap.posts]
             return self.blog_roadmap
 
         # Otherwise, use the planning agent to create a roadmap
@@ -118,53 +125,98 @@ class BlogManager:
     async def write_blog_posts(self) -> List[Dict]:
         """Write all blog posts based on the roadmap.
 
+        Up to the size of the writing pool posts are written at the same
+        time, each in its own thread. The posts keep the order of the
+        roadmap; a post that fails is logged and left out.
+
         Returns:
             List of completed blog posts
         """
         logger.info("Starting blog posts writing")
         self.blog_posts = []
+        self.failed_posts = []
+        post_metrics = {}
 
         if not self.blog_roadmap:
             logger.error("No blog roadmap available. Generate a roadmap first.")
             return []
 
         total_posts = len(self.blog_roadmap)
+        semaphore = asyncio.Semaphore(self.writing_pool.size)
+
+        async def write_post(i: int, post_outline: Dict) -> Dict:
+            async with semaphore:
+                logger.info(
+                    f"Writing blog post {i + 1}/{total_posts}: {post_outline['title']}"
+                )
+                with log_context(post_index=i):
+                    # to_thread copies the context, so the thread keeps the
+                    # post index and the trace of the run
+                    return await asyncio.to_thread(
+                        self._write_single_post,
+                        post_outline,
+                        i,
+                        total_posts,
+                        post_metrics,
+                    )
+
+        results = await asyncio.gather(
+            *(
+                write_post(i, post_outline)
+                for i, post_outline in enumerate(self.blog_roadmap)
+            ),
+            return_exceptions=True,
+        )
+        for i, result in enumerate(results):
+            if isinstance(result, BaseException):
+                title = self.blog_roadmap[i]["title"]
+                logger.error(f"Failed to write blog post {i + 1}: {title}: {result}")
+                self.failed_posts.append(title)
+            else:
+                self.blog_posts.append(result)
 
-        # Process posts sequentially
-        for i, post_outline in enumerate(self.blog_roadmap):
-            logger.info(
-                f"Writing blog post {i + 1}/{total_posts}: {post_outline['title']}"
-            )
-
-            post = await self._write_single_post(post_outline, i, total_posts)
-            self.blog_posts.append(post)
+        self.post_metrics = [post_metrics[i] for i in sorted(post_metrics)]
 
         logger.info(f"Completed writing {len(self.blog_posts)} blog posts")
+        if self.failed_posts:
+            logger.warning(f"Failed blog posts: {self.failed_posts}")
+        if self.post_metrics:
+            logger.info(
+                f"Prompt size per post:\n{format_run_metrics(self.post_metrics)}"
+            )
         return self.blog_posts
 
-    async def _write_single_post(
-        self, post_outline: Dict, index: int, total_posts: int
+    def _write_single_post(
+        self,
+        post_outline: Dict,
+        index: int,
+        total_posts: int,
+        post_metrics: Optional[Dict[int, Dict]] = None,
     ) -> Dict:
-        """Write a single blog post.
+        """Write a single blog post with a writing agent leased from the pool.
 
         Args:
             post_outline: The outline for the blog post
             index: The index of the post in the roadmap
             total_posts: The total number of posts
+            post_metrics: Filled with the memory and prompt size of the post,
+                by index
 
         Returns:
             The completed blog post
         """
-        post = self.writing_agent.write_blog_post(
-            topic=self.topic,
-            goal=self.goal,
-            post_title=post_outline["title"],
-            post_description=post_outline["description"],
-            blog_roadmap=self.blog_roadmap,
-            post_index=index,
-            total_posts=total_posts,
-        )
-
+        with self.writing_pool.lease() as writing_agent:
+            post = writing_agent.write_blog_post(
+                topic=self.topic,
+                goal=self.goal,
+                post_title=post_outline["title"],
+                post_description=post_outline["description"],
+                blog_roadmap=self.blog_roadmap,
+                post_index=index,
+                total_posts=total_posts,
+            )
+            if post_metrics is not None:
+                post_metrics[index] = writing_agent.last_run_metrics
         return post
 
     def run(
@@ -185,23 +237,62 @@ class BlogManager:
         Returns:
             Dictionary with the generated content
         """
-        logger.info("Starting Blog Generation Process")
-
-        # Step 1: Generate blog roadmap
-        if not skip_planning or roadmap_file:
-            self.generate_blog_roadmap(topic, goal, roadmap_file)
-
-        # Step 2: Write blog posts
-        asyncio.run(self.write_blog_posts())
-
-        logger.info("Blog Generation Process completed")
+        from common.http_pool import pool_stats
+        from common.llm_cache import get_llm_cache
+        from common.page_cache import get_page_cache
+        from common.search_cache import get_search_cache
+        from common.tracing import (
+            TRACE_DIR_ENV,
+            start_tracing,
+            stop_tracing,
+            trace_span,
+        )
 
-        return {
-            "topic": self.topic,
-            "goal": self.goal,
-            "roadmap": self.blog_roadmap,
-            "posts": self.blog_posts,
-        }
+        setup_logging()
+        run_id = str(uuid.uuid4())
+        # Everything logged during the run is tagged with its id
+        with log_context(run_id=run_id):
+            logger.info("Starting Blog Generation Process")
+            tracer = start_tracing(run_id, os.getenv(TRACE_DIR_ENV, "output/traces"))
+
+            try:
+                with trace_span("flow", "BlogManager"):
+                    # Step 1: Generate blog roadmap
+                    if not skip_planning or roadmap_file:
+                        self.generate_blog_roadmap(topic, goal, roadmap_file)
+
+                    # Step 2: Write blog posts
+                    asyncio.run(self.write_blog_posts())
+            finally:
+                stop_tracing()
+                logger.info(f"Run summary:\n{tracer.format_summary()}")
+                logger.info(f"Trace written to {tracer.path}")
+
+            logger.info("Blog Generation Process completed")
+
+            llm_cache = get_llm_cache()
+            if llm_cache is not None:
+                logger.info(f"LLM cache: {llm_cache.stats()}")
+
+            search_cache = get_search_cache()
+            if search_cache is not None:
+                logger.info(f"Search cache: {search_cache.stats()}")
+
+            page_cache = get_page_cache()
+            if page_cache is not None:
+                logger.info(f"Page cache: {page_cache.stats()}")
+
+            if pool_stats():
+                logger.info(f"HTTP pools: {pool_stats()}")
+
+            return {
+                "topic": self.topic,
+                "goal": self.goal,
+                "roadmap": self.blog_roadmap,
+                "posts": self.blog_posts,
+                "failed_posts": self.failed_posts,
+                "post_metrics": self.post_metrics,
+            }
 
 
 def main():
@@ -217,7 +308,8 @@ def main():
     parser.add_argument(
         "--roadmap-file",
         type=str,
-        help="Path to the roadmap markdown file (required if --skip-planning is used)",
+        help="Path to the roadmap markdown file or its JSON or YAML sidecar "
+        "(required if --skip-planning is used)",
     )
     parser.add_argument(
         "--model-name",
@@ -225,14 +317,39 @@ def main():
         default="gpt-4o-mini",
         help="HuggingFace model name to use for the agents",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of blog posts written at the same time",
+    )
+    parser.add_argument(
+        "--memory-mode",
+        choices=MEMORY_MODES,
+        default=RESET,
+        help="How a writing agent's memory is kept between the posts it writes: "
+        "reset it, keep the last steps, or compact older steps into a summary",
+    )
+    parser.add_argument(
+        "--memory-keep-steps",
+        type=int,
+        default=DEFAULT_KEEP_STEPS,
+        help="Steps kept as they are by the keep_last and compact memory modes",
+    )
 
     args = parser.parse_args()
 
+    from technical_blog_smolagents.llm_cache import CachedOpenAIServerModel
+
     # Create a custom model if specified
-    model = OpenAIServerModel(model_id=args.model_name)
+    model = CachedOpenAIServerModel(model_id=args.model_name)
 
     # Create the blog manager
-    manager = BlogManager(model=model)
+    manager = BlogManager(
+        model=model,
+        max_concurrent_posts=args.workers,
+        memory_policy=MemoryPolicy(args.memory_mode, args.memory_keep_steps),
+    )
 
     # Set default topic and goal if not provided
     topic = args.topic or "Python Design Patterns for Machine Learning"
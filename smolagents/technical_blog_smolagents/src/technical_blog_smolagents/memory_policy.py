@@ -0,0 +1,170 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# How a CodeAgent's step memory is kept between and during its runs
+RESET = "reset"
+KEEP_LAST = "keep_last"
+COMPACT = "compact"
+MEMORY_MODES = (RESET, KEEP_LAST, COMPACT)
+DEFAULT_KEEP_STEPS = 4
+# Characters kept of each step folded into a summary, and of the summary
+SUMMARY_STEP_CHARS = 300
+SUMMARY_MAX_CHARS = 4000
+
+# Column name and width of the prompt size table
+METRIC_COLUMNS = (
+    ("post", 6),
+    ("memory", 11),
+    ("carried_steps", 15),
+    ("steps", 7),
+    ("llm_calls", 11),
+    ("prompt_tokens", 15),
+    ("peak_prompt_tokens", 20),
+)
+
+
+@dataclass
+class SummaryStep:
+    """Older memory steps of an agent folded into one short note"""
+
+    summary: str
+
+    def dict(self) -> Dict[str, Any]:
+        return {"summary": self.summary}
+
+    def to_messages(self, summary_mode: bool = False, **kwargs) -> List[Dict]:
+        from smolagents.models import MessageRole
+
+        return [
+            {
+                "role": MessageRole.USER,
+                "content": [
+                    {
+                        "type": "text",
+                        "text": f"Summary of earlier steps:\n{self.summary}",
+                    }
+                ],
+            }
+        ]
+
+
+def _excerpt(text: Any, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def summarize_step(step: Any) -> str:
+    """One line of a summary for a task, plan, action or earlier summary"""
+    from smolagents.memory import ActionStep, PlanningStep, TaskStep
+
+    if isinstance(step, SummaryStep):
+        return step.summary
+    if isinstance(step, TaskStep):
+        return "Task: " + _excerpt(step.task, SUMMARY_STEP_CHARS)
+    if isinstance(step, PlanningStep):
+        return "Plan: " + _excerpt(step.plan, SUMMARY_STEP_CHARS)
+    if isinstance(step, ActionStep):
+        code = step.model_output or ""
+        if step.tool_calls:
+            code = step.tool_calls[0].arguments
+        line = f"Step {step.step_number}: ran {_excerpt(code, SUMMARY_STEP_CHARS // 2)}"
+        if step.error is not None:
+            line += f"; failed with {_excerpt(step.error, SUMMARY_STEP_CHARS // 2)}"
+        elif step.observations:
+            line += f"; saw {_excerpt(step.observations, SUMMARY_STEP_CHARS // 2)}"
+        return line
+    return ""
+
+
+class MemoryPolicy:
+    """How a CodeAgent's step memory is kept between and during its runs
+
+    reset clears the memory at the start of every run, as smolagents does by
+    default. keep_last carries the memory over to the next run but keeps only
+    the last keep_steps action steps; older steps and tasks are dropped.
+    compact carries it over as well, but folds the older steps into a single
+    summary step with a short excerpt of each. The task of the current run
+    is always kept as it is.
+
+    keep_last and compact are applied after every step, so they also bound
+    the prompt of a run that takes many steps. Add the policy to the
+    step_callbacks of the agent and pass reset to its run().
+    """
+
+    def __init__(self, mode: str = RESET, keep_steps: int = DEFAULT_KEEP_STEPS):
+        if mode not in MEMORY_MODES:
+            raise ValueError(
+                f"Unknown memory mode {mode!r}, expected one of {MEMORY_MODES}"
+            )
+        if keep_steps < 1:
+            raise ValueError("keep_steps must be at least 1")
+        self.mode = mode
+        self.keep_steps = keep_steps
+
+    @property
+    def reset(self) -> bool:
+        """Whether each run starts from an empty memory"""
+        return self.mode == RESET
+
+    def __call__(self, step: Any, agent: Any = None) -> None:
+        """Step callback that trims the memory of the agent after each step"""
+        if agent is not None and not self.reset:
+            self.apply(agent.memory)
+
+    def apply(self, memory: Any) -> None:
+        from smolagents.memory import ActionStep, TaskStep
+
+        steps = memory.steps
+        actions = [i for i, step in enumerate(steps) if isinstance(step, ActionStep)]
+        if len(actions) <= self.keep_steps:
+            return
+        cut = actions[-self.keep_steps]
+        tasks = [i for i, step in enumerate(steps) if isinstance(step, TaskStep)]
+        current_task = tasks[-1] if tasks and tasks[-1] < cut else None
+
+        kept = [] if current_task is None else [steps[current_task]]
+        if self.mode == COMPACT:
+            lines = [
+                summarize_step(step)
+                for i, step in enumerate(steps[:cut])
+                if i != current_task
+            ]
+            summary = "\n".join(line for line in lines if line)
+            if len(summary) > SUMMARY_MAX_CHARS:
+                # The most recent steps matter most to what the agent does next
+                summary = "..." + summary[-(SUMMARY_MAX_CHARS - 3) :]
+            if summary:
+                kept.insert(0, SummaryStep(summary=summary))
+        memory.steps = kept + steps[cut:]
+
+
+def run_metrics(
+    policy: MemoryPolicy,
+    agent: Any,
+    carried_steps: int,
+    span: Any = None,
+    post_index: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Memory and prompt size of the run an agent just finished
+
+    span is the trace span of the run; without tracing the token counts are 0.
+    """
+    return {
+        "post": "" if post_index is None else post_index + 1,
+        "memory": policy.mode,
+        "carried_steps": carried_steps,
+        "steps": len(agent.memory.steps),
+        "llm_calls": span.llm_calls if span is not None else 0,
+        "prompt_tokens": span.prompt_tokens if span is not None else 0,
+        "peak_prompt_tokens": span.peak_prompt_tokens if span is not None else 0,
+    }
+
+
+def format_run_metrics(rows: List[Dict[str, Any]]) -> str:
+    """The prompt size of every run as a table, one row per run"""
+    lines = ["".join(f"{column:>{width}}" for column, width in METRIC_COLUMNS)]
+    for row in rows:
+        lines.append(
+            "".join(f"{row[column]:>{width}}" for column, width in METRIC_COLUMNS)
+        )
+    return "\n".join(lines)
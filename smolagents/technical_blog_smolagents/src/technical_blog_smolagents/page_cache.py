@@ -0,0 +1,44 @@
+from typing import Optional
+
+import requests
+from common.http_pool import get_http_session
+from common.page_cache import extract_page_content, fit_to_token_budget, get_page_cache
+from common.page_extractor import default_max_tokens
+from smolagents.utils import truncate_content
+
+from smolagents import VisitWebpageTool
+
+
+def _extract_or_raise(response: requests.Response) -> str:
+    """The main content of a page as markdown; error pages raise instead"""
+    response.raise_for_status()
+    return extract_page_content(response)
+
+
+class CachedVisitWebpageTool(VisitWebpageTool):
+    """VisitWebpageTool that reads page content through the page cache
+
+    Only the main content of a page is kept, cut to max_tokens tokens.
+    """
+
+    def __init__(
+        self, max_output_length: int = 40000, max_tokens: Optional[int] = None
+    ):
+        super().__init__(max_output_length)
+        self.max_tokens = default_max_tokens() if max_tokens is None else max_tokens
+
+    def forward(self, url: str) -> str:
+        try:
+            cache = get_page_cache()
+            if cache is None:
+                text = _extract_or_raise(get_http_session().get(url, timeout=20))
+            else:
+                text = cache.fetch(url, "main_content", _extract_or_raise, timeout=20)
+        except requests.exceptions.Timeout:
+            return "The request timed out. Please try again later or check the URL."
+        except requests.exceptions.RequestException as e:
+            return f"Error fetching the webpage: {str(e)}"
+        except Exception as e:
+            return f"An unexpected error occurred: {str(e)}"
+        text = fit_to_token_budget(url, text, self.max_tokens)
+        return truncate_content(text, self.max_output_length)
@@ -0,0 +1,98 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from common.search_cache import get_search_cache
+
+from smolagents import Tool
+
+
+class DDGSPool:
+    """DDGS clients that each serve one search at a time
+
+    A DDGS client keeps one HTTP session that is not safe to share between
+    threads. A search borrows an idle client, or builds one when all are in
+    use, and gives it back when done, so clients and their connections are
+    reused across searches and threads.
+    """
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def client(self) -> Iterator[Any]:
+        with self._lock:
+            client = self._idle.pop() if self._idle else None
+        if client is None:
+            from duckduckgo_search import DDGS
+
+            client = DDGS(**self._kwargs)
+        try:
+            yield client
+        finally:
+            with self._lock:
+                self._idle.append(client)
+
+
+class CachedDuckDuckGoSearchTool(Tool):
+    """DuckDuckGo web search that shares results through the search cache
+
+    Searches run on clients from a DDGSPool, so the tool can be shared by
+    every thread. kwargs are passed on to each DDGS client.
+    """
+
+    # The same interface as DuckDuckGoSearchTool
+    name = "web_search"
+    description = """Performs a duckduckgo web search based on your query (think a Google search) then returns the top search results."""
+    inputs = {
+        "query": {"type": "string", "description": "The search query to perform."}
+    }
+    output_type = "string"
+
+    def __init__(self, max_results=10, **kwargs):
+        super().__init__()
+        self.max_results = max_results
+        self.clients = DDGSPool(**kwargs)
+
+    def forward(self, query: str) -> str:
+        results = self.search_results(query)
+        if not results:
+            raise Exception("No results found! Try a less restrictive/shorter query.")
+        # Formatted like the results of smolagents' DuckDuckGoSearchTool
+        formatted = [f"[{r['title']}]({r['href']})\n{r['body']}" for r in results]
+        return "## Search Results\n\n" + "\n\n".join(formatted)
+
+    def search_results(
+        self, query: str, max_results: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """Results of a query as dicts with title, href and body keys
+
+        Unlike forward(), no results is an empty list rather than an error.
+        """
+        max_results = max_results or self.max_results
+
+        def search() -> List[Dict[str, str]]:
+            with self.clients.client() as ddgs:
+                return list(ddgs.text(query, max_results=max_results) or [])
+
+        cache = get_search_cache()
+        if cache is None:
+            return search()
+        return cache.get_or_search(
+            "duckduckgo_results", query, search, params={"max_results": max_results}
+        )
+
+
+_search_tool: Optional[CachedDuckDuckGoSearchTool] = None
+_search_tool_lock = threading.Lock()
+
+
+def get_search_tool() -> CachedDuckDuckGoSearchTool:
+    """The process-wide search tool, so its clients are reused between searches"""
+    global _search_tool
+    with _search_tool_lock:
+        if _search_tool is None:
+            _search_tool = CachedDuckDuckGoSearchTool()
+        return _search_tool
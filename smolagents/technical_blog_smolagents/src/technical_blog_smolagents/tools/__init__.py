@@ -5,6 +5,7 @@ from technical_blog_smolagents.tools.blog_tools import (
     parse_roadmap_file,
     read_file,
     research_topic,
+    research_topics,
     save_to_file,
 )
 
@@ -14,4 +15,5 @@ __all__ = [
     "parse_roadmap_file",
     "create_roadmap_file",
     "research_topic",
+    "research_topics",
 ]
@@ -1,8 +1,23 @@
+import contextvars
 import os
-import re
-from typing import Dict, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
 
-from smolagents import DuckDuckGoSearchTool, tool
+from common.roadmap import Roadmap, load_roadmap, save_roadmap
+from common.tracing import get_tracer
+from technical_blog_smolagents.search_cache import get_search_tool
+
+from smolagents import tool
+
+# Searches run at the same time, across every research call
+MAX_PARALLEL_QUERIES = 4
+# Kept for the life of the process, so its threads are reused between calls;
+# they are only started by the first searches
+_search_pool = ThreadPoolExecutor(
+    max_workers=MAX_PARALLEL_QUERIES, thread_name_prefix="research"
+)
 
 
 @tool
@@ -47,34 +62,17 @@ def parse_roadmap_file(roadmap_file_path: str) -> Dict:
     """Parse a roadmap markdown file to extract topic, goal, and blog post outlines.
 
     Args:
-        roadmap_file_path: Path to the roadmap markdown file
+        roadmap_file_path: Path to the roadmap markdown file, or its JSON or YAML sidecar
 
     Returns:
         Dictionary containing the topic, goal, and list of blog post outlines
     """
-    with open(roadmap_file_path, "r", encoding="utf-8") as file:
-        content = file.read()
-
-    # Extract topic
-    topic_match = re.search(r"## Topic: (.+?)(?:\n|$)", content)
-    topic = topic_match.group(1).strip() if topic_match else ""
-
-    # Extract goal
-    goal_match = re.search(r"## Goal\n(.*?)\n\n## Planned Posts", content, re.DOTALL)
-    goal = goal_match.group(1).strip() if goal_match else ""
-
-    # Extract planned posts
-    post_outlines = []
-    post_sections = re.finditer(
-        r"### \d+\. (.+?)\n\n(.*?)(?=\n\n### \d+\.|$)", content, re.DOTALL
-    )
-
-    for match in post_sections:
-        title = match.group(1).strip()
-        description = match.group(2).strip()
-        post_outlines.append({"title": title, "description": description})
-
-    return {"topic": topic, "goal": goal, "post_outlines": post_outlines}
+    roadmap = load_roadmap(roadmap_file_path)
+    return {
+        "topic": roadmap.topic,
+        "goal": roadmap.goal,
+        "post_outlines": [post.model_dump() for post in roadmap.posts],
+    }
 
 
 @tool
@@ -89,24 +87,108 @@ def create_roadmap_file(topic: str, goal: str, posts: List[Dict]) -> str:
     Returns:
         Path to the saved roadmap file
     """
-    # Create the roadmap content
-    roadmap_content = "# Blog Series Roadmap\n\n"
-    roadmap_content += f"## Topic: {topic}\n\n"
-    roadmap_content += f"## Goal\n{goal}\n\n"
-    roadmap_content += "## Planned Posts\n\n"
+    # A JSON sidecar is saved next to the markdown for parse_roadmap_file
+    return save_roadmap(Roadmap(topic=topic, goal=goal, posts=posts))
 
-    for i, post in enumerate(posts, 1):
-        roadmap_content += f"### {i}. {post['title']}\n\n"
-        roadmap_content += f"{post['description']}\n\n"
 
-    # Save the roadmap
-    os.makedirs("output", exist_ok=True)
-    roadmap_path = "output/Blog_Series_Roadmap.md"
+def _result_key(result: Dict[str, str]) -> str:
+    """The same page under a different scheme, host case or fragment dedupes
+
+    A result without a link is told apart by its title and snippet instead.
+    """
+    url = (result.get("href") or "").strip()
+    if not url:
+        return "\n".join([result.get("title") or "", result.get("body") or ""])
+    parts = urlsplit(url)
+    return f"{parts.netloc.lower()}{parts.path.rstrip('/')}?{parts.query}"
+
+
+def _search_query(query: str, num_results: int) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        results = get_search_tool().search_results(query, max_results=num_results)
+        error = None
+    except Exception as exc:
+        results, error = [], repr(exc)
+    wall_s = time.perf_counter() - started
+
+    tracer = get_tracer()
+    if tracer is not None:
+        tracer.record(
+            "search_query",
+            "duckduckgo",
+            wall_s=wall_s,
+            query=query,
+            results=len(results),
+            error=error,
+        )
+    return {"query": query, "results": results, "wall_s": wall_s, "error": error}
 
-    with open(roadmap_path, "w", encoding="utf-8") as file:
-        file.write(roadmap_content)
 
-    return roadmap_path
+def research(queries: List[str], num_results: Optional[int] = 5) -> Dict[str, Any]:
+    """Search every query at the same time and merge the results
+
+    Every query runs on the shared search tool, up to MAX_PARALLEL_QUERIES
+    at once across all agents. Results are deduped by URL and taken in turn from each query,
+    so all queries are represented within num_results.
+
+    Returns:
+        Dictionary with the merged results and, per query, its result count,
+        wall time and error
+    """
+    num_results = num_results or 5
+    # Repeated queries are searched once, in the order they were given
+    queries = list(dict.fromkeys(query.strip() for query in queries if query.strip()))
+    if not queries:
+        return {"results": [], "queries": []}
+
+    # Each search keeps the trace context of the agent that asked for it
+    futures = [
+        _search_pool.submit(
+            contextvars.copy_context().run, _search_query, query, num_results
+        )
+        for query in queries
+    ]
+    searches = [future.result() for future in futures]
+
+    merged, seen = [], set()
+    for rank in range(max((len(search["results"]) for search in searches), default=0)):
+        for search in searches:
+            if rank >= len(search["results"]) or len(merged) >= num_results:
+                continue
+            result = search["results"][rank]
+            key = _result_key(result)
+            if key not in seen:
+                seen.add(key)
+                merged.append(result)
+    return {
+        "results": merged,
+        "queries": [
+            {
+                "query": search["query"],
+                "results": len(search["results"]),
+                "wall_s": round(search["wall_s"], 3),
+                "error": search["error"],
+            }
+            for search in searches
+        ],
+    }
+
+
+def _format_research(research_result: Dict[str, Any]) -> str:
+    sections = [
+        f"Source: {r.get('href', '')}\nTitle: {r.get('title', '')}\n"
+        f"Snippet: {r.get('body', '')}"
+        for r in research_result["results"]
+    ]
+    if not sections:
+        sections.append("No results found. Try shorter or less specific queries.")
+    timings = [
+        f"- {search['query']!r}: {search['results']} results in {search['wall_s']:.2f}s"
+        + (f", failed with {search['error']}" if search["error"] else "")
+        for search in research_result["queries"]
+    ]
+    return "\n\n".join(sections) + "\n\nQueries:\n" + "\n".join(timings)
 
 
 # Create a specialized search tool for researching blog topics
@@ -121,18 +203,20 @@ def research_topic(topic: str, num_results: Optional[int] = 5) -> str:
     Returns:
         A string with search results about the topic
     """
-    search_tool = DuckDuckGoSearchTool()
-    results = search_tool(topic)
-
-    # Process and limit results
-    if num_results and isinstance(results, list) and len(results) > num_results:
-        results = results[:num_results]
-
-    if isinstance(results, list):
-        return "\n\n".join(
-            [
-                f"Source: {r['link']}\nTitle: {r['title']}\nSnippet: {r['snippet']}"
-                for r in results
-            ]
-        )
-    return str(results)
+    return _format_research(research([topic], num_results))
+
+
+@tool
+def research_topics(queries: List[str], num_results: Optional[int] = 5) -> str:
+    """Research several queries at once using DuckDuckGo search. Prefer this to calling research_topic once per query.
+
+    Args:
+        queries: The search queries to run, e.g. ["graphql caching", "rest api caching"]
+        num_results: Number of search results to return for all queries together, without duplicate sources (default: 5)
+
+    Returns:
+        A string with the merged search results, followed by the number of results and the time taken for each query
+    """
+    if isinstance(queries, str):
+        queries = [queries]
+    return _format_research(research(queries, num_results))
@@ -0,0 +1,132 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import litellm
+from common.tracing import current_agent, current_span, get_tracer, record_llm_call
+
+from smolagents import ChatMessage, OpenAIServerModel, Tool
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Price a call with litellm's model prices; unknown models are not priced"""
+    try:
+        return sum(
+            litellm.cost_per_token(
+                model=model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+        )
+    except Exception:
+        return 0.0
+
+
+def message_usage(message: ChatMessage) -> Tuple[int, int]:
+    """Prompt and completion tokens of the API response behind a message"""
+    usage = getattr(message.raw, "usage", None)
+    return (
+        getattr(usage, "prompt_tokens", None) or 0,
+        getattr(usage, "completion_tokens", None) or 0,
+    )
+
+
+def record_model_call(
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    started: float,
+    cached: bool = False,
+    error: Optional[BaseException] = None,
+) -> None:
+    """Record a model call, priced with litellm's model prices"""
+    record_llm_call(
+        model,
+        prompt_tokens,
+        completion_tokens,
+        started,
+        cost_usd=estimate_cost(model, prompt_tokens, completion_tokens),
+        cached=cached,
+        error=error,
+    )
+
+
+def record_agent_step(step: Any, agent: Any = None) -> None:
+    """Step callback that records each step of a CodeAgent"""
+    tracer = get_tracer()
+    span = current_span()
+    if tracer is None or span is None or step.duration is None:
+        return
+
+    usage = span.end_step()
+
+    tools = [tool_call.name for tool_call in getattr(step, "tool_calls", None) or []]
+    # A step that errors is retried by the agent in the next step
+    retries = 1 if getattr(step, "error", None) is not None else 0
+    span.retries += retries
+    tracer.record(
+        "agent_step",
+        getattr(agent, "name", None) or current_agent() or span.name,
+        wall_s=step.duration,
+        prompt_tokens=usage["prompt_tokens"],
+        completion_tokens=usage["completion_tokens"],
+        retries=retries,
+        cost_usd=usage["cost_usd"],
+        step=getattr(step, "step_number", None),
+        tools=tools,
+    )
+
+
+def trace_tools(tools: List[Tool]) -> List[Tool]:
+    """Record the wall time of every call to the given tools"""
+    for tool in tools:
+        # Tools such as research_topic are shared between agents
+        if getattr(tool, "is_traced", False):
+            continue
+        forward = tool.forward
+
+        def traced_forward(*args, _forward=forward, _name=tool.name, **kwargs):
+            tracer = get_tracer()
+            if tracer is None:
+                return _forward(*args, **kwargs)
+            started = time.perf_counter()
+            error = None
+            try:
+                return _forward(*args, **kwargs)
+            except Exception as exc:
+                error = repr(exc)
+                raise
+            finally:
+                tracer.record(
+                    "tool_call",
+                    _name,
+                    wall_s=time.perf_counter() - started,
+                    agent=current_agent(),
+                    error=error,
+                )
+
+        tool.forward = traced_forward
+        tool.is_traced = True
+    return tools
+
+
+class TracedOpenAIServerModel(OpenAIServerModel):
+    """OpenAIServerModel that records every call in the run trace"""
+
+    def __call__(
+        self,
+        messages: List[Dict[str, str]],
+        stop_sequences: Optional[List[str]] = None,
+        grammar: Optional[str] = None,
+        tools_to_call_from: Optional[List[Tool]] = None,
+        **kwargs,
+    ) -> ChatMessage:
+        started = time.perf_counter()
+        try:
+            message = super().__call__(
+                messages, stop_sequences, grammar, tools_to_call_from, **kwargs
+            )
+        except Exception as error:
+            record_model_call(self.model_id, 0, 0, started, error=error)
+            raise
+        record_model_call(self.model_id, *message_usage(message), started)
+        return message
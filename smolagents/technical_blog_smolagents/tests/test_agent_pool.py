@@ -0,0 +1,52 @@
+import itertools
+import threading
+
+import pytest
+from technical_blog_smolagents.agent_pool import AgentPool
+
+
+def test_returned_agents_are_reused():
+    pool = AgentPool(itertools.count().__next__, size=2)
+
+    with pool.lease() as first:
+        with pool.lease() as second:
+            assert first != second
+    with pool.lease() as agent:
+        assert agent in (first, second)
+
+    assert pool.stats() == {"size": 2, "created": 2, "in_use": 0}
+
+
+def test_lease_waits_while_every_agent_is_in_use():
+    pool = AgentPool(object, size=1)
+    leased = threading.Event()
+
+    def lease():
+        with pool.lease():
+            leased.set()
+
+    with pool.lease():
+        thread = threading.Thread(target=lease)
+        thread.start()
+        assert not leased.wait(0.05)
+    thread.join(5)
+
+    assert leased.is_set()
+    assert pool.stats()["created"] == 1
+
+
+def test_failed_build_frees_its_place():
+    builds = iter([RuntimeError("no model"), "agent"])
+
+    def factory():
+        result = next(builds)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    pool = AgentPool(factory, size=1)
+    with pytest.raises(RuntimeError):
+        with pool.lease():
+            pass
+    with pool.lease() as agent:
+        assert agent == "agent"
@@ -0,0 +1,64 @@
+import pytest
+
+# The smolagents directory of this repo also imports as "smolagents", so a
+# module of the library itself is checked for
+pytest.importorskip("smolagents.memory")
+
+from smolagents.memory import ActionStep, AgentMemory, TaskStep  # noqa: E402
+from technical_blog_smolagents.memory_policy import (  # noqa: E402
+    COMPACT,
+    KEEP_LAST,
+    RESET,
+    MemoryPolicy,
+    SummaryStep,
+)
+
+
+def make_memory():
+    memory = AgentMemory(system_prompt="You write posts")
+    memory.steps = [TaskStep(task="Write post 1")]
+    memory.steps += [
+        ActionStep(step_number=i, model_output=f"code {i}", observations=f"out {i}")
+        for i in range(1, 4)
+    ]
+    memory.steps.append(TaskStep(task="Write post 2"))
+    memory.steps += [
+        ActionStep(step_number=i, model_output=f"code {i}") for i in range(4, 6)
+    ]
+    return memory
+
+
+def test_keep_last_drops_older_steps_but_keeps_the_current_task():
+    memory = make_memory()
+    MemoryPolicy(KEEP_LAST, keep_steps=1).apply(memory)
+
+    assert [type(step) for step in memory.steps] == [TaskStep, ActionStep]
+    assert memory.steps[0].task == "Write post 2"
+    assert memory.steps[1].step_number == 5
+
+
+def test_compact_folds_older_steps_into_a_summary():
+    memory = make_memory()
+    MemoryPolicy(COMPACT, keep_steps=2).apply(memory)
+
+    summary, task, *actions = memory.steps
+    assert isinstance(summary, SummaryStep)
+    assert summary.summary.splitlines() == [
+        "Task: Write post 1",
+        "Step 1: ran code 1; saw out 1",
+        "Step 2: ran code 2; saw out 2",
+        "Step 3: ran code 3; saw out 3",
+    ]
+    assert task.task == "Write post 2"
+    assert [step.step_number for step in actions] == [4, 5]
+
+
+def test_reset_leaves_the_memory_to_smolagents():
+    memory = make_memory()
+    policy = MemoryPolicy(RESET, keep_steps=1)
+    policy(memory.steps[-1], agent=type("Agent", (), {"memory": memory}))
+
+    assert policy.reset
+    assert len(memory.steps) == 7
+    with pytest.raises(ValueError):
+        MemoryPolicy("forget")
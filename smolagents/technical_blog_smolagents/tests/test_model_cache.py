@@ -0,0 +1,91 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The smolagents directory of this repo also imports as "smolagents", so a
+# module of the library itself is checked for
+pytest.importorskip("smolagents.models")
+pytest.importorskip("openai")
+
+from common.tracing import start_tracing, stop_tracing, trace_span  # noqa: E402
+from technical_blog_smolagents.llm_cache import CachedOpenAIServerModel  # noqa: E402
+from technical_blog_smolagents.tracing import estimate_cost  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": [{"type": "text", "text": "Say hello"}]}]
+
+
+@pytest.fixture
+def api():
+    """A chat completions endpoint that answers every request with hello"""
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            requests.append(
+                json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            )
+            body = json.dumps(
+                {
+                    "id": "chatcmpl-1",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": "gpt-4o-mini",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "hello"},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": 1000,
+                        "completion_tokens": 10,
+                        "total_tokens": 1010,
+                    },
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1", requests
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_repeated_calls_are_served_from_the_cache(api, monkeypatch, tmp_path):
+    api_base, requests = api
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.sqlite"))
+    model = CachedOpenAIServerModel("gpt-4o-mini", api_base=api_base, api_key="sk-test")
+
+    start_tracing("test-run", str(tmp_path))
+    try:
+        with trace_span("agent", "writer") as span:
+            first = model(MESSAGES, stop_sequences=["Observation:"])
+            second = model(MESSAGES, stop_sequences=["Observation:"])
+            model(MESSAGES, stop_sequences=["Done"])
+    finally:
+        stop_tracing()
+
+    assert first.content == second.content == "hello"
+    assert len(requests) == 2
+    # Only the calls sent to the API are counted and priced
+    assert span.llm_calls == 3
+    assert span.prompt_tokens == 2000
+    assert span.cost_usd == pytest.approx(2 * estimate_cost("gpt-4o-mini", 1000, 10))
+
+
+def test_models_without_a_price_cost_nothing():
+    assert estimate_cost("gpt-4o-mini", 1000, 10) > 0
+    assert estimate_cost("no-such-model", 1000, 10) == 0.0
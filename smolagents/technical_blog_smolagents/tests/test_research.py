@@ -0,0 +1,70 @@
+import pytest
+
+# The smolagents directory of this repo also imports as "smolagents", so a
+# module of the library itself is checked for
+pytest.importorskip("smolagents.tools")
+
+from technical_blog_smolagents.tools import blog_tools  # noqa: E402
+
+
+class SearchTool:
+    def __init__(self, results):
+        self.results = results
+        self.queries = []
+
+    def search_results(self, query, max_results):
+        self.queries.append(query)
+        if isinstance(self.results[query], Exception):
+            raise self.results[query]
+        return self.results[query][:max_results]
+
+
+def result(href, title=""):
+    return {"href": href, "title": title, "body": ""}
+
+
+@pytest.fixture
+def search_tool(monkeypatch):
+    tool = SearchTool(
+        {
+            "rust": [
+                result("https://rust-lang.org/learn/"),
+                result("https://a.example/rust"),
+                result("https://b.example/rust"),
+            ],
+            "ownership": [
+                result("http://RUST-LANG.org/learn#ownership"),
+                result("https://c.example/ownership"),
+            ],
+            "broken": RuntimeError("rate limited"),
+        }
+    )
+    monkeypatch.setattr(blog_tools, "get_search_tool", lambda: tool)
+    return tool
+
+
+def test_results_are_deduped_and_taken_in_turn_from_each_query(search_tool):
+    research = blog_tools.research(["rust", "ownership", "rust "], num_results=3)
+
+    assert [item["href"] for item in research["results"]] == [
+        "https://rust-lang.org/learn/",
+        "https://a.example/rust",
+        "https://c.example/ownership",
+    ]
+    assert sorted(search_tool.queries) == ["ownership", "rust"]
+
+
+def test_failed_queries_are_reported_with_the_others(search_tool):
+    research = blog_tools.research(["broken", "ownership"])
+
+    assert len(research["results"]) == 2
+    assert [query["error"] for query in research["queries"]] == [
+        "RuntimeError('rate limited')",
+        None,
+    ]
+
+
+def test_results_without_a_link_are_told_apart_by_their_text():
+    assert blog_tools._result_key(result("", "A")) != blog_tools._result_key(
+        result("", "B")
+    )